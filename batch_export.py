@@ -0,0 +1,328 @@
+"""
+Batch export of saved orders.
+
+Every order in the OrderStore that matches a filter (order date range, party,
+school, status) goes into one file:
+
+    xlsx - one workbook: a Summary sheet plus an Orders sheet with every order
+    pdf  - one merged PDF, each order starting on a new page
+    zip  - a zip with one PDF per order
+
+The work runs on a BatchExportTask in a worker thread. Orders are loaded and
+written one at a time, so memory doesn't grow with the size of the batch.
+The output is written to a .part file that only replaces the target once
+the export has finished; a cancelled or failed export leaves nothing behind.
+"""
+import os
+import re
+import zipfile
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit, QComboBox,
+                             QDateEdit, QPushButton, QProgressBar, QFileDialog, QMessageBox)
+from PyQt5.QtGui import QTextDocument, QPainter, QPdfWriter, QPageSize, QPageLayout
+from PyQt5.QtCore import QDate, QSizeF, QRectF, QMarginsF, QBuffer, QByteArray, QIODevice, QObject, QRunnable, QThreadPool, pyqtSignal
+
+import order_io
+from prints import saved_order_html
+
+FORMATS = (
+    ("xlsx", "Excel workbook (summary + all orders on one sheet)", "Excel Files (*.xlsx)"),
+    ("pdf", "Merged PDF", "PDF Files (*.pdf)"),
+    ("zip", "Zip of PDFs (one per order)", "Zip Files (*.zip)"),
+)
+STATUSES = ["Pending", "Cutting", "Streching", "Printing", "Completed"]  # as on the order form
+PDF_RESOLUTION = 300
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def _new_pdf_writer(target):
+    writer = QPdfWriter(target)
+    writer.setResolution(PDF_RESOLUTION)
+    writer.setPageSize(QPageSize(QPageSize.A4))
+    writer.setPageMargins(QMarginsF(15, 15, 15, 15), QPageLayout.Millimeter)
+    return writer
+
+
+def _draw_html(writer, painter, html, new_page):
+    """Lays `html` out on the writer's pages; new_page: start with writer.newPage()."""
+    doc = QTextDocument()
+    doc.documentLayout().setPaintDevice(writer)  # lay out in printer units, not screen pixels
+    doc.setHtml(html)
+    page = QSizeF(writer.width(), writer.height())
+    doc.setPageSize(page)
+    for i in range(doc.pageCount()):
+        if new_page:
+            writer.newPage()
+        new_page = True
+        painter.save()
+        painter.translate(0, -i * page.height())
+        doc.drawContents(painter, QRectF(0, i * page.height(), page.width(), page.height()))
+        painter.restore()
+
+
+def _safe_filename(text):
+    return re.sub(r'[\\/:*?"<>|]+', "_", text).strip() or "order"
+
+
+class _BatchExportSignals(QObject):
+    progress = pyqtSignal(int, int)  # orders done, orders in the batch
+    finished = pyqtSignal(str, int)  # output path, orders written
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class BatchExportTask(QRunnable):
+    """Writes every order matching `filters` (see OrderStore.filter_orders) to `path`."""
+
+    def __init__(self, store, filters, fmt, path):
+        super().__init__()
+        self.setAutoDelete(False)  # the dialog keeps the Python object alive until it is done
+        self.signals = _BatchExportSignals()
+        self.store = store
+        self.filters = filters
+        self.fmt = fmt
+        self.path = path
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _orders(self, rows):
+        """(row, state, lines) per order, loaded one at a time; stops if cancelled."""
+        total = len(rows)
+        for done, row in enumerate(rows):
+            if self.cancelled:
+                raise ExportCancelled()
+            payload = self.store.get_payload(row["id"])
+            if payload:
+                try:
+                    state, lines = order_io.loads(payload)
+                except (ValueError, TypeError, KeyError) as e:  # one corrupt order doesn't stop the batch
+                    print(f"Warning: Skipping order {row['order_number']} in batch export: {e}")
+                else:
+                    yield row, state, lines
+            self.signals.progress.emit(done + 1, total)
+
+    def run(self):
+        tmp = self.path + ".part"
+        try:
+            rows = self.store.filter_orders(**self.filters)
+            if not rows:
+                self.signals.finished.emit(self.path, 0)
+                return
+            self.signals.progress.emit(0, len(rows))
+            writer = {"xlsx": self._write_xlsx, "pdf": self._write_pdf, "zip": self._write_zip}[self.fmt]
+            count = writer(tmp, rows)
+            if self.cancelled:
+                raise ExportCancelled()
+            os.replace(tmp, self.path)
+        except ExportCancelled:
+            self._remove(tmp)
+            self.signals.cancelled.emit()
+            return
+        except Exception as e:  # anything (missing template, bad data, disk): the dialog must hear about it
+            self._remove(tmp)
+            self.signals.failed.emit(str(e) or type(e).__name__)
+            return
+        self.signals.finished.emit(self.path, count)
+
+    @staticmethod
+    def _remove(path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _write_xlsx(self, tmp, rows):
+        import excel_export
+        count = 0
+        with excel_export.OrderWorkbook(tmp) as book:
+            book.add_summary()
+            book.add_orders_sheet()
+            for row, state, lines in self._orders(rows):
+                book.add_order(state.get("header", {}), lines)
+                count += 1
+        return count
+
+    def _write_pdf(self, tmp, rows):
+        count = 0
+        writer = _new_pdf_writer(tmp)
+        painter = QPainter(writer)
+        try:
+            for row, state, lines in self._orders(rows):
+                _draw_html(writer, painter, saved_order_html(state, lines), new_page=count > 0)
+                count += 1
+        finally:
+            painter.end()
+        return count
+
+    def _write_zip(self, tmp, rows):
+        count = 0
+        used = set()
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+            for row, state, lines in self._orders(rows):
+                data = QByteArray()
+                buffer = QBuffer(data)
+                buffer.open(QIODevice.WriteOnly)
+                writer = _new_pdf_writer(buffer)
+                painter = QPainter(writer)
+                try:
+                    _draw_html(writer, painter, saved_order_html(state, lines), new_page=False)
+                finally:
+                    painter.end()
+                    buffer.close()
+
+                name = f"Order_{_safe_filename(row['order_number'])}"
+                while name.lower() in used:
+                    name += "_"
+                used.add(name.lower())
+                zf.writestr(name + ".pdf", bytes(data))
+                count += 1
+        return count
+
+
+class BatchExportDialog(QDialog):
+    """Filter form + progress bar for BatchExportTask."""
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Batch Export Orders")
+        self.setMinimumWidth(420)
+        self.store = store
+        self._task = None
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        layout = QVBoxLayout(self)
+        form = QGridLayout()
+
+        today = QDate.currentDate()
+        self.date_from = QDateEdit(QDate(today.year(), today.month(), 1))
+        self.date_to = QDateEdit(today)
+        for edit in (self.date_from, self.date_to):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("dd-MM-yyyy")
+        self.party_input = QLineEdit()
+        self.party_input.setPlaceholderText("All parties")
+        self.school_input = QLineEdit()
+        self.school_input.setPlaceholderText("All schools")
+        self.status_combo = QComboBox()
+        self.status_combo.addItem("All")
+        self.status_combo.addItems(STATUSES)
+        self.format_combo = QComboBox()
+        for key, label, _ in FORMATS:
+            self.format_combo.addItem(label, key)
+
+        for row, (label, widget) in enumerate([
+            ("From:", self.date_from), ("To:", self.date_to), ("Party:", self.party_input),
+            ("School:", self.school_input), ("Status:", self.status_combo), ("Export as:", self.format_combo),
+        ]):
+            form.addWidget(QLabel(label), row, 0)
+            form.addWidget(widget, row, 1)
+        layout.addLayout(form)
+
+        self.progress = QProgressBar()
+        self.progress.setValue(0)
+        self.status_label = QLabel("")
+        layout.addWidget(self.progress)
+        layout.addWidget(self.status_label)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        self.export_btn = QPushButton("📦 Export")
+        self.cancel_btn = QPushButton("Cancel")
+        self.close_btn = QPushButton("Close")
+        self.cancel_btn.setEnabled(False)
+        buttons.addWidget(self.export_btn)
+        buttons.addWidget(self.cancel_btn)
+        buttons.addWidget(self.close_btn)
+        layout.addLayout(buttons)
+
+        self.export_btn.clicked.connect(self.start_export)
+        self.cancel_btn.clicked.connect(self.cancel_export)
+        self.close_btn.clicked.connect(self.reject)
+
+    def reset(self):
+        """Opening again: keep the filters, clear the last run's progress."""
+        if self._task is None:
+            self.progress.setValue(0)
+            self.status_label.setText("")
+
+    def filters(self):
+        status = self.status_combo.currentText()
+        return {
+            "date_from": self.date_from.date().toString("yyyy-MM-dd"),
+            "date_to": self.date_to.date().toString("yyyy-MM-dd"),
+            "party": self.party_input.text().strip(),
+            "school": self.school_input.text().strip(),
+            "status": "" if status == "All" else status,
+        }
+
+    def start_export(self):
+        if self._task is not None:
+            return
+        if self.date_from.date() > self.date_to.date():
+            QMessageBox.warning(self, "Invalid Dates", "The 'From' date must not be after the 'To' date.")
+            return
+        fmt = self.format_combo.currentData()
+        file_filter = next(f for key, _, f in FORMATS if key == fmt)
+        default_name = (f"Orders_{self.date_from.date().toString('yyyyMMdd')}_"
+                        f"{self.date_to.date().toString('yyyyMMdd')}.{fmt}")
+        path, _ = QFileDialog.getSaveFileName(self, "Save Batch Export", default_name, file_filter)
+        if not path:
+            return
+
+        task = BatchExportTask(self.store, self.filters(), fmt, path)
+        task.signals.progress.connect(self._on_progress)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        task.signals.cancelled.connect(self._on_cancelled)
+        self._task = task
+        self._set_running(True)
+        self.status_label.setText("Looking up orders...")
+        self._pool.start(task)
+
+    def cancel_export(self):
+        if self._task is not None:
+            self._task.cancel()
+            self.status_label.setText("Cancelling...")
+            self.cancel_btn.setEnabled(False)
+
+    def _set_running(self, running):
+        self.export_btn.setEnabled(not running)
+        self.cancel_btn.setEnabled(running)
+        self.close_btn.setEnabled(not running)
+        for widget in (self.date_from, self.date_to, self.party_input, self.school_input,
+                       self.status_combo, self.format_combo):
+            widget.setEnabled(not running)
+
+    def _on_progress(self, done, total):
+        self.progress.setMaximum(max(total, 1))
+        self.progress.setValue(done)
+        self.status_label.setText(f"{done} of {total} orders")
+
+    def _finish(self, message):
+        self._task = None
+        self._set_running(False)
+        self.status_label.setText(message)
+
+    def _on_finished(self, path, count):
+        self._finish(f"Exported {count} orders.")
+        if count:
+            QMessageBox.information(self, "Export Complete", f"{count} orders exported to:\n{path}")
+        else:
+            QMessageBox.information(self, "Nothing to Export", "No saved orders match these filters.")
+
+    def _on_failed(self, message):
+        self._finish("Export failed.")
+        QMessageBox.critical(self, "Error", f"Batch export failed: {message}")
+
+    def _on_cancelled(self):
+        self.progress.setValue(0)
+        self._finish("Export cancelled.")
+
+    def reject(self):
+        if self._task is not None:
+            return  # cancel first; closing mid-export would leave the worker writing
+        super().reject()
@@ -0,0 +1,166 @@
+"""
+Render cache for the product image canvas.
+
+Switching templates used to re-read the JPEG, re-smooth it to the canvas
+size and rebuild every arrow. Here each template is decoded once, and the
+scaled pixmap plus the arrow geometry for a (template, canvas size) pair is
+built once and reused, so flipping between templates is a dict lookup.
+
+All arrows (shafts and heads) go into one QPainterPath, drawn by a single
+QGraphicsPathItem instead of a line item per stroke.
+
+Where the arrows and entry boxes go is read from media/layouts/default.json,
+once at startup. Only that file ships, so every template gets the same
+callouts; a template that needs its own can be given a media/layouts/<TEMPLATE>.json
+(its display name), which is then used instead:
+
+    {"arrows": {"collar": {"points": [[0.5, 0.08, -80], [0.5, 0.08, 0]], "entry": [-80, -20]}, ...}}
+
+Points are (x fraction, y fraction, x pixel offset); the arrow is drawn from
+the first point to the last and the entry box placed at the first point +
+entry offset. A single point means "entry box only".
+"""
+import os
+import json
+import math
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtGui import QPixmap, QPainterPath
+
+from media_store import MEDIA_ROOT
+
+LAYOUT_DIR = os.path.join(MEDIA_ROOT, 'layouts')
+DEFAULT_LAYOUT = "DEFAULT"
+ARROW_SIZE = 8
+
+
+def _parse_layout(data):
+    """layout JSON -> {key: ([(fx, fy, px), ...], (dx, dy))}"""
+    arrows = {}
+    for key, spec in data["arrows"].items():
+        points = [(float(p[0]), float(p[1]), float(p[2]) if len(p) > 2 else 0.0) for p in spec["points"]]
+        if not points:
+            raise ValueError(f"'{key}' has no points")
+        dx, dy = spec.get("entry", (-40, -20))
+        arrows[key] = (points, (float(dx), float(dy)))
+    return arrows
+
+
+def load_layouts(directory=LAYOUT_DIR):
+    """All layout files, keyed by template display name (file name without .json, upper case)."""
+    layouts = {}
+    filenames = os.listdir(directory) if os.path.isdir(directory) else []
+    for filename in filenames:
+        if not filename.lower().endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+                layouts[os.path.splitext(filename)[0].upper()] = _parse_layout(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            print(f"Warning: Skipping layout {filename}: {e}")
+    if DEFAULT_LAYOUT not in layouts:
+        print(f"Warning: No default.json in {directory}, templates get no callouts.")
+        layouts[DEFAULT_LAYOUT] = {}
+    return layouts
+
+
+def _add_arrowhead(path, p1, p2):
+    """V-shaped head at p2, for a segment coming from p1."""
+    angle = math.atan2(p2.y() - p1.y(), p2.x() - p1.x())
+    p3 = QPointF(p2.x() - ARROW_SIZE * math.cos(angle - math.pi / 6),
+                 p2.y() - ARROW_SIZE * math.sin(angle - math.pi / 6))
+    p4 = QPointF(p2.x() - ARROW_SIZE * math.cos(angle + math.pi / 6),
+                 p2.y() - ARROW_SIZE * math.sin(angle + math.pi / 6))
+    path.moveTo(p3)
+    path.lineTo(p2)
+    path.lineTo(p4)
+
+
+def arrow_geometry(w, h, arrows):
+    """(arrow_path, entry_positions) for a w x h canvas."""
+    path = QPainterPath()
+    entry_positions = {}
+    for key, (points, (dx, dy)) in arrows.items():
+        pts = [QPointF(fx * w + px, fy * h) for fx, fy, px in points]
+        if len(pts) > 1:
+            path.moveTo(pts[0])
+            for p in pts[1:]:
+                path.lineTo(p)
+            _add_arrowhead(path, pts[-2], pts[-1])
+        entry_positions[key] = QPointF(pts[0].x() + dx, pts[0].y() + dy)
+    return path, entry_positions
+
+
+class CanvasRender:
+    """Everything the canvas needs to show one template at one size."""
+    __slots__ = ("pixmap", "pos", "arrow_path", "entry_positions")
+
+    def __init__(self, pixmap, pos, arrow_path, entry_positions):
+        self.pixmap = pixmap
+        self.pos = pos
+        self.arrow_path = arrow_path
+        self.entry_positions = entry_positions
+
+
+class TemplateRenderCache:
+
+    def __init__(self, layouts=None, limit=16):
+        self.layouts = layouts if layouts is not None else load_layouts()
+        self.limit = limit  # templates kept decoded (and renders kept built)
+        self._templates = OrderedDict()  # path -> full size QPixmap
+        self._renders = OrderedDict()  # (path, layout, w, h) -> CanvasRender
+        self._geometry = {}  # (layout, w, h) -> (arrow_path, entry_positions)
+
+    @staticmethod
+    def _remember(cache, key, value, limit):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+
+    def template(self, path):
+        """Decoded template, read from disk only the first time (null pixmap if unreadable)."""
+        pixmap = self._templates.get(path)
+        if pixmap is None:
+            pixmap = QPixmap(path)
+            if pixmap.isNull():
+                return pixmap
+            self._remember(self._templates, path, pixmap, self.limit)
+        else:
+            self._templates.move_to_end(path)
+        return pixmap
+
+    def layout_name(self, template_name):
+        return template_name if template_name in self.layouts else DEFAULT_LAYOUT
+
+    def geometry(self, layout, w, h):
+        key = (layout, w, h)
+        geometry = self._geometry.get(key)
+        if geometry is None:
+            geometry = self._geometry[key] = arrow_geometry(w, h, self.layouts[layout])
+        return geometry
+
+    def render(self, path, w, h, template_name=None):
+        """
+        CanvasRender for template `path` (None = no template) on a w x h canvas
+        view, with the callout layout of `template_name` (its display name).
+        """
+        layout = self.layout_name(template_name)
+        key = (path, layout, w, h)
+        render = self._renders.get(key)
+        if render is not None:
+            self._renders.move_to_end(key)
+            return render
+
+        arrow_path, entry_positions = self.geometry(layout, w, h)
+        pixmap, pos = None, QPointF(0, 0)
+        if path:
+            source = self.template(path)
+            if not source.isNull():
+                iw, ih = w - 4, h - 4  # inside the view's frame
+                pixmap = source.scaled(iw, ih, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                pos = QPointF((iw - pixmap.width()) / 2, (ih - pixmap.height()) / 2)
+        render = CanvasRender(pixmap, pos, arrow_path, entry_positions)
+        self._remember(self._renders, key, render, self.limit)
+        return render
@@ -0,0 +1,253 @@
+"""
+Excel export of orders (xlsxwriter).
+
+Workbooks are opened in constant_memory mode: each row is flushed to a temp
+file as soon as the next one is started, so memory stays flat no matter how
+many lines or orders go in. The catch is that rows have to be written top to
+bottom, which is what add_order() does: header block, item lines, totals.
+It also keeps a temp file open per worksheet, so batch exports put all their
+orders on one sheet (add_orders_sheet) rather than a sheet each.
+
+Cells are typed: quantities and prices are numbers, so the sheet can be
+summed and filtered in Excel directly.
+"""
+import re
+
+import xlsxwriter
+
+from order_model import OrderTotals, header_tax_percentage
+
+# (label, key in the order state "header")
+HEADER_FIELDS = (
+    ("Order No", "order_number"),
+    ("Order Date", "order_date"),
+    ("Delivery Date", "delivery_date"),
+    ("Party Name", "party_name"),
+    ("School Name", "school_name"),
+    ("Address", "address"),
+    ("GST No", "gst_no"),
+    ("Barcode", "barcode"),
+    ("Status", "status"),
+    ("Advance Paid", "advance_paid"),
+)
+
+# (header, OrderLine attribute, column width, kind); kind picks the cell format
+LINE_COLUMNS = (
+    ("Fabric", "fabric", 14, "text"),
+    ("Type", "item_type", 14, "text"),
+    ("Color", "color", 12, "text"),
+    ("Size", "size", 8, "text"),
+    ("Qty", "qty", 8, "int"),
+    ("Unit Price", "unit_price", 11, "money"),
+    ("Print Add-on", "print_add_on", 12, "money"),
+    ("Collar Add-on", "collar_add_on", 12, "money"),
+    ("Track Add-on", "track_add_on", 12, "money"),
+    ("Total", "total", 12, "money"),
+    ("Status", "status", 10, "text"),
+    ("Barcode", "barcode", 14, "text"),
+    ("Remark", "remark", 24, "text"),
+)
+# Workshop slips: no prices
+WORKSHOP_COLUMNS = tuple(c for c in LINE_COLUMNS if c[3] != "money")
+
+# Excel's last row; an order that wouldn't fit on the orders sheet of a
+# batch export starts a new one (xlsxwriter silently drops rows past it)
+ROWS_PER_SHEET = 1048576
+
+# Batch exports: (header, column width) of the one-row-per-order sheet
+SUMMARY_COLUMNS = (
+    ("Order No", 14), ("Order Date", 12), ("Delivery Date", 12), ("Party Name", 24),
+    ("School Name", 24), ("Status", 12), ("Lines", 8), ("Qty", 8),
+    ("Total Items Price", 16), ("Tax", 12), ("Grand Total", 14),
+)
+
+
+def _sheet_name(name, used):
+    """Valid, unique Excel sheet name (max 31 chars, no []:*?/\\)."""
+    name = re.sub(r"[\[\]:*?/\\]", "_", str(name or "")).strip()[:31] or "Order"
+    candidate, n = name, 1
+    while candidate.lower() in used:
+        n += 1
+        suffix = f" ({n})"
+        candidate = name[:31 - len(suffix)] + suffix
+    used.add(candidate.lower())
+    return candidate
+
+
+def _order_rows(line_count, columns):
+    """Rows OrderWorkbook._write_order() uses for an order of `line_count` lines."""
+    rows = 2 + len(HEADER_FIELDS) + 1 + 1 + line_count  # title, header block, column heads, lines
+    if any(c[1] == "total" for c in columns):
+        rows += 4  # blank row + three totals
+    return rows
+
+
+class OrderWorkbook:
+    """
+    One .xlsx file. Use as a context manager; the file is written on close.
+
+        with OrderWorkbook(path) as book:
+            book.add_order(state["header"], lines)
+    """
+
+    def __init__(self, path):
+        self.workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        add = self.workbook.add_format
+        self.formats = {
+            "title": add({"bold": True, "font_size": 14}),
+            "label": add({"bold": True}),
+            "head": add({"bold": True, "bg_color": "#E9ECEF", "border": 1}),
+            "text": add({"border": 1}),
+            "int": add({"border": 1, "num_format": "0"}),
+            "money": add({"border": 1, "num_format": "#,##0.00"}),
+            "total_label": add({"bold": True, "align": "right"}),
+            "total": add({"bold": True, "num_format": "#,##0.00"}),
+            "grand_total": add({"bold": True, "num_format": "#,##0.00", "top": 2, "bottom": 2}),
+        }
+        self._sheet_names = set()
+        self._summary = None
+        self._summary_row = 0
+        self._orders_sheet_name = None  # set by add_orders_sheet()
+        self._orders_sheet = None
+        self._orders_row = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.workbook.close()
+
+    def add_summary(self):
+        """
+        Adds a 'Summary' sheet (call before the first add_order) that gets one
+        row per order added afterwards.
+        """
+        f = self.formats
+        ws = self._summary = self.workbook.add_worksheet(_sheet_name("Summary", self._sheet_names))
+        for col, (title, width) in enumerate(SUMMARY_COLUMNS):
+            ws.set_column(col, col, width)
+            ws.write_string(0, col, title, f["head"])
+        ws.freeze_panes(1, 0)
+        self._summary_row = 1
+
+    def _add_summary_row(self, header, totals, line_count, qty):
+        f = self.formats
+        ws, row = self._summary, self._summary_row
+        for col, key in enumerate(("order_number", "order_date", "delivery_date", "party_name", "school_name", "status")):
+            ws.write_string(row, col, str(header.get(key, "")), f["text"])
+        ws.write_number(row, 6, line_count, f["int"])
+        ws.write_number(row, 7, qty, f["int"])
+        ws.write_number(row, 8, totals.subtotal, f["money"])
+        ws.write_number(row, 9, totals.tax_amount, f["money"])
+        ws.write_number(row, 10, totals.grand_total, f["money"])
+        self._summary_row += 1
+
+    def add_orders_sheet(self, name="Orders"):
+        """
+        Puts every order added after this on one shared sheet, as blocks of
+        rows one under the other, instead of a sheet per order. For batch
+        exports: constant_memory keeps a temp file open for every worksheet
+        until the workbook is closed, so thousands of sheets run out of file
+        handles. A sheet that fills up is continued on "Orders (2)" etc.
+        """
+        self._orders_sheet_name = name
+        self._orders_sheet = None
+
+    def _new_order_sheet(self, name, columns):
+        ws = self.workbook.add_worksheet(_sheet_name(name, self._sheet_names))
+        for col, (_, _, width, _) in enumerate(columns):
+            ws.set_column(col, col, width)
+        return ws
+
+    def add_order(self, header, lines, columns=LINE_COLUMNS, sheet_name=None):
+        """
+        Writes one order on its own sheet (or as the next block on the orders
+        sheet, see add_orders_sheet) and returns its OrderTotals.
+        `lines` can be any iterable of OrderLines (a generator is fine, it is
+        read once). On the orders sheet the lines are counted first, so the
+        whole block is known to fit before anything is written.
+        """
+        if self._orders_sheet_name is None:
+            ws = self._new_order_sheet(sheet_name or header.get("order_number"), columns)
+            return self._write_order(ws, 0, header, lines, columns)[1]
+        lines = list(lines)
+        needed = _order_rows(len(lines), columns)
+        if needed > ROWS_PER_SHEET:
+            raise ValueError(f"Order {header.get('order_number', '')} has too many lines for one Excel sheet.")
+        if self._orders_sheet is None or self._orders_row + needed > ROWS_PER_SHEET:
+            self._orders_sheet = self._new_order_sheet(self._orders_sheet_name, columns)
+            self._orders_row = 0
+        row, totals = self._write_order(self._orders_sheet, self._orders_row, header, lines, columns)
+        self._orders_row = row + 2  # blank rows between orders
+        return totals
+
+    def _write_order(self, ws, row, header, lines, columns):
+        """Header block, item lines and totals from `row` down; returns (next free row, OrderTotals)."""
+        f = self.formats
+        ws.write_string(row, 0, "Order Summary", f["title"])
+        row += 2
+        for label, key in HEADER_FIELDS:
+            ws.write_string(row, 0, label, f["label"])
+            ws.write(row, 1, header.get(key, ""))
+            row += 1
+
+        row += 1
+        for col, (title, _, _, _) in enumerate(columns):
+            ws.write_string(row, col, title, f["head"])
+        row += 1
+
+        totals = OrderTotals(header_tax_percentage(header))
+        line_count = qty = 0
+        for line in lines:
+            for col, (_, attr, _, kind) in enumerate(columns):
+                value = getattr(line, attr)
+                if kind == "text":
+                    ws.write_string(row, col, str(value), f["text"])
+                else:
+                    ws.write_number(row, col, value, f[kind])
+            totals.add(line)
+            line_count += 1
+            qty += line.qty
+            row += 1
+
+        attrs = [c[1] for c in columns]
+        if "total" in attrs:
+            value_col = attrs.index("total")
+            label_col = max(value_col - 1, 0)
+            row += 1
+            for label, value, fmt in (
+                ("Total Items Price", totals.subtotal, "total"),
+                (f"Tax (GST) @ {totals.tax_percentage:.1f}%", totals.tax_amount, "total"),
+                ("GRAND TOTAL", totals.grand_total, "grand_total"),
+            ):
+                ws.write_string(row, label_col, label, f["total_label"])
+                ws.write_number(row, value_col, value, f[fmt])
+                row += 1
+
+        if self._summary is not None:
+            self._add_summary_row(header, totals, line_count, qty)
+        return row, totals
+
+    def add_table(self, title, headers, rows, sheet_name=None):
+        """A plain titled grid (e.g. the RIB collar size x colour breakdown)."""
+        f = self.formats
+        ws = self.workbook.add_worksheet(_sheet_name(sheet_name or title, self._sheet_names))
+        ws.set_column(0, max(len(headers) - 1, 0), 14)
+        ws.write_string(0, 0, title, f["title"])
+        for col, text in enumerate(headers):
+            ws.write_string(2, col, str(text), f["head"])
+        for row, values in enumerate(rows, start=3):
+            for col, value in enumerate(values):
+                if isinstance(value, (int, float)):
+                    ws.write_number(row, col, value, f["int"] if isinstance(value, int) else f["money"])
+                else:
+                    ws.write_string(row, col, str(value), f["text"])
+
+
+def save_order(path, header, lines, columns=LINE_COLUMNS):
+    with OrderWorkbook(path) as book:
+        book.add_order(header, lines, columns)
+    return path
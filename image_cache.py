@@ -0,0 +1,272 @@
+"""
+Thumbnail cache for the image gallery.
+
+Originals are decoded once, straight to thumbnail size (QImageReader scales
+while decoding, so a 12 MP phone photo never exists in memory at full size),
+and the result is written to media/thumbs. The file name is a hash of the
+path, mtime and size of the original, so an edited or replaced photo gets a
+fresh thumbnail and stale ones are simply never looked up again.
+
+load_image() only uses QImage and can run in worker threads; pixmap() is for
+the GUI thread and keeps the most recently used pixmaps in memory.
+ThumbnailLoader runs load_image() on a thread pool so the gallery can open
+with placeholders and fill in thumbnails as they arrive.
+
+PrintImageCache does the same for printed documents: reference photos are
+downscaled to print size once and their data URIs reused across renders.
+"""
+import os
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QSize, QByteArray, QBuffer, QIODevice, QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QPixmap, QPainter
+
+from media_store import MEDIA_ROOT
+
+THUMB_DIR = os.path.join(MEDIA_ROOT, 'thumbs')
+THUMB_SIZE = 200
+MEMORY_LIMIT = 300  # pixmaps kept in memory, about 50 MB at 200x200
+
+PRINT_CACHE_DIR = os.path.join(MEDIA_ROOT, 'print')
+PRINT_SIZE = (460, 500)  # 2x the 230x250 box reference photos get in the quotation
+PRINT_JPEG_QUALITY = 85
+
+
+class ThumbnailCache:
+
+    def __init__(self, cache_dir=THUMB_DIR, size=THUMB_SIZE, memory_limit=MEMORY_LIMIT):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.memory_limit = memory_limit
+        self._pixmaps = OrderedDict()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, path):
+        st = os.stat(path)
+        raw = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{self.size}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _thumb_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".png")
+
+    def load_image(self, path, key=None):
+        """Thumbnail as a QImage (null if `path` can't be read). Safe to call from any thread."""
+        try:
+            key = key or self._key(path)
+        except OSError:
+            return QImage()
+        thumb_path = self._thumb_path(key)
+
+        if os.path.exists(thumb_path):
+            image = QImage(thumb_path)
+            if not image.isNull():
+                return image
+
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)  # phone photos: respect EXIF rotation
+        original = reader.size()
+        if original.isValid():
+            reader.setScaledSize(original.scaled(QSize(self.size, self.size), Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return image
+        if image.width() > self.size or image.height() > self.size:
+            # Formats that can't report their size up front
+            image = image.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+        os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+        tmp = thumb_path + f".{threading.get_ident()}.part"  # two workers may race on one file
+        if image.save(tmp, "PNG"):
+            os.replace(tmp, thumb_path)
+        return image
+
+    def cached(self, path):
+        """In-memory pixmap for `path`, or None. Never touches the originals."""
+        try:
+            key = self._key(path)
+        except OSError:
+            return None
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+        return pixmap
+
+    def put(self, path, image):
+        """Converts a worker's QImage to a pixmap and remembers it (GUI thread only)."""
+        pixmap = QPixmap.fromImage(image)
+        try:
+            key = self._key(path)
+        except OSError:
+            return pixmap
+        self._pixmaps[key] = pixmap
+        self._pixmaps.move_to_end(key)
+        while len(self._pixmaps) > self.memory_limit:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+    def pixmap(self, path):
+        """Thumbnail pixmap, from memory, disk cache or (once) the original. GUI thread only."""
+        pixmap = self.cached(path)
+        if pixmap is None:
+            image = self.load_image(path)
+            if image.isNull():
+                return QPixmap()
+            pixmap = self.put(path, image)
+        return pixmap
+
+
+class _ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)  # path, thumbnail (null if unreadable)
+
+
+class _ThumbnailTask(QRunnable):
+    def __init__(self, cache, path):
+        super().__init__()
+        self.setAutoDelete(False)  # the loader keeps the Python object alive until it is done
+        self.signals = _ThumbnailSignals()
+        self.cache = cache
+        self.path = path
+        self.visible = False
+
+    def run(self):
+        # QImage only: QPixmap may not be touched outside the GUI thread
+        self.signals.loaded.emit(self.path, self.cache.load_image(self.path))
+
+
+class ThumbnailLoader(QObject):
+    """
+    Decodes thumbnails on a thread pool. Tiles that are on screen are queued
+    ahead of the rest; the QImage -> QPixmap step happens back on the GUI
+    thread, in _on_loaded().
+    """
+    thumbnail_ready = pyqtSignal(str, QPixmap)
+
+    VISIBLE_PRIORITY = 1
+    BACKGROUND_PRIORITY = 0
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self._pending = {}  # path -> _ThumbnailTask
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, QThread.idealThreadCount() - 1))  # leave a core for the GUI
+
+    def request(self, path, visible=False):
+        """
+        Returns the pixmap right away if it is in memory, otherwise queues the
+        decode and returns None. For visible requests thumbnail_ready fires
+        later; background ones only fill the disk cache (so they don't push
+        the on-screen pixmaps out of memory). Asking again with visible=True
+        moves a queued decode to the front.
+        """
+        pixmap = self.cache.cached(path)
+        if pixmap is not None:
+            return pixmap
+
+        task = self._pending.get(path)
+        if task is not None:
+            if visible and not task.visible:
+                task.visible = True
+                if self._pool.tryTake(task):
+                    self._pool.start(task, self.VISIBLE_PRIORITY)
+            return None
+
+        task = _ThumbnailTask(self.cache, path)
+        task.visible = visible
+        task.signals.loaded.connect(self._on_loaded)
+        self._pending[path] = task
+        self._pool.start(task, self.VISIBLE_PRIORITY if visible else self.BACKGROUND_PRIORITY)
+        return None
+
+    def cancel(self):
+        """Drops decodes that haven't started yet (e.g. the gallery was closed)."""
+        for path, task in list(self._pending.items()):
+            if self._pool.tryTake(task):
+                del self._pending[path]
+
+    def _on_loaded(self, path, image):
+        task = self._pending.pop(path, None)
+        if task is None or not task.visible:
+            return
+        pixmap = self.cache.put(path, image) if not image.isNull() else QPixmap()
+        self.thumbnail_ready.emit(path, pixmap)
+
+
+class PrintImageCache:
+    """
+    Reference photos as small JPEG data URIs for the print documents.
+    A 6 MB phone photo becomes ~60 KB, done once per photo (keyed by its
+    content hash) and kept on disk in media/print and in memory.
+    """
+
+    def __init__(self, cache_dir=PRINT_CACHE_DIR, size=PRINT_SIZE, quality=PRINT_JPEG_QUALITY):
+        self.cache_dir = cache_dir
+        self.size = QSize(*size)
+        self.quality = quality
+        self._uris = {}  # digest -> data URI
+        self._digests = {}  # (path, mtime, size) -> digest, so unchanged files aren't re-hashed
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _digest(self, path):
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+        digest = self._digests.get(key)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            digest = self._digests[key] = h.hexdigest()
+        return digest
+
+    def _encode(self, path):
+        """Downscaled JPEG bytes for `path`, or None if it can't be decoded."""
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        original = reader.size()
+        if original.isValid() and (original.width() > self.size.width() or original.height() > self.size.height()):
+            reader.setScaledSize(original.scaled(self.size, Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return None
+        if image.hasAlphaChannel():
+            # JPEG has no alpha: put transparent PNGs on white like the page
+            flat = QImage(image.size(), QImage.Format_RGB32)
+            flat.fill(Qt.white)
+            painter = QPainter(flat)
+            painter.drawImage(0, 0, image)
+            painter.end()
+            image = flat
+
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        image.save(buffer, "JPEG", self.quality)
+        return bytes(data)
+
+    def data_uri(self, path, digest=None):
+        """`data:image/jpeg;base64,...` for `path` ("" if it can't be read)."""
+        digest = digest or self._digest(path)
+        uri = self._uris.get(digest)
+        if uri is not None:
+            return uri
+
+        cached_path = os.path.join(self.cache_dir, f"{digest}_{self.size.width()}x{self.size.height()}.jpg")
+        if os.path.exists(cached_path):
+            with open(cached_path, "rb") as f:
+                jpeg = f.read()
+        else:
+            jpeg = self._encode(path)
+            if jpeg is None:
+                return ""
+            tmp = cached_path + ".part"
+            with open(tmp, "wb") as f:
+                f.write(jpeg)
+            os.replace(tmp, cached_path)
+
+        uri = "data:image/jpeg;base64," + base64.b64encode(jpeg).decode("ascii")
+        self._uris[digest] = uri
+        return uri
@@ -0,0 +1,31 @@
+"""
+Modules the order form only needs once the operator prints or exports.
+
+main.py imports them inside the functions that use them, so starting the
+app doesn't pay for QtPrintSupport, the office libraries or QtWebEngine.
+prewarm() imports them on a background thread once the window is up, so
+the first click on Print/Export is still quick; if the click comes first,
+Python's import lock simply makes it wait for the import in progress.
+"""
+import importlib
+import threading
+
+PREWARM_DELAY_MS = 500  # give the window its first paint before competing for the GIL
+
+# QtWebEngineWidgets is not in here: Chromium has to start on the GUI thread,
+# so it is only imported when the RIB collar preview is opened.
+PREWARM_MODULES = ("prints", "batch_export", "excel_export", "docx", "pptx")
+
+
+def _import_all(names):
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except Exception as e:  # missing optional library: the export that needs it reports it
+            print(f"Warning: Could not pre-load {name}: {e}")
+
+
+def prewarm(names=PREWARM_MODULES):
+    thread = threading.Thread(target=_import_all, args=(tuple(names),), name="prewarm-imports", daemon=True)
+    thread.start()
+    return thread
@@ -1,107 +1,252 @@
 import sys
 import os
-import math
-import base64
+import startup_profile
+startup_profile.start()  # before the other imports, so they get timed too (see startup_profile.py)
+import shutil
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QDialog, QPushButton, 
     QVBoxLayout, QHBoxLayout, QGroupBox, QRadioButton,  QFileDialog,
     QDateEdit, QToolButton, QComboBox, QDoubleSpinBox, QGraphicsView,
     QGraphicsScene, QGraphicsPixmapItem, QGraphicsProxyWidget, QFrame, 
-    QGridLayout, QGroupBox, QCheckBox, QTableWidget, QTableWidgetItem,
-    QSizePolicy, QListWidgetItem, QScrollArea, QListWidget, QMessageBox)
+    QGridLayout, QGroupBox, QCheckBox, QTableView,
+    QSizePolicy, QListView, QMessageBox, QStyledItemDelegate, QStyle, QAbstractButton)
+
+from PyQt5.QtGui import QPixmap,QPainter, QPen, QColor, QImageReader
+from PyQt5.QtCore import (Qt, QDate, QPointF, QRect, QSize, QEvent, QByteArray, QBuffer, QIODevice, pyqtSignal,
+    QAbstractTableModel, QAbstractListModel, QModelIndex, QPersistentModelIndex,
+    QObject, QRunnable, QThreadPool, QTimer)
+from order_model import Order, OrderLine
+from order_store import OrderStore
+import order_io
+from media_store import MediaStore, MEDIA_ROOT
+from image_cache import ThumbnailCache, ThumbnailLoader, PrintImageCache, THUMB_SIZE
+from canvas_render import TemplateRenderCache
+import lazy_imports
+import theme
+from theme import set_role, set_state
 
-from PyQt5.QtGui import QPixmap,QPainter, QPen, QColor
-from PyQt5.QtCore import Qt, QDate, QPointF,QByteArray, QBuffer, QIODevice, pyqtSignal
-from prints import PrintExportDialog, QuotationPreviewDialog, JobWorkPreviewDialog, CuttingJobPreviewDialog, PrintingJobPreviewDialog, RibCollarPrintDialog
-
-MEDIA_ROOT = os.path.join(os.getcwd(), 'media')  # The main folder
 TEMPLATE_DIR = os.path.join(MEDIA_ROOT, 'templates') # For blank shirt images (ComboBox source)
 REFERENCE_DIR = os.path.join(MEDIA_ROOT, 'references') # For customer-uploaded photos (Gallery source) 
+DEFAULT_TEMPLATE = "NEW REGULAR COLER"
+TRACK_OPTIONS = {'Dori': '0', '1 Piping': '2', '2 Piping': '6', 'Other': '0'}  # option -> default price
+# Choices of the item dialogs (ItemInputDialog, SizeRunDialog)
+FABRICS = ["Cotton", "Platted", "Jabro"]
+ITEM_TYPES = ["T-shirt", "Track-pant", "Shorts"]
+SIZES = ["S", "M", "L", "XL", "XXL"]
+ITEM_STATUSES = ["Pending", "Cutting", "Stretching", "Printing", "Completed"]
+
+def _template_display_name(filename):
+    # "my_shirt.png" -> "MY_SHIRT"
+    return os.path.splitext(os.path.basename(filename))[0].upper()
+
+class DialogCache:
+    """
+    Dialogs built once, the first time they are opened, and reused after that.
+    get(key, build) returns the dialog stored under `key`, or calls build() to
+    make it; a reused dialog gets its reset() called (if it has one) so it
+    opens like a new one.
+    """
+    def __init__(self):
+        self._dialogs = {}
+
+    def get(self, key, build):
+        dialog = self._dialogs.get(key)
+        if dialog is None:
+            dialog = self._dialogs[key] = build()
+        elif hasattr(dialog, 'reset'):
+            dialog.reset()
+        return dialog
+
+class GalleryModel(QAbstractListModel):
+    """Reference photos for the gallery; thumbnails are asked for only when a cell is painted."""
+    def __init__(self, entries, thumbnails, parent=None):
+        super().__init__(parent)
+        self.entries = list(entries)
+        self.thumbnails = thumbnails
+        self._failed = set()  # paths that could not be decoded
+        self._index_rows()
+        thumbnails.thumbnail_ready.connect(self._thumbnail_ready)
+
+    def _index_rows(self):
+        self._rows_by_path = {}
+        for row, entry in enumerate(self.entries):
+            self._rows_by_path.setdefault(entry.path, []).append(row)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return entry.name
+        if role == Qt.DecorationRole:
+            if entry.path in self._failed:
+                return QPixmap()  # null: the delegate shows "No preview"
+            # The view only asks for cells it paints, so these jump the queue
+            return self.thumbnails.request(entry.path, visible=True)
+        if role == Qt.UserRole:
+            return entry
+        return None
+
+    def entry(self, row):
+        return self.entries[row]
+
+    def set_entries(self, entries):
+        self.beginResetModel()
+        self.entries = list(entries)
+        self._failed = set()
+        self._index_rows()
+        self.endResetModel()
+
+    def remove_entry(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.entries[row]
+        self._index_rows()
+        self.endRemoveRows()
+
+    def prefetch(self):
+        """Queue every thumbnail behind the visible ones, so the disk cache fills while the user looks."""
+        for entry in self.entries:
+            self.thumbnails.request(entry.path)
+
+    def _thumbnail_ready(self, path, pixmap):
+        if pixmap.isNull():
+            self._failed.add(path)
+        for row in self._rows_by_path.get(path, ()):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+class GalleryDelegate(QStyledItemDelegate):
+    """
+    Paints a gallery cell: the thumbnail plus download/delete buttons in the
+    top right corner. Nothing here is a widget, so 5000 photos cost the same
+    as the dozen on screen.
+    """
+    image_clicked = pyqtSignal(QModelIndex)
+    download_clicked = pyqtSignal(QModelIndex)
+    delete_clicked = pyqtSignal(QModelIndex)
+
+    BUTTON_SIZE = 30
+
+    def sizeHint(self, option, index):
+        return QSize(THUMB_SIZE, THUMB_SIZE)
+
+    def _button_rects(self, rect):
+        size = self.BUTTON_SIZE
+        delete_rect = QRect(rect.right() - 5 - size, rect.top() + 5, size, size)
+        download_rect = delete_rect.translated(-(size + 2), 0)
+        return download_rect, delete_rect
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = option.rect
+
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            x = rect.x() + (rect.width() - pixmap.width()) // 2
+            y = rect.y() + (rect.height() - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+        else:
+            painter.fillRect(rect, theme.color("tile"))
+            painter.setPen(theme.color("tile_text"))
+            painter.drawText(rect, Qt.AlignCenter, "Loading..." if pixmap is None else "No preview")
+
+        if option.state & QStyle.State_MouseOver:
+            painter.setPen(QPen(theme.color("accent"), 2))
+            painter.drawRect(rect.adjusted(1, 1, -1, -1))
+
+        painter.setPen(theme.color("tile_button"))
+        painter.setBrush(QColor(255, 255, 255, 180))
+        for button_rect, glyph in zip(self._button_rects(rect), ("⬇️", "🗑️")):
+            painter.drawRoundedRect(button_rect, 10, 10)
+            painter.drawText(button_rect, Qt.AlignCenter, glyph)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            download_rect, delete_rect = self._button_rects(option.rect)
+            if delete_rect.contains(event.pos()):
+                self.delete_clicked.emit(index)
+            elif download_rect.contains(event.pos()):
+                self.download_clicked.emit(index)
+            else:
+                self.image_clicked.emit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
 
 class ImageGalleryWindow(QDialog):
     image_selected = pyqtSignal(str)
-    def __init__(self, media_dir, parent=None):
+    def __init__(self, media_store, thumbnails, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Uploaded Image Gallery")
-        self.media_dir = media_dir  # Store the path for load_images()
+        self.media_store = media_store  # Reference photos come from the store index, not a folder scan
+        self.thumbnails = thumbnails  # Shared ThumbnailLoader, decodes off the GUI thread
         self.setGeometry(100, 100, 800, 600)
         
         main_layout = QVBoxLayout(self)
-        
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        main_layout.addWidget(scroll_area)
-        
-        self.gallery_widget = QWidget()
-        self.gallery_layout = QGridLayout(self.gallery_widget)
-        scroll_area.setWidget(self.gallery_widget)
-        
-        self.load_images()
-    
-    def load_images(self):
-        image_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
-        col_count = 4 
-        row, col = 0, 0
 
-        if not os.path.isdir(self.media_dir):
-            self.gallery_layout.addWidget(QLabel("Error: Reference directory not found."), 0, 0)
+        self.model = GalleryModel(media_store.entries('reference'), thumbnails, self)
+        self.delegate = GalleryDelegate(self)
+        self.delegate.image_clicked.connect(lambda index: self._image_clicked(self.model.entry(index.row()).path))
+        self.delegate.download_clicked.connect(lambda index: self._download_image(self.model.entry(index.row())))
+        self.delegate.delete_clicked.connect(lambda index: self._delete_image(index.row()))
+
+        self.view = QListView()
+        self.view.setViewMode(QListView.IconMode)
+        self.view.setResizeMode(QListView.Adjust)
+        self.view.setMovement(QListView.Static)
+        self.view.setUniformItemSizes(True)
+        self.view.setSpacing(5)
+        self.view.setSelectionMode(QListView.NoSelection)
+        self.view.setMouseTracking(True)  # hover outline
+        self.view.setItemDelegate(self.delegate)
+        self.view.setModel(self.model)
+        main_layout.addWidget(self.view)
+
+        self.empty_label = QLabel("No reference images uploaded yet.")
+        self.empty_label.setVisible(not self.model.rowCount())
+        main_layout.addWidget(self.empty_label)
+
+        # After the first paint has queued the visible cells
+        QTimer.singleShot(0, self.model.prefetch)
+
+    def reset(self):
+        """Opening again: pick up photos uploaded since, and load thumbnails again."""
+        self.model.set_entries(self.media_store.entries('reference'))
+        self.thumbnails.thumbnail_ready.connect(self.model._thumbnail_ready)
+        self.empty_label.setVisible(not self.model.rowCount())
+        QTimer.singleShot(0, self.model.prefetch)
+
+    def done(self, result):
+        # Closing: don't keep decoding photos nobody will see
+        self.thumbnails.thumbnail_ready.disconnect(self.model._thumbnail_ready)
+        self.thumbnails.cancel()
+        super().done(result)
+
+    def _delete_image(self, row):
+        entry = self.model.entry(row)
+        reply = QMessageBox.question(self, 'Delete Image',
+            f"Remove {entry.name} from the gallery?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
             return
-
-        for filename in os.listdir(self.media_dir):
-            if filename.lower().endswith(image_extensions):
-                image_path = os.path.join(self.media_dir, filename)                
-
-                label = QLabel()
-                pixmap = QPixmap(image_path)
-                if pixmap.isNull():
-                    continue
-
-                scaled_pixmap = pixmap.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                label.setPixmap(scaled_pixmap)
-                label.setAlignment(Qt.AlignCenter)
-                label.setToolTip(filename)
-                
-                # Click event for selecting the image
-                label.mousePressEvent = lambda event, path=image_path: self._image_clicked(path)
-                label.setCursor(Qt.PointingHandCursor)
-                
-                # 2. Icon Bar Widget (The overlay)
-                icon_bar = QWidget()
-                icon_layout = QHBoxLayout(icon_bar)
-                icon_layout.setContentsMargins(0, 0, 5, 5) 
-                icon_layout.setSpacing(2)
-                
-                # 🗑️ Delete Button
-                delete_btn = QPushButton("🗑️")
-                delete_btn.setStyleSheet("background-color: rgba(255, 255, 255, 180); border: 1px solid #AAA; border-radius: 10px; font-size: 14px; padding: 0;") 
-                delete_btn.setFixedSize(30, 30) 
-                delete_btn.setToolTip(f"Delete {filename}")
-                delete_btn.clicked.connect(lambda checked, path=image_path: self._delete_image(path))
-                
-                # ⬇️ Download Button
-                download_btn = QPushButton("⬇️") 
-                download_btn.setStyleSheet("background-color: rgba(255, 255, 255, 180); border: 1px solid #AAA; border-radius: 10px; font-size: 14px; padding: 0;") 
-                download_btn.setFixedSize(30, 30) 
-                download_btn.setToolTip(f"Download {filename}")
-                download_btn.clicked.connect(lambda checked, path=image_path: self._download_image(path))
-
-                icon_layout.addStretch()
-                icon_layout.addWidget(download_btn)
-                icon_layout.addWidget(delete_btn)
-                
-                image_wrapper = QWidget() 
-                wrapper_layout = QGridLayout(image_wrapper)
-                wrapper_layout.setContentsMargins(0, 0, 0, 0)
-                wrapper_layout.setSpacing(0)
-                wrapper_layout.addWidget(label, 0, 0)                
-                wrapper_layout.addWidget(icon_bar, 0, 0, Qt.AlignTop | Qt.AlignRight) 
-                image_wrapper.setFixedSize(scaled_pixmap.width(), scaled_pixmap.height())
-                self.gallery_layout.addWidget(image_wrapper, row, col)
-                                
-                col += 1
-                if col >= col_count:
-                    col = 0
-                    row += 1
+        # The file itself stays until no saved or open order uses it, see MediaStore.collect_garbage
+        self.media_store.remove('reference', entry.name)
+        self.model.remove_entry(row)
+
+    def _download_image(self, entry):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Image", entry.name,
+                                              "Images (*.png *.jpg *.jpeg *.bmp *.webp)")
+        if not path:
+            return
+        try:
+            shutil.copyfile(entry.path, path)  # Original bytes, no re-encoding
+            print(f"Image saved to: {path}")
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Could not save the image: {e}")
 
     def _image_clicked(self, path):
         absolute_path = os.path.abspath(path) 
@@ -130,14 +275,7 @@ class ItemInputDialog(QDialog):
             lbl = QLabel(label_text)
             lbl.setFixedWidth(65) # Fixed label width for alignment
             widget.setFixedWidth(input_width) # Fixed widget width
-
-            widget.setStyleSheet("""
-                QLineEdit, QComboBox {
-                    border: 1px solid #000000; /* Solid Black Border */
-                    border-radius: 0px;      /* Sharp corners */
-                    padding: 2px;
-                }
-            """)
+            set_role(widget, "cell")  # Square black border, see theme.py
             
             field_layout.addWidget(lbl)
             field_layout.addWidget(widget)
@@ -152,12 +290,12 @@ class ItemInputDialog(QDialog):
         
         # Fabric
         self.cloth_combo = QComboBox()
-        self.cloth_combo.addItems(["Cotton", "Platted", "Jabro"])
+        self.cloth_combo.addItems(FABRICS)
         single_row_layout.addWidget(create_field_layout("Fabric:", self.cloth_combo))
         
         # Type
         self.type_combo = QComboBox()
-        self.type_combo.addItems(["T-shirt", "Track-pant", "Shorts"])
+        self.type_combo.addItems(ITEM_TYPES)
         single_row_layout.addWidget(create_field_layout("Type:", self.type_combo))
 
         # Color
@@ -166,7 +304,7 @@ class ItemInputDialog(QDialog):
         
         # Size
         self.size_combo = QComboBox()
-        self.size_combo.addItems(["S", "M", "L", "XL", "XXL"])
+        self.size_combo.addItems(SIZES)
         single_row_layout.addWidget(create_field_layout("Size:", self.size_combo, 70))
 
         # 5. Quantity
@@ -179,7 +317,7 @@ class ItemInputDialog(QDialog):
         
         # 7. Status Field
         self.status_combo = QComboBox()
-        self.status_combo.addItems(["Pending", "Cutting", "Stretching", "Printing", "Completed"])
+        self.status_combo.addItems(ITEM_STATUSES)
         single_row_layout.addWidget(create_field_layout("Status:", self.status_combo, 120))
 
         # 8. Barcode Field
@@ -190,7 +328,7 @@ class ItemInputDialog(QDialog):
         # 9. Barcode Save Button
         self.barcode_save_btn = QPushButton("Save Barcode")
         self.barcode_save_btn.setFixedWidth(150) # Adjust width as needed
-        self.barcode_save_btn.setStyleSheet("background-color: #CCCCFF;") # Give it a unique look
+        self.barcode_save_btn.setObjectName("barcodeSave") # Give it a unique look
         #self.barcode_save_btn.hide()
 
         barcode_btn_layout = QHBoxLayout()
@@ -206,11 +344,11 @@ class ItemInputDialog(QDialog):
         self.remark_input = QLineEdit()
         self.remark_input.setPlaceholderText("Enter item-specific remark...")
         self.remark_input.setMinimumWidth(800) # Give it enough space
-        self.remark_input.setStyleSheet("QLineEdit { border: 1px solid black; border-radius: 0px; padding: 4px 6px; }")
+        set_role(self.remark_input, "box")
 
         remark_label = QLabel("Remark:")
         remark_label.setFixedWidth(70)
-        remark_label.setStyleSheet("font-weight: bold;")
+        set_role(remark_label, "heading")
         
         remark_container_layout = QHBoxLayout()
         remark_container_layout.setContentsMargins(0, 0, 0, 0)
@@ -234,16 +372,7 @@ class ItemInputDialog(QDialog):
             for btn in [self.job_btn, self.cut_btn, self.print_btn]:
                 btn.setFixedHeight(40)
                 btn.setFixedWidth(150)
-                btn.setStyleSheet("""
-                    QPushButton { 
-                        background-color: #CCCCFF; 
-                        font-weight: bold; 
-                        border: 1px solid #000000;
-                    }
-                    QPushButton:hover {
-                        background-color: #AAAAEE;
-                    }
-                """)
+                set_role(btn, "slip")
                 action_buttons_layout.addWidget(btn)
 
             action_buttons_layout.addStretch(1) # Push buttons to the left
@@ -254,6 +383,7 @@ class ItemInputDialog(QDialog):
             self.main_layout.addStretch(1) # Final stretch to push everything up
             self.job_btn.clicked.connect(self._open_job_work_dialog)
             self.cut_btn.clicked.connect(self._open_cutting_dialog)
+            self.print_btn.clicked.connect(self._open_printing_dialog)
 
         if not self.is_view_only:
             self.main_layout.addSpacing(5)
@@ -261,18 +391,7 @@ class ItemInputDialog(QDialog):
             self.main_layout.addSpacing(20)
             self.done_button = QPushButton("Done")
             self.done_button.setFixedWidth(120)
-
-            self.done_button.setStyleSheet("""
-                QPushButton {
-                    border: 1px solid #000000; 
-                    border-radius: 0px;
-                    padding: 5px; 
-                    background-color: #f0f0f0; 
-                }
-                QPushButton:hover {
-                    background-color: #e0e0e0; 
-                }
-            """)
+            set_role(self.done_button, "plain")
             self.done_button.clicked.connect(self.accept) 
             
             done_layout = QHBoxLayout()
@@ -282,6 +401,18 @@ class ItemInputDialog(QDialog):
 
             self.main_layout.addLayout(done_layout)
         
+    def reset(self):
+        """Back to a blank item, for reusing the dialog (see DialogCache)."""
+        self.setWindowTitle("Add New Item")
+        for combo in (self.cloth_combo, self.type_combo, self.size_combo, self.status_combo):
+            combo.setCurrentIndex(0)
+        self.color_input.setText("red")
+        self.qty_input.setText("1")
+        self.price_input.setText("200")
+        self.barcode_input.clear()
+        self.remark_input.clear()
+        set_state(self.barcode_save_btn, "saved", False)
+
     # Method to easily retrieve all data (Remains the same)
     def get_data(self):
         return {
@@ -296,6 +427,16 @@ class ItemInputDialog(QDialog):
             "Remark": self.remark_input.text()
         }
     
+    def _slip_line(self, item_data):
+        """The item being edited as an OrderLine, for the workshop slips (which only show what to make)."""
+        return OrderLine(fabric=item_data['Fabric'], item_type=item_data['Type'], color=item_data['Color'],
+                         size=item_data['Size'], qty=int(float(item_data['Qty'])))
+
+    def _slip_dialog(self, key, dialog_class):
+        """Workshop slip dialog, shared through the order form's DialogCache."""
+        form = self.parent()
+        return form.dialogs.get(key, lambda: dialog_class(form, ()))
+
     def _open_job_work_dialog(self):
         
         item_data = self.get_data() 
@@ -307,31 +448,10 @@ class ItemInputDialog(QDialog):
             QMessageBox.warning(self, "Invalid Data", "Quantity and Unit Price must be valid numbers.")
             return
 
-        product_details = f"{item_data['Fabric']} {item_data['Type']} ({item_data['Color']})"
-        html_content = f"""
-        <table style="width:100%; border-collapse: collapse;" class="item-table">
-            <thead>
-                <tr>
-                    <th style="border: 1px solid #ddd;">Fabric</th>
-                    <th style="border: 1px solid #ddd;">Type</th>
-                    <th style="border: 1px solid #ddd;">Color</th>
-                    <th style="border: 1px solid #ddd;">Size</th>
-                    <th style="border: 1px solid #ddd;">Quantity</th>
-                </tr>
-            </thead>
-            <tbody>
-                <tr>
-                    <td style="border: 1px solid #ddd;">{item_data['Fabric']}</td>
-                    <td style="border: 1px solid #ddd;">{item_data['Type']}</td>
-                    <td style="border: 1px solid #ddd;">{item_data['Color']}</td>
-                    <td style="border: 1px solid #ddd;">{item_data['Size']}</td>
-                    <td style="border: 1px solid #ddd;">{item_data['Qty']}</td>
-                </tr>
-            </tbody>
-        </table>
-        """
         try:
-            dialog = JobWorkPreviewDialog(self.parent(), html_content)
+            from prints import JobWorkPreviewDialog
+            dialog = self._slip_dialog("job_work", JobWorkPreviewDialog)
+            dialog.set_lines([self._slip_line(item_data)])
             dialog.exec()
         except NameError:
             QMessageBox.critical(self, "Error", "JobWorkPreviewDialog class not found. Ensure 'from prints import JobWorkPreviewDialog' is correct.")
@@ -347,31 +467,10 @@ class ItemInputDialog(QDialog):
             QMessageBox.warning(self, "Invalid Data", "Quantity and Unit Price must be valid numbers.")
             return
 
-        html_content = f"""
-        <table style="width:100%; border-collapse: collapse;" class="item-table">
-            <thead>
-                <tr>
-                    <th style="border: 1px solid #ddd;">Fabric</th>
-                    <th style="border: 1px solid #ddd;">Type</th>
-                    <th style="border: 1px solid #ddd;">Color</th>
-                    <th style="border: 1px solid #ddd;">Size</th>
-                    <th style="border: 1px solid #ddd;">Quantity</th>
-                </tr>
-            </thead>
-            <tbody>
-                <tr>
-                    <td style="border: 1px solid #ddd;">{item_data['Fabric']}</td>
-                    <td style="border: 1px solid #ddd;">{item_data['Type']}</td>
-                    <td style="border: 1px solid #ddd;">{item_data['Color']}</td>
-                    <td style="border: 1px solid #ddd;">{item_data['Size']}</td>
-                    <td style="border: 1px solid #ddd;">{item_data['Qty']}</td>
-                </tr>
-            </tbody>
-        </table>
-        """
-        
         try:
-            dialog = CuttingJobPreviewDialog(self.parent(), html_content) 
+            from prints import CuttingJobPreviewDialog
+            dialog = self._slip_dialog("cutting_slip", CuttingJobPreviewDialog)
+            dialog.set_lines([self._slip_line(item_data)])
             dialog.exec()
         except NameError:
             QMessageBox.critical(self, "Error", "CuttingJobPreviewDialog class not found. Check imports.")
@@ -379,24 +478,10 @@ class ItemInputDialog(QDialog):
             QMessageBox.critical(self, "Error", f"Could not launch Cutting Dialog: {e}")
 
     def _open_printing_dialog(self):
-        item_data = self.get_data() 
-
-        html_content = f"""
-        <table style="width:100%; border-collapse: collapse;" class="item-table">
-            <thead>
-                <tr>
-                    <th style="border: 1px solid #ddd;">Remark</th> 
-                    </tr>
-            </thead>
-            <tbody>
-                <tr>
-                    <td style="border: 1px solid #ddd;">{item_data['Remark']}</td>
-                </tr>
-            </tbody>
-        </table>
-        """
         try:
-            dialog = PrintingJobPreviewDialog(self.parent(), html_content) 
+            from prints import PrintingJobPreviewDialog
+            dialog = self._slip_dialog("printing_slip", PrintingJobPreviewDialog)
+            dialog.set_lines([])
             dialog.exec()
         except NameError:
             QMessageBox.critical(self, "Error", "PrintingJobPreviewDialog class not found. Check imports.")
@@ -420,6 +505,7 @@ class EmployeeDetailsDialog(QDialog):
         main_layout = QVBoxLayout(self)
         form_layout = QVBoxLayout()
         form_layout.setSpacing(10)
+        self._fields = {}  # data key -> line edit
 
         # --- Helper for fields ---
         def add_field(label_text, key, is_mandatory=True):
@@ -432,6 +518,7 @@ class EmployeeDetailsDialog(QDialog):
             line_edit = QLineEdit(self.current_data.get(key, ""))
             line_edit.setPlaceholderText(f"Enter {label_text}")
             setattr(self, key.replace(" ", "_").lower() + "_input", line_edit)
+            self._fields[key] = line_edit
             
             h_layout.addWidget(label)
             h_layout.addWidget(line_edit)
@@ -468,6 +555,13 @@ class EmployeeDetailsDialog(QDialog):
         
         main_layout.addLayout(button_layout)
         
+    def set_data(self, item_type, current_data=None):
+        """Refills the fields, for reusing the dialog (see DialogCache)."""
+        self.item_type = item_type.lower()
+        self.current_data = current_data if current_data is not None else {}
+        for key, line_edit in self._fields.items():
+            line_edit.setText(self.current_data.get(key, ""))
+
     def get_employee_data(self):
         """Returns the data collected in this dialog."""
         return {
@@ -477,17 +571,437 @@ class EmployeeDetailsDialog(QDialog):
             "Stretching Employee Name": self.stretching_employee_input.text()
         }
 
+def _split_list(text):
+    """"S, M ,L,,S" -> ["S", "M", "L"]"""
+    items = []
+    for part in text.split(","):
+        part = part.strip()
+        if part and part not in items:
+            items.append(part)
+    return items
+
+class SizeRunModel(QAbstractTableModel):
+    """Quantities of a size run: one row per colour, one column per size."""
+    def __init__(self, colors, sizes, parent=None):
+        super().__init__(parent)
+        self.colors = list(colors)
+        self.sizes = list(sizes)
+        self.quantities = {}  # (color, size) -> qty; kept when the colours/sizes are edited
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.colors)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.sizes)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            qty = self.quantities.get((self.colors[index.row()], self.sizes[index.column()]))
+            return str(qty) if qty else ""  # text, so the editor isn't a 0-99 spin box
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        text = str(value).strip()
+        try:
+            qty = int(text) if text else 0
+        except ValueError:
+            return False
+        if qty < 0:
+            return False
+        key = (self.colors[index.row()], self.sizes[index.column()])
+        if qty:
+            self.quantities[key] = qty
+        else:
+            self.quantities.pop(key, None)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        names = self.sizes if orientation == Qt.Horizontal else self.colors
+        return names[section] if section < len(names) else None
+
+    def set_axes(self, colors, sizes):
+        self.beginResetModel()
+        self.colors = list(colors)
+        self.sizes = list(sizes)
+        self.endResetModel()
+
+    def clear_quantities(self):
+        self.beginResetModel()
+        self.quantities = {}
+        self.endResetModel()
+
+    def cells(self):
+        """(color, size, qty) of every filled cell on the grid, row by row."""
+        return [(color, size, self.quantities[(color, size)])
+                for color in self.colors for size in self.sizes if (color, size) in self.quantities]
+
+class SizeRunDialog(QDialog):
+    """
+    Bulk item entry: quantities for every colour x size of one fabric and
+    type in a grid, added to the order as one batch (see
+    OrderForm._open_size_run_dialog). Once they are added the quantities are
+    cleared but the colours and sizes kept, so the next garment type is quick
+    to enter; a cancelled run is still there when the dialog is reopened.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Add a Size Run")
+        self.setMinimumSize(900, 450)
+
+        main_layout = QVBoxLayout(self)
+
+        row = QHBoxLayout()
+        row.setSpacing(20)
+        self.cloth_combo = QComboBox()
+        self.cloth_combo.addItems(FABRICS)
+        self.type_combo = QComboBox()
+        self.type_combo.addItems(ITEM_TYPES)
+        self.price_input = QLineEdit("200")
+        self.price_input.setFixedWidth(80)
+        self.status_combo = QComboBox()
+        self.status_combo.addItems(ITEM_STATUSES)
+        for label, widget in (("Fabric:", self.cloth_combo), ("Type:", self.type_combo),
+                              ("Unit Price:", self.price_input), ("Status:", self.status_combo)):
+            set_role(widget, "cell")
+            row.addWidget(QLabel(label))
+            row.addWidget(widget)
+        row.addStretch(1)
+        main_layout.addLayout(row)
+
+        axes = QGridLayout()
+        self.colors_input = QLineEdit("red")
+        self.colors_input.setPlaceholderText("red, blue, white, ...")
+        self.sizes_input = QLineEdit(", ".join(SIZES))
+        for r, (label, widget) in enumerate((("Colors:", self.colors_input), ("Sizes:", self.sizes_input))):
+            set_role(widget, "box")
+            axes.addWidget(QLabel(label), r, 0)
+            axes.addWidget(widget, r, 1)
+        main_layout.addLayout(axes)
+
+        self.model = SizeRunModel(_split_list(self.colors_input.text()), _split_list(self.sizes_input.text()), self)
+        self.grid = QTableView()
+        self.grid.setModel(self.model)
+        self.grid.setObjectName("sizeRunGrid")
+        main_layout.addWidget(self.grid)
+
+        self.remark_input = QLineEdit()
+        self.remark_input.setPlaceholderText("Remark for every line of this run...")
+        set_role(self.remark_input, "box")
+        main_layout.addWidget(self.remark_input)
+
+        buttons = QHBoxLayout()
+        self.total_label = QLabel("")
+        set_role(self.total_label, "heading")
+        self.add_button = QPushButton("Add to Order")
+        self.close_button = QPushButton("Close")
+        for btn in (self.add_button, self.close_button):
+            btn.setFixedWidth(140)
+            set_role(btn, "plain")
+        buttons.addWidget(self.total_label)
+        buttons.addStretch(1)
+        buttons.addWidget(self.add_button)
+        buttons.addWidget(self.close_button)
+        main_layout.addLayout(buttons)
+
+        self.colors_input.editingFinished.connect(self._update_axes)
+        self.sizes_input.editingFinished.connect(self._update_axes)
+        self.model.dataChanged.connect(self._update_total)
+        self.model.modelReset.connect(self._update_total)
+        self.add_button.clicked.connect(self._add_clicked)
+        self.close_button.clicked.connect(self.reject)
+        self._update_total()
+
+    def clear(self):
+        """After the run was added: new quantities, same colours and sizes."""
+        self.model.clear_quantities()
+        self.remark_input.clear()
+
+    def _update_axes(self):
+        self.model.set_axes(_split_list(self.colors_input.text()), _split_list(self.sizes_input.text()))
+
+    def _update_total(self, *args):
+        cells = self.model.cells()
+        self.total_label.setText(f"Total: {sum(qty for _, _, qty in cells)} pcs in {len(cells)} lines")
+
+    def _add_clicked(self):
+        self._update_axes()  # colours/sizes typed without leaving the field
+        try:
+            float(self.price_input.text())
+        except ValueError:
+            QMessageBox.warning(self, "Invalid Data", "Unit Price must be a valid number.")
+            return
+        if not self.model.cells():
+            QMessageBox.warning(self, "Nothing to Add", "Enter a quantity for at least one colour and size.")
+            return
+        self.accept()
+
+    def get_items(self):
+        """One item dict per filled cell, as ItemInputDialog.get_data() returns them."""
+        common = {
+            "Fabric": self.cloth_combo.currentText(),
+            "Type": self.type_combo.currentText(),
+            "Unit": self.price_input.text(),
+            "Status": self.status_combo.currentText(),
+            "Barcode": "",
+            "Remark": self.remark_input.text(),
+        }
+        return [{**common, "Color": color, "Size": size, "Qty": str(qty)} for color, size, qty in self.model.cells()]
+
+class ItemTableModel(QAbstractTableModel):
+    """Table view of an Order. All numbers live in the OrderLines, the view only formats them."""
+    HEADERS = ["Fabric", "Type", "Color", "Size", "Qty", "Unit", "Total price", "Status", "Action"]
+    ACTION_COLUMN = 8
+
+    _COLUMN_TEXT = (
+        lambda line: line.fabric,
+        lambda line: line.item_type,
+        lambda line: line.color,
+        lambda line: line.size,
+        lambda line: str(line.qty),
+        lambda line: f"{line.unit_price:.2f}",
+        lambda line: f"{line.total:.2f}",
+        lambda line: line.status,
+    )
+
+    def __init__(self, order, parent=None):
+        super().__init__(parent)
+        self.order = order
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.order.lines)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.DisplayRole and index.column() < self.ACTION_COLUMN:
+            return self._COLUMN_TEXT[index.column()](self.order.lines[index.row()])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self.HEADERS):
+            return self.HEADERS[section]
+        return None
+
+    def line(self, row):
+        return self.order.lines[row]
+
+    def append_line(self, line):
+        row = len(self.order.lines)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.order.add_line(line)
+        self.endInsertRows()
+        return row
+
+    def append_lines(self, lines):
+        """Appends many lines as one insert (one rowsInserted, one relayout); returns their rows."""
+        lines = list(lines)
+        if not lines:
+            return range(0)
+        first = len(self.order.lines)
+        self.beginInsertRows(QModelIndex(), first, first + len(lines) - 1)
+        self.order.add_lines(lines)
+        self.endInsertRows()
+        return range(first, first + len(lines))
+
+    def replace_line(self, row, line):
+        self.order.replace_line(row, line)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.ACTION_COLUMN - 1))
+
+    def set_lines(self, lines):
+        self.beginResetModel()
+        self.order.set_lines(lines)
+        self.endResetModel()
+
+    def remove_line(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        line = self.order.remove_line(row)
+        self.endRemoveRows()
+        return line
+
+class _OrderPageSignals(QObject):
+    page_ready = pyqtSignal(int, list)  # generation, rows
+    failed = pyqtSignal(int, str)  # generation, error (empty when cancelled)
+
+class OrderPageTask(QRunnable):
+    """Fetches one page of orders from the store on a worker thread."""
+    def __init__(self, store, generation, query, after, limit):
+        super().__init__()
+        self.setAutoDelete(False)  # the model keeps the Python object alive until it is done
+        self.signals = _OrderPageSignals()
+        self.store = store
+        self.generation = generation
+        self.query = query
+        self.after = after
+        self.limit = limit
+        self.cancelled = False
+        self._conn = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self._conn is not None:
+            self._conn.interrupt()  # aborts a query already running in SQLite
+
+    def run(self):
+        # Always ends with exactly one signal, so the model never waits on a task that is gone
+        rows, error = None, ""
+        try:
+            if not self.cancelled:
+                self._conn = self.store.connection()
+                if self.query:
+                    rows = self.store.search(self.query, limit=self.limit, after=self.after)
+                else:
+                    rows = self.store.list_orders(limit=self.limit, after=self.after)
+        except Exception as e:
+            if not self.cancelled:  # an interrupted query raises too
+                error = str(e) or type(e).__name__
+        finally:
+            self._conn = None
+            if rows is not None and not self.cancelled:
+                self.signals.page_ready.emit(self.generation, rows)
+            else:
+                self.signals.failed.emit(self.generation, error)
+
+class OrderListModel(QAbstractListModel):
+    """
+    Saved orders for the search window, pulled from the OrderStore one page at a
+    time as the view scrolls (canFetchMore/fetchMore), so only what is on screen
+    has been loaded no matter how many orders the shop has.
+
+    Queries never run on the GUI thread: typing is debounced, each page is fetched
+    by an OrderPageTask, and results of a query that has since changed are dropped.
+    """
+    PAGE_SIZE = 100
+    DEBOUNCE_MS = 200
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._rows = []
+        self._query = ""
+        self._exhausted = False
+        self._generation = 0
+        self._task = None
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(lambda: self.set_query(self._pending_query))
+        self._pending_query = ""
+
+    def schedule_query(self, text):
+        """Called on every keystroke; the query only runs once typing pauses."""
+        self._pending_query = text
+        self._debounce.start()
+
+    def set_query(self, text):
+        self._cancel_task()
+        self._generation += 1
+        self.beginResetModel()
+        self._rows = []
+        self._query = text.strip()
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        order = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"Order {order['order_number']} | {order['party_name']} | {order['school_name']} | ₹{order['total']:.2f}"
+        if role == Qt.UserRole:
+            return order
+        return None
+
+    def order_at(self, row):
+        return self._rows[row]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and self._task is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._task is not None:
+            return
+        after = None
+        if self._rows:  # keyset of the last row shown, see OrderStore.search/list_orders
+            last = self._rows[-1]
+            after = (last['rank'], last['updated_at'], last['id']) if self._query else (last['order_date'], last['id'])
+        task = OrderPageTask(self.store, self._generation, self._query, after, self.PAGE_SIZE)
+        task.signals.page_ready.connect(self._on_page_ready)
+        task.signals.failed.connect(self._on_page_failed)
+        self._task = task
+        self._pool.start(task)
+
+    def _cancel_task(self):
+        task = self._task
+        self._task = None
+        if task is not None:
+            task.cancel()
+            self._pool.tryTake(task)  # drops it if no worker picked it up yet
+
+    def _on_page_ready(self, generation, page):
+        if generation != self._generation:
+            return  # stale: the query changed while this page was loading, _task is already the new one
+        self._task = None
+        if len(page) < self.PAGE_SIZE:
+            self._exhausted = True
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def _on_page_failed(self, generation, error):
+        if generation != self._generation:
+            return
+        self._task = None
+        if error:
+            print(f"Warning: Could not load orders: {error}")
+            self._exhausted = True  # don't retry on every scroll; the next query starts over
+
 class OrderForm(QWidget):
-    REFERENCE_DIR = globals().get('REFERENCE_DIR')
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Order Form")
-        self.setStyleSheet("background-color: #F5FFFA")
+        self.setObjectName("orderForm")  # Window colour, see theme.py
         self.reference_image_paths = []
+        self.revision = 0  # Bumped on every edit; print dialogs rebuild their document when it changes
         self.current_reference_image_path = None
     
         # ✅ सबसे पहले image और बाकी variables init करो
-        self.image = None
+        self._template_path = None  # Template shown on the canvas
+        self._template_name = None  # ...and its display name (media/layouts/<NAME>.json, if any, overrides the default callouts)
+        self._entry_positions = None
+        self._canvas_snapshot = None  # Memoised data URI, see _capture_canvas_as_base64
+        self.render_cache = TemplateRenderCache()
+        self._placeholder_items = []
+        self._arrow_item = None
+        self._arrow_path = None
         self.scene = None
         self.canvas = None
         self.entries = {}
@@ -496,7 +1010,19 @@ class OrderForm(QWidget):
         self._tax_percentage = 0.0
         self._tax_amount = 0.0
         self._grand_total = 0.0
-        self.item_collar_flags = []
+        self.order = Order()
+        self.item_model = ItemTableModel(self.order, self)
+        self._order_store = None
+        self.dialogs = DialogCache()  # Item/employee/gallery/print dialogs, built on first use
+
+        # Template and reference images (old media/ folders are indexed once, in place)
+        with startup_profile.phase("media_store"):
+            self.media_store = MediaStore(MEDIA_ROOT)
+            self.media_store.import_directory('template', TEMPLATE_DIR, _template_display_name)
+            self.media_store.import_directory('reference', REFERENCE_DIR)
+            self.media_store.collect_garbage()  # images removed from the gallery last session
+            self.thumbnail_loader = ThumbnailLoader(ThumbnailCache(), self)
+            self.print_images = PrintImageCache()
 
         # 🔹 Main vertical layout
         self.main_layout = QVBoxLayout(self)
@@ -504,33 +1030,73 @@ class OrderForm(QWidget):
         self.main_layout.setSpacing(2)
 
         # Toolbar
-        toolbar = self.main_toolbar()
+        with startup_profile.phase("main_toolbar"):
+            toolbar = self.main_toolbar()
         self.main_layout.addWidget(toolbar, alignment=Qt.AlignLeft | Qt.AlignTop)
 
         # Header
-        header = self.header()
+        with startup_profile.phase("header"):
+            header = self.header()
         self.main_layout.addWidget(header, alignment=Qt.AlignLeft | Qt.AlignTop)
 
-        # Product + Image Panel
-        product_panel = self._product_and_image_panel()
+        # Product + Image Panel (times _build_options_panel separately, inside)
+        with startup_profile.phase("_product_and_image_panel"):
+            product_panel = self._product_and_image_panel()
         self.main_layout.addWidget(product_panel, alignment=Qt.AlignLeft | Qt.AlignTop)
 
        
         # Pehla row add karte hi dikhega
-        item_box=self.create_item_selection_box()
+        with startup_profile.phase("create_item_selection_box"):
+            item_box=self.create_item_selection_box()
         self.main_layout.addWidget(item_box)
 
-        self.setup_tax_and_remark_fields()
+        with startup_profile.phase("setup_tax_and_remark_fields"):
+            self.setup_tax_and_remark_fields()
       
-        self.main_layout.addLayout(self.create_buttons_row())
+        with startup_profile.phase("create_buttons_row"):
+            self.main_layout.addLayout(self.create_buttons_row())
         # Add row panel first
 
+        # Snapshot of the untouched form, used by CANCEL when nothing was saved yet
+        self._saved_payload = None
+        with startup_profile.phase("blank_state"):
+            self._blank_state = self.get_order_state()
+
         self.main_layout.addStretch()
+        self._track_changes()
+
+    def _track_changes(self):
+        """Any edit on the form (fields, options, items) bumps self.revision."""
+        self._track_widget_changes(self)
+        for signal in (self.item_model.dataChanged, self.item_model.rowsInserted,
+                       self.item_model.rowsRemoved, self.item_model.modelReset):
+            signal.connect(self._mark_dirty)
+
+    def _track_widget_changes(self, root):
+        # Also used for widgets built later (Track Pant options)
+        for widget in root.findChildren(QLineEdit):
+            widget.textChanged.connect(self._mark_dirty)
+        for widget in root.findChildren(QComboBox):
+            widget.currentTextChanged.connect(self._mark_dirty)
+        for widget in root.findChildren(QAbstractButton):
+            widget.toggled.connect(self._mark_dirty)
+        for widget in root.findChildren(QDateEdit):
+            widget.dateChanged.connect(self._mark_dirty)
+        for widget in root.findChildren(QDoubleSpinBox):
+            widget.valueChanged.connect(self._mark_dirty)
+
+    def _mark_dirty(self, *args):
+        self.revision += 1
+
+    def _gallery(self):
+        def build():
+            gallery = ImageGalleryWindow(self.media_store, self.thumbnail_loader, parent=self)
+            gallery.image_selected.connect(self._set_current_reference_image)
+            return gallery
+        return self.dialogs.get("gallery", build)
 
     def open_gallery(self):
-        self.image_gallery_window = ImageGalleryWindow(self.REFERENCE_DIR, parent=self)
-        
-        self.image_gallery_window.image_selected.connect(self._set_current_reference_image) 
+        self.image_gallery_window = self._gallery()
         
         result = self.image_gallery_window.exec_()
         
@@ -542,14 +1108,13 @@ class OrderForm(QWidget):
         base64_uris = []
         
         # --- ITERATE OVER THE LIST OF PATHS ---
+        # Downscaled to print size once per photo, then served from the cache
         for path in self.reference_image_paths:
             if path and os.path.exists(path):
                 try:
-                    with open(path, "rb") as image_file:
-                        encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-                        ext = os.path.splitext(path)[1].lower()
-                        mime = 'image/jpeg' if ext in ['.jpg', '.jpeg'] else 'image/png'
-                        base64_uris.append(f"data:{mime};base64,{encoded_string}")
+                    uri = self.print_images.data_uri(path, self.media_store.digest_for_path(path))
+                    if uri:
+                        base64_uris.append(uri)
                 except Exception as e:
                     print(f"Error converting reference image to base64: {e}") 
         # ---------------------------------------  
@@ -571,18 +1136,7 @@ class OrderForm(QWidget):
             btn.setShortcut(shortcut)
 
         # Styling
-        btn.setStyleSheet("""
-            QToolButton {
-                background-color: #EEEEEE;
-                color: #fc83a0;
-                font-weight: bold;
-                border: 1px solid #CCCCCC;
-            }
-            QToolButton:hover {
-                background-color: #fc83a0;
-                color: white;
-            }
-        """)
+        set_role(btn, "toolbar")
         return btn
 
     def main_toolbar(self):
@@ -618,6 +1172,7 @@ class OrderForm(QWidget):
         self.search_btn = QPushButton("🔍\n Search-Ctrl+F"); self.search_btn.setShortcut("Ctrl+F")
         self.search_btn.clicked.connect(self.open_search_window)
         self.print_btn = QPushButton("🖨\n Print-Ctrl+P"); self.print_btn.setShortcut("Ctrl+P")
+        self.export_btn = QPushButton("📦\n Batch Export")
 
         self.top_btn = QPushButton("▲\n Top")
         self.back_btn = QPushButton("◀\n Back");  self.back_btn.setShortcut("Alt+Left")
@@ -628,29 +1183,26 @@ class OrderForm(QWidget):
         self.tutor_btn = QPushButton("❔\n TUTOR")
         self.upload_btn=QPushButton("Upload")
         self.previous_btn=QPushButton("previous")
+        self.theme_btn = QPushButton("🎨\n Theme")
 
        #Connections 
 
         self.upload_btn.clicked.connect(self._upload_reference_image) 
         self.previous_btn.clicked.connect(self._open_image_gallery) 
         self.print_btn.clicked.connect(self.open_print_dialog)
+        self.export_btn.clicked.connect(self.open_batch_export)
+        self.theme_btn.clicked.connect(theme.next_theme)
        # Common style
-        button_style = """
-            background-color: #EEEEEE; 
-            color: #fc83a0; 
-            font-weight: bold; 
-            padding: 10px;
-        """
         all_buttons = [
-            self.new_btn, self.edit_btn, self.delete_btn, self.search_btn, self.print_btn,
+            self.new_btn, self.edit_btn, self.delete_btn, self.search_btn, self.print_btn, self.export_btn,
             self.top_btn, self.back_btn, self.next_btn, self.last_btn,
-            self.exit_btn, self.tutor_btn,self.upload_btn,self.previous_btn
+            self.exit_btn, self.tutor_btn, self.theme_btn, self.upload_btn, self.previous_btn
         ]
         for btn in all_buttons:
-            btn.setStyleSheet(button_style)
+            set_role(btn, "toolbar")
 
         # 🔹 Group 1 (left buttons)
-        for btn in [self.new_btn, self.edit_btn, self.delete_btn, self.search_btn, self.print_btn]:
+        for btn in [self.new_btn, self.edit_btn, self.delete_btn, self.search_btn, self.print_btn, self.export_btn]:
             btn.setFixedSize(150, 70)
             left_layout.addWidget(btn)
 
@@ -660,7 +1212,7 @@ class OrderForm(QWidget):
             mid_layout.addWidget(btn)
 
         # 🔹 Group 3 (right buttons)
-        for btn in [self.exit_btn, self.tutor_btn,self.upload_btn,self.previous_btn]:
+        for btn in [self.exit_btn, self.tutor_btn, self.theme_btn, self.upload_btn, self.previous_btn]:
             # btn.setFixedSize(150, 70)
             # right_layout.addWidget(btn)
             if btn in [self.upload_btn, self.previous_btn]:
@@ -669,7 +1221,7 @@ class OrderForm(QWidget):
                 btn.setFixedSize(150, 70)  # normal height
             right_layout.addWidget(btn)
 
-            if btn==self.tutor_btn:
+            if btn==self.theme_btn:
                 right_layout.addSpacing(20)
 
         # 🔹 Add layouts to main layout with spacing only between groups
@@ -686,44 +1238,37 @@ class OrderForm(QWidget):
         container = QWidget()
         main_layout = QVBoxLayout(container)
 
-        button_style = """
-            background-color: #EEEEEE; 
-            color: #fc83a0; 
-            font-weight: bold; 
-            padding: 10px;
-        """
-
         # ---------- 1st Row ----------
         row1 = QHBoxLayout()
         self.order_number = QLineEdit()
-        self.order_number.setStyleSheet("background-color: white; border: 1px solid gray; padding: 3px;")
+        set_role(self.order_number, "field")
       
         self.order_date = QDateEdit()
         self.order_date.setCalendarPopup(True)
         self.order_date.setDisplayFormat("dd-MM-yyyy")
         self.order_date.setDate(QDate.currentDate())
-        self.order_date.setStyleSheet("background-color: white; border: 1px solid gray; padding: 3px;")
+        set_role(self.order_date, "field")
         
        
         self.delivery_date = QDateEdit()
         self.delivery_date.setCalendarPopup(True)
         self.delivery_date.setDisplayFormat("dd-MM-yyyy")
-        self.delivery_date.setStyleSheet("background-color: white; border: 1px solid gray; padding: 3px;")
+        set_role(self.delivery_date, "field")
         
         
         self.barcode_number = QLineEdit()
-        self.barcode_number.setStyleSheet("background-color: white; border: 1px solid gray; padding: 3px;")
+        set_role(self.barcode_number, "field")
         self.save_barcode_btn = QPushButton("Save Barcode")
-        self.save_barcode_btn.setStyleSheet(button_style)
+        set_role(self.save_barcode_btn, "toolbar")
         
         self.gst_no = QLineEdit()
         self.gst_no.setFixedSize(200,30)
-        self.gst_no.setStyleSheet("background-color: white; border: 1px solid gray; padding: 3px;")
+        set_role(self.gst_no, "field")
         
         self.advance_paid = QDoubleSpinBox()
         self.advance_paid.setPrefix("₹ ")
         self.advance_paid.setMaximum(9999999)
-        self.advance_paid.setStyleSheet("background-color: white; border: 1px solid gray; padding: 3px;")
+        set_role(self.advance_paid, "field")
 
 
         row1.addWidget(QLabel("Order No:"))
@@ -746,13 +1291,13 @@ class OrderForm(QWidget):
         if parties:
             self.party_name.addItems(parties)
         self.party_name.setFixedSize(250,30)
-        self.party_name.setStyleSheet("background-color: white; border: 1px solid gray; padding: 3px;")
+        set_role(self.party_name, "field")
         self.school_name = QLineEdit()
-        self.school_name.setStyleSheet("background-color: white; border: 1px solid gray; padding: 3px;")
+        set_role(self.school_name, "field")
         # self.gst_no = QLineEdit()
         # self.gst_no.setStyleSheet("background-color: white; border: 1px solid gray; padding: 3px;")
         self.address = QLineEdit()
-        self.address.setStyleSheet("background-color: white; border: 1px solid gray; padding: 3px;")
+        set_role(self.address, "field")
         self.address.setFixedHeight(30)
 
         row2.addWidget(QLabel("Party Name:"))
@@ -772,7 +1317,7 @@ class OrderForm(QWidget):
     
     def _open_image_gallery(self):
         
-        gallery = ImageGalleryWindow(media_dir=REFERENCE_DIR, parent=self)
+        gallery = self._gallery()
         gallery.exec_() 
 
     def _upload_reference_image(self):
@@ -782,24 +1327,23 @@ class OrderForm(QWidget):
         )
         
         if path:
-            temp_pixmap = QPixmap(path)            
-            original_filename = os.path.basename(path)
-            destination_path = os.path.join(REFERENCE_DIR, original_filename)             
-            if temp_pixmap.isNull():
+            if not QImageReader(path).canRead():  # checks the header, doesn't decode
                 print("Error: Could not load the image.")
                 return
 
-            if temp_pixmap.save(destination_path):
-                print(f"Customer reference image saved to: {destination_path}")
-                
-                # --- CHANGE HERE: Append to the list ---
-                if destination_path not in self.reference_image_paths:
-                    self.reference_image_paths.append(destination_path)
-                # ----------------------------------------
-                
-                print(f"Total reference images: {len(self.reference_image_paths)}") 
-            else:
-                print(f"Error: Could not save reference image to {destination_path}")
+            try:
+                # Stored once per content, copied as-is (no re-encode)
+                entry = self.media_store.add_file(path, 'reference')
+            except OSError as e:
+                print(f"Error: Could not save reference image: {e}")
+                return
+            print(f"Customer reference image saved to: {entry.path}")
+
+            if entry.path not in self.reference_image_paths:
+                self.reference_image_paths.append(entry.path)
+                self._mark_dirty()
+
+            print(f"Total reference images: {len(self.reference_image_paths)}") 
                         
     def _product_and_image_panel(self):
         """Middle row: left = product image canvas, right = options card"""
@@ -812,20 +1356,13 @@ class OrderForm(QWidget):
         top_bar = QHBoxLayout()
 
         lbl = QLabel("PRODUCT IMAGE :")
-        lbl.setStyleSheet("border: none;") 
         lbl.setFixedWidth(170)
         self.cmb = QComboBox()
-        self.display_to_filename_map = {}
+        self.display_to_path_map = {}
         self.display_names = ["SELECT"] 
-        if os.path.isdir(TEMPLATE_DIR):
-            image_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
-            
-            for filename in os.listdir(TEMPLATE_DIR):
-                if filename.lower().endswith(image_extensions):
-                    name_without_ext = os.path.splitext(filename)[0]
-                    display_name = name_without_ext.upper()                    
-                    self.display_names.append(display_name)
-                    self.display_to_filename_map[display_name] = filename
+        for entry in self.media_store.entries('template'):
+            self.display_names.append(entry.name)
+            self.display_to_path_map[entry.name] = entry.path
         
         self.cmb.addItems(self.display_names)
 
@@ -835,7 +1372,7 @@ class OrderForm(QWidget):
 
         btn_upload = QPushButton("+")
         btn_upload.setFixedWidth(80)
-        btn_upload.setStyleSheet("background-color:#2563eb; color:white;")
+        btn_upload.setObjectName("uploadTemplate")
         btn_upload.clicked.connect(self._upload_image)
 
         top_bar.addWidget(lbl)
@@ -846,20 +1383,21 @@ class OrderForm(QWidget):
         self.scene = QGraphicsScene()
         self.canvas = QGraphicsView(self.scene)
         self.canvas.setFixedSize(525, 300)
-        self.canvas.setStyleSheet("background:#fafafa; border:1px solid #d1d5db;")
+        self.canvas.setObjectName("canvas")
 
         left_layout.addLayout(top_bar)
         left_layout.addWidget(self.canvas)
         left_frame = QFrame()   # 👈 अब define कर दिया
         left_frame.setLayout(left_layout)
         left_frame.setFixedWidth(550)
-        left_frame.setStyleSheet("background:white; border:1px solid #ddd;")
+        left_frame.setObjectName("productPanel")
      
         # 🔹 RIGHT PANEL (Options)
        
         right_frame = QFrame()
         right_layout = QVBoxLayout(right_frame)
-        build_option = self._build_options_panel()   # 👈 अब parent नको
+        with startup_profile.phase("_build_options_panel"):
+            build_option = self._build_options_panel()   # 👈 अब parent नको
         right_layout.addWidget(build_option)
         #right_frame.setFixedWidth(700)   # 👈 इथे width adjust करा
         # right_frame.setStyleSheet("background:white; border:1px solid #ddd;")
@@ -867,20 +1405,19 @@ class OrderForm(QWidget):
         main_layout.addWidget(left_frame)
         # main_layout.addWidget(second_frame)
         main_layout.addWidget(right_frame)
-        default_file = "NEW REGULAR COLER.jpg"
-        default_image_path = os.path.join(TEMPLATE_DIR, default_file)
+        default_image_path = self.display_to_path_map.get(DEFAULT_TEMPLATE)
 
-        if os.path.exists(default_image_path):
-            self.image = QPixmap(default_image_path)
-            
-            default_display_name = os.path.splitext(default_file)[0].upper()
+        if default_image_path and not self.render_cache.template(default_image_path).isNull():
+            self._template_path = default_image_path
+            self._template_name = DEFAULT_TEMPLATE
             
-            index = self.cmb.findText(default_display_name)
+            index = self.cmb.findText(DEFAULT_TEMPLATE)
             if index != -1:
                 self.cmb.setCurrentIndex(index)
                 
         else:
-            self.image = None
+            self._template_path = None
+            self._template_name = None
             self.cmb.setCurrentText("SELECT")
         self._render_image()
 
@@ -889,61 +1426,26 @@ class OrderForm(QWidget):
     def _change_image_from_select(self, display_name):
         if display_name == "SELECT" or not display_name:
             return
-        filename = self.display_to_filename_map.get(display_name)
-        if filename:
-            image_path = os.path.join(TEMPLATE_DIR, filename)
-            
-            if os.path.exists(image_path):
-                new_image = QPixmap(image_path)
-                
-                if not new_image.isNull():
-                    self.image = new_image
-                    self._render_image()
+        image_path = self.display_to_path_map.get(display_name)
+        if image_path:
+            # Decoded once per template; switching back is a cache hit
+            if not self.render_cache.template(image_path).isNull():
+                self._template_path = image_path
+                self._template_name = display_name
+                self._render_image()
 
     def _build_options_panel(self):
         parent = QWidget()
         layout = QGridLayout(parent)
 
        
-        INPUT_STYLE = """
-            background-color: white;
-            border: 1px solid gray;
-            padding: 3px;
-        """
-
-        # --- Style Constants for Dimming ---
-        DIM_COLOR = "#A9A9A9"
-        NORMAL_COLOR = "#000000"
-        DIM_INPUT_STYLE = f"""
-            background-color: white;
-            border: 1px solid {DIM_COLOR};
-            color: {DIM_COLOR};
-            padding: 3px;
-        """
-
-        GROUPBOX_STYLE = """
-            QGroupBox {
-                border: 1px solid #d1d5db; 
-                border-radius: 4px; 
-                margin-top: 15px; 
-                padding-top: 20px; 
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top left;
-                background-color: #F0FFF0;
-                padding: 0 5px; 
-                padding-bottom: 2px;
-                margin-left: 5px; 
-                margin-top: -1px; 
-            }
-        """
+        # Looks come from theme.py: price boxes are role "field", sections role "options"
 
     # ========== Printing Options ==========
         default_prices = {'front': '5', 'back': '7', 'patch': '5', 'embroidery': '15', 'Dtf': '0', 'Front sablimation': '60', 'Back sablimation': '60'}
         sec_print = QGroupBox("Printing Options", parent)
         grid_print = QGridLayout(sec_print)
-        sec_print.setStyleSheet(GROUPBOX_STYLE)
+        set_role(sec_print, "options")
         sec_print.setMaximumWidth(350)
         #sec_print.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Preferred)
 
@@ -955,7 +1457,7 @@ class OrderForm(QWidget):
             default_price = default_prices.get(key, "0")
             cb = QCheckBox(key.upper())
             price_edit = QLineEdit(default_price)
-            price_edit.setStyleSheet(INPUT_STYLE)
+            set_role(price_edit, "field")
             price_edit.setEnabled(False)
 
             def toggle(state, entry=price_edit):
@@ -975,7 +1477,7 @@ class OrderForm(QWidget):
    # ========== Collar Options ==========
         sec1 = QGroupBox("Collar Options", parent)
         grid1 = QGridLayout(sec1)
-        sec1.setStyleSheet(GROUPBOX_STYLE)
+        set_role(sec1, "options")
         #sec1.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Preferred)
         sec1.setMinimumWidth(250)
         sec1.setContentsMargins(20,0,50,0)
@@ -988,13 +1490,14 @@ class OrderForm(QWidget):
         self.collar_price_rib.setFixedWidth(50)
         self.collar_price_patti = QLineEdit("10")
         self.collar_price_patti.setFixedWidth(50)
+        for price_edit in (self.collar_price_self, self.collar_price_rib, self.collar_price_patti):
+            set_role(price_edit, "field")
 
         self.collar_cloth = QComboBox()
         self.collar_cloth.addItems(["Cotton", "Polyester", "Blended", "Other"])
         
         def _style_price_only(checked, lineedit):
-            input_style = INPUT_STYLE if checked else DIM_INPUT_STYLE
-            lineedit.setStyleSheet(input_style)
+            set_state(lineedit, "dimmed", not checked)
 
         # --- Self Collar ---
         self.rb_self = QCheckBox("Self Collar")
@@ -1024,10 +1527,6 @@ class OrderForm(QWidget):
 
         layout.addWidget(sec1, 0, 1)
         
-        self.rb_self.setStyleSheet(f"color: {NORMAL_COLOR};") 
-        self.rb_rib.setStyleSheet(f"color: {NORMAL_COLOR};")
-        self.rb_patti.setStyleSheet(f"color: {NORMAL_COLOR};")
-        
         _style_price_only(self.rb_self.isChecked(), self.collar_price_self)
         _style_price_only(self.rb_rib.isChecked(), self.collar_price_rib)
         _style_price_only(self.rb_patti.isChecked(), self.collar_price_patti)
@@ -1035,7 +1534,7 @@ class OrderForm(QWidget):
         # ========== Button and Style Options ==========
         sec_button = QGroupBox("Button Options", parent)
         grid_button = QGridLayout(sec_button)
-        sec_button.setStyleSheet(GROUPBOX_STYLE)
+        set_role(sec_button, "options")
 
         self.style_var = "button"
         self.rb_button = QCheckBox("BUTTON")
@@ -1060,49 +1559,27 @@ class OrderForm(QWidget):
         layout.addWidget(sec_button,0,2)
 
         # ========== Track Pant Options (NEW SECTION) ==========
+        # Rarely used: the option rows are built the first time the section is
+        # expanded (see _ensure_track_options). Until then track_vars is empty
+        # and the options are at their defaults.
 
         sec_track = QGroupBox("Track Pant Options", parent)
         grid_track = QGridLayout(sec_track)
-        sec_track.setStyleSheet(GROUPBOX_STYLE)
+        set_role(sec_track, "options")
         sec_track.setContentsMargins(5, 5, 5, 5)
         sec_track.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Preferred)
         sec_track.setContentsMargins(20,0,20,0)
 
-        track_options = {
-            'Dori': '0',
-            '1 Piping': '2',
-            '2 Piping': '6',
-            'Other': '0'
-        }
         self.track_vars = {}
         self.track_extra_vars = {} 
+        self._track_section = sec_track
+        self._track_body = None
 
-        for idx, (key, default_price) in enumerate(track_options.items()):
-            cb = QCheckBox(key)
-            price_edit = QLineEdit(default_price)
-            price_edit.setStyleSheet(INPUT_STYLE)
-            price_edit.setEnabled(True) 
-            price_edit.setFixedWidth(60)
-
-            # --- New Extra Input Box ---
-            extra_edit = QLineEdit("")
-            extra_edit.setPlaceholderText("")
-            extra_edit.setStyleSheet(INPUT_STYLE)
-            extra_edit.setFixedWidth(60)
-            extra_edit.setEnabled(True) 
-
-            def toggle_track_price(state, entry=price_edit, extra=extra_edit):
-                entry.setEnabled(state == Qt.Checked)
-                extra.setEnabled(state == Qt.Checked)
-
-            cb.stateChanged.connect(toggle_track_price)
-            self.track_vars[key] = (cb, price_edit)
-            self.track_extra_vars[key] = extra_edit 
-
-            grid_track.addWidget(cb, idx, 0)
-            grid_track.addWidget(QLabel("Price"), idx, 1)
-            grid_track.addWidget(price_edit, idx, 2) 
-            grid_track.addWidget(extra_edit, idx, 3)
+        self.track_toggle = QToolButton()
+        self.track_toggle.setText("Show ▸")
+        self.track_toggle.setCheckable(True)
+        self.track_toggle.toggled.connect(self._toggle_track_options)
+        grid_track.addWidget(self.track_toggle, 0, 0, alignment=Qt.AlignLeft)
 
         layout.addWidget(sec_track, 0, 3) 
 
@@ -1113,14 +1590,6 @@ class OrderForm(QWidget):
         layout.setColumnStretch(4, 1)
        
         # Status layout
-        COMBO_BOX_STYLE = """
-            QComboBox {
-                /* Define a clean, solid border */
-                border: 1px solid #777; 
-                border-radius: 3px;
-            }
-        """
-
         status_widget = QWidget()
         status_layout = QHBoxLayout(status_widget)
         status_layout.setContentsMargins(2,2,2,2)
@@ -1141,7 +1610,7 @@ class OrderForm(QWidget):
         self.status_combo.addItem("Printing")
         self.status_combo.addItem("Completed")
         self.status_combo.setFixedWidth(200)
-        self.status_combo.setStyleSheet(COMBO_BOX_STYLE) 
+        self.status_combo.setObjectName("orderStatus")
         font = self.status_combo.font()
         font.setPointSize(11)
         self.status_combo.setFont(font)
@@ -1155,183 +1624,171 @@ class OrderForm(QWidget):
         # ===== Finally return parent =====
         return parent
                 
+    def _toggle_track_options(self, expanded):
+        if expanded:
+            self._ensure_track_options()
+        if self._track_body is not None:
+            self._track_body.setVisible(expanded)
+        self.track_toggle.setText("Hide ▾" if expanded else "Show ▸")
+
+    def _ensure_track_options(self):
+        """Builds the Track Pant option rows (once)."""
+        if self._track_body is not None:
+            return
+        body = QWidget()
+        grid_track = QGridLayout(body)
+        grid_track.setContentsMargins(0, 0, 0, 0)
+
+        for idx, (key, default_price) in enumerate(TRACK_OPTIONS.items()):
+            cb = QCheckBox(key)
+            price_edit = QLineEdit(default_price)
+            set_role(price_edit, "field")
+            price_edit.setEnabled(True) 
+            price_edit.setFixedWidth(60)
+
+            # --- New Extra Input Box ---
+            extra_edit = QLineEdit("")
+            extra_edit.setPlaceholderText("")
+            set_role(extra_edit, "field")
+            extra_edit.setFixedWidth(60)
+            extra_edit.setEnabled(True) 
+
+            def toggle_track_price(state, entry=price_edit, extra=extra_edit):
+                entry.setEnabled(state == Qt.Checked)
+                extra.setEnabled(state == Qt.Checked)
+
+            cb.stateChanged.connect(toggle_track_price)
+            self.track_vars[key] = (cb, price_edit)
+            self.track_extra_vars[key] = extra_edit 
+
+            grid_track.addWidget(cb, idx, 0)
+            grid_track.addWidget(QLabel("Price"), idx, 1)
+            grid_track.addWidget(price_edit, idx, 2) 
+            grid_track.addWidget(extra_edit, idx, 3)
+
+        self._track_section.layout().addWidget(body, 1, 0)
+        self._track_body = body
+        self._track_widget_changes(body)
+
+    def _track_options_state(self):
+        if not self.track_vars:  # never expanded: still the defaults
+            return {key: [False, price, ""] for key, price in TRACK_OPTIONS.items()}
+        return {key: [cb.isChecked(), edit.text(), self.track_extra_vars[key].text()]
+                for key, (cb, edit) in self.track_vars.items()}
+
     def _upload_image(self):
         path, _ = QFileDialog.getOpenFileName(
             self, "Select Image", "", "Images (*.png *.jpg *.jpeg *.bmp *.webp)"
         )
-        if path:
-            self.image = QPixmap(path)
-            self._render_image()
+        if not path:
+            return
+        if not QImageReader(path).canRead():  # checks the header, doesn't decode
+            print("Error: Could not load the image.")
+            return
 
-        # 3. Define the new filename for storage
-        # We use the original file's name but ensure it's saved in MEDIA_DIR
-        original_filename = os.path.basename(path)
-        
-        # Create a display name (e.g., "my_shirt.png" -> "MY_SHIRT")
-        name_without_ext = os.path.splitext(original_filename)[0]
-        display_name = name_without_ext.upper()
-        
-        # 4. Save the file permanently to MEDIA_DIR
-        destination_path = os.path.join(TEMPLATE_DIR, original_filename)
-        
-        # Only save if the file isn't already there (or overwrite it)
-        if not os.path.exists(destination_path) or path != destination_path:
-            # We use the QPixmap's save method for reliable saving
-            # NOTE: self.image is the QPixmap loaded from 'path'
-            success = self.image.save(destination_path)
-            
-            if success:
-                print(f"Image saved to: {destination_path}")
-            else:
-                print(f"Error: Could not save image to {destination_path}")
-                return # Exit if saving failed
-
-        # 5. Update the ComboBox and mapping dictionary
-        if display_name not in self.display_names:
-            # Update internal data structures
-            self.display_names.append(display_name)
-            self.display_to_filename_map[display_name] = original_filename
-            
-            # Update the ComboBox UI
-            self.cmb.addItem(display_name)
+        # Save into the media store: same picture twice is stored once,
+        # and the original bytes are kept (no QPixmap re-encode)
+        try:
+            entry = self.media_store.add_file(path, 'template', _template_display_name(path))
+        except OSError as e:
+            print(f"Error: Could not save image: {e}")
+            return
+        print(f"Image saved to: {entry.path}")
+
+        # Update the ComboBox and mapping dictionary
+        self.display_to_path_map[entry.name] = entry.path
+        if entry.name not in self.display_names:
+            self.display_names.append(entry.name)
+            self.cmb.addItem(entry.name)
             
-        # 6. Set the ComboBox to the new image's name
-        index = self.cmb.findText(display_name)
-        if index != -1:
-            self.cmb.setCurrentIndex(index)
+        # Select the new image (the combo signal draws it, unless it was already selected)
+        if self.cmb.currentText() == entry.name:
+            self._change_image_from_select(entry.name)
+        else:
+            self.cmb.setCurrentText(entry.name)
    
     def _render_image(self):
-        """Render centered scaled image into the canvas and reposition entries/arrows."""
+        """Show the current template and reposition entries/arrows (all from the render cache)."""
         # ❌ scene.clear() मत करो → इससे entries delete हो जाती हैं
-        for item in self.scene.items():
-            if not isinstance(item, QGraphicsProxyWidget):
-                self.scene.removeItem(item)
-
-        w, h = self.canvas.width() - 4, self.canvas.height() - 4
-
-        if self.image:
-            pix = self.image.scaled(w, h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            item = QGraphicsPixmapItem(pix)
-            cx = (w - pix.width()) / 2
-            cy = (h - pix.height()) / 2
-            item.setPos(cx, cy)
-            self.scene.addItem(item)
-            self._canvas_image_item = item
+        # Scene items are created once and updated in place
+        self._invalidate_canvas_snapshot()
+        w, h = self.canvas.width(), self.canvas.height()
+        render = self.render_cache.render(self._template_path, w, h, self._template_name)
+
+        if self._canvas_image_item is None:
+            self._canvas_image_item = QGraphicsPixmapItem()
+            self.scene.addItem(self._canvas_image_item)
+
+        if render.pixmap is not None:
+            self._canvas_image_item.setPixmap(render.pixmap)
+            self._canvas_image_item.setPos(render.pos)
+            self._canvas_image_item.show()
+            for item in self._placeholder_items:
+                item.hide()
         else:
-            # Placeholder
-            self.scene.addRect(5, 5, w - 10, h - 10, pen=QPen(QColor("#cbd5e1")))
-            text_item = self.scene.addText("Upload T-Shirt Image")
-            font = text_item.font()
-            font.setPointSize(11)   # 👈 yaha size set karna hai (default ~9 hota hai)
-            text_item.setFont(font)
-            text_item.setPos(w / 2 - 100, h / 2 - 20)
+            self._canvas_image_item.hide()
+            if not self._placeholder_items:
+                # Placeholder
+                w, h = w - 4, h - 4
+                rect_item = self.scene.addRect(5, 5, w - 10, h - 10, pen=QPen(QColor("#cbd5e1")))
+                text_item = self.scene.addText("Upload T-Shirt Image")
+                font = text_item.font()
+                font.setPointSize(11)   # 👈 yaha size set karna hai (default ~9 hota hai)
+                text_item.setFont(font)
+                text_item.setPos(w / 2 - 100, h / 2 - 20)
+                self._placeholder_items = [rect_item, text_item]
+            for item in self._placeholder_items:
+                item.show()
 
         # Draw arrows + entries
-        self._draw_arrows()
+        self._draw_arrows(render)
 
-    def _draw_arrows(self):
+    def _draw_arrows(self, render):
         """Draw arrows and place entry boxes."""
-        w, h = self.canvas.width(), self.canvas.height()
-        pen = QPen(QColor("#1e40af"))
-        pen.setWidth(2)
-
-        def _draw_arrowhead(scene, pen, p1, p2):
-            """Draws a V-shaped arrowhead at point p2, coming from p1."""
-            ARROW_SIZE = 8
-            
-            # Calculate the angle of the line segment
-            dx = p2.x() - p1.x()
-            dy = p2.y() - p1.y()
-            angle = math.atan2(dy, dx)
-            
-            # Calculate the points for the arrowhead triangle
-            p3 = QPointF(p2.x() - ARROW_SIZE * math.cos(angle - math.pi / 6),
-                        p2.y() - ARROW_SIZE * math.sin(angle - math.pi / 6))
-            p4 = QPointF(p2.x() - ARROW_SIZE * math.cos(angle + math.pi / 6),
-                        p2.y() - ARROW_SIZE * math.sin(angle + math.pi / 6))
-            
-            # Create and draw the arrowhead lines
-            scene.addLine(p2.x(), p2.y(), p3.x(), p3.y(), pen).setZValue(5)
-            scene.addLine(p2.x(), p2.y(), p4.x(), p4.y(), pen).setZValue(5)
-
-        # Note: Using QPointF objects for better geometry handling
-        coords = {
-            "collar": [QPointF(w / 2 - 80, 0.08 * h), QPointF(w / 2, 0.08 * h)],
-            "left_sleeve": [QPointF(0.20 * w, 0.30 * h), QPointF(0.33 * w, 0.30 * h)],
-            "right_sleeve": [QPointF(0.80 * w, 0.40 * h), QPointF(0.72 * w, 0.40 * h)],
-            "center_right": [QPointF(0.75 * w, 0.70 * h), QPointF(0.60 * w, 0.70 * h)],
-            "bottom_right_label": [QPointF(0.85 * w, 0.85 * h)], 
-        }
-        
-        entry_offsets = {
-            "collar": (-80, -20),
-            "left_sleeve": (-85, -20), # Adjusted for potentially wider box
-            "right_sleeve": (-20, -20),  # Adjusted for potentially wider box
-            "center_right": (-40, -20),
-            "bottom_right_label": (-40, -20), # Adjusted for wider box and far-right position
-        }
-        
         LINE_Z_VALUE = 5
         BOX_Z_VALUE = 10 
 
-        for key, pts in coords.items():
-            if key != "bottom_right_label":
-                # 1. Draw lines and get the last line segment
-                last_segment_p1 = None
-                last_segment_p2 = None
-                
-                for i in range(len(pts) - 1):
-                    p1 = pts[i]
-                    p2 = pts[i + 1]
-                    
-                    line = self.scene.addLine(p1.x(), p1.y(), p2.x(), p2.y(), pen)
-                    line.setZValue(LINE_Z_VALUE)
-                    
-                    # Keep track of the last segment drawn
-                    last_segment_p1 = p1
-                    last_segment_p2 = p2
-                
-                # 2. Draw the arrowhead at the end of the last line segment
-                if last_segment_p1 and last_segment_p2:
-                    _draw_arrowhead(self.scene, pen, last_segment_p1, last_segment_p2)
-
+        # All arrows are one path item; the path only changes with the canvas size
+        if self._arrow_item is None:
+            pen = QPen(QColor("#1e40af"))
+            pen.setWidth(2)
+            self._arrow_item = self.scene.addPath(render.arrow_path, pen)
+            self._arrow_item.setZValue(LINE_Z_VALUE)
+        elif self._arrow_path is not render.arrow_path:
+            self._arrow_item.setPath(render.arrow_path)
+        self._arrow_path = render.arrow_path
+
+        # Entry boxes only move when the layout (or canvas size) actually changed
+        if render.entry_positions is self._entry_positions:
+            return
+        self._entry_positions = render.entry_positions
 
-            # 3. Create the entry box (no change needed here)
+        for key, pos in render.entry_positions.items():
+            # Create the entry box
             if key not in self.entries:
                 entry = QLineEdit()
                 entry.setFixedWidth(120) 
                 entry.setAlignment(Qt.AlignCenter)
+                entry.textChanged.connect(self._invalidate_canvas_snapshot)
                 proxy = QGraphicsProxyWidget()
                 proxy.setWidget(entry)
                 self.entries[key] = proxy
                 self.scene.addItem(proxy)
-            
-            self.entries[key].setZValue(BOX_Z_VALUE)
+                self.entries[key].setZValue(BOX_Z_VALUE)
+
+            # Set the position of the box
+            self.entries[key].setPos(pos)
+            self.entries[key].show()
 
-            # 4. Set the position of the box
-            frx, fry = pts[0].x(), pts[0].y() # Get coordinates from QPointF
-            dx, dy = entry_offsets.get(key, (-40, -20))
-            self.entries[key].setPos(frx + dx, fry + dy)
+        # Callouts this garment's layout doesn't have (text is kept)
+        for key, proxy in self.entries.items():
+            if key not in render.entry_positions:
+                proxy.hide()
 
     def create_item_selection_box(self):
         group_box = QGroupBox("Item Selection")
-        group_box.setStyleSheet("""
-            QGroupBox {
-                border: 1px solid gray; 
-                border-radius: 4px;
-                margin-top: 15px; 
-                padding-top: 20px; 
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top left; 
-                background-color: #F0FFF0; 
-                padding: 0 5px; 
-                padding-bottom: 2px;
-                margin-left: 5px; 
-                margin-top: -1px; 
-            }
-        """)        
+        group_box.setObjectName("itemSelection")
+        set_role(group_box, "options")
         
         group_layout = QVBoxLayout()
         group_box.setLayout(group_layout)
@@ -1341,41 +1798,26 @@ class OrderForm(QWidget):
         top_layout.setContentsMargins(0, 0, 0, 0)
         
         self.add_button = QPushButton("+Add")
-        self.add_button.setStyleSheet("background-color:#87CEFA; min-width: 80px; min-height: 15px;")
+        self.add_button.setObjectName("addItem")
         self.add_button.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed) 
         self.add_button.clicked.connect(self._open_add_item_dialog) 
+        self.size_run_button = QPushButton("+Size Run")
+        self.size_run_button.setObjectName("addSizeRun")
+        self.size_run_button.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        self.size_run_button.clicked.connect(self._open_size_run_dialog)
         
         top_layout.addStretch(1) 
         top_layout.addWidget(self.add_button)
+        top_layout.addWidget(self.size_run_button)
         top_layout.addStretch(1)
         
         group_layout.addSpacing(10)
         group_layout.addLayout(top_layout)
         
-        self.items_container = QTableWidget()
-        self.items_container.setColumnCount(18) 
+        self.items_container = QTableView()
+        self.items_container.setModel(self.item_model)
+        self.items_container.setObjectName("itemsTable")
         
-        self.items_container.setStyleSheet("""
-        QTableWidget {
-            gridline-color: gray; 
-            border: 0px solid black; 
-        }
-        QTableWidget::item {
-            border: 0.5px solid gray;
-            background-color: #ffffff; 
-        }
-        QHeaderView::section {
-            background-color:: gray; 
-            border: 0.5px solid #000000;
-            padding: 3px;
-            font-weight: normal; 
-            text-align: center;
-        }
-        """)
-        
-        self.items_container.setHorizontalHeaderLabels(
-            ["Fabric", "Type", "Color", "Size", "Qty", "Unit", "Total price", "Status", "Action"]
-        )
         self.items_container.verticalHeader().setVisible(False)
         self.items_container.setFixedHeight(120)
 
@@ -1388,29 +1830,13 @@ class OrderForm(QWidget):
         self.items_container.setColumnWidth(6, 150)  # Total
         self.items_container.setColumnWidth(7, 180)  # NEW: Status
         self.items_container.setColumnWidth(8, 300)  # NEW: Action (for 3 buttons)
-        # --- NEW FIX: Hide the three internal add-on columns (9, 10, 11) ---
-        self.items_container.setColumnHidden(9, True)
-        self.items_container.setColumnHidden(10, True)
-        self.items_container.setColumnHidden(11, True)
-        self.items_container.setColumnHidden(12, True)
-        self.items_container.setColumnHidden(13, True)
-        self.items_container.setColumnHidden(14, True) 
-        self.items_container.setColumnHidden(15, True) 
-        self.items_container.setColumnHidden(16, True) 
-        self.items_container.setColumnHidden(17, True) 
+        # Add-ons, barcode, remark and employee names are kept in the OrderLine, not in hidden columns
         group_layout.addWidget(self.items_container)
        
         # --- Grand Total Label ---
         self.grand_total_label = QLabel("Grand Total: 0")
         self.grand_total_label.setFixedWidth(200)
-        self.grand_total_label.setStyleSheet("""
-            QLabel {
-                font-size: 20px;
-                font-weight: bold;
-                color: #000000;      
-                background-color: #f9f9f9;                                                                                                       
-            }
-        """)
+        self.grand_total_label.setObjectName("grandTotal")
         grand_total_layout = QHBoxLayout()
         grand_total_layout.addSpacing(1200)  
         grand_total_layout.addWidget(self.grand_total_label)
@@ -1419,35 +1845,7 @@ class OrderForm(QWidget):
         return group_box
     
     def _get_row_data(self, row):
-        data = {}
-        def get_safe_text(container, r, c):
-            # Retrieve the QTableWidgetItem or None
-            item = container.item(r, c)
-            # Return the text if the item exists, otherwise return an empty string
-            return item.text() if item is not None else ""
-        
-        data["Fabric"] = get_safe_text(self.items_container, row, 0)
-        data["Type"] = get_safe_text(self.items_container, row, 1)
-        data["Color"] = get_safe_text(self.items_container, row, 2)
-        data["Size"] = get_safe_text(self.items_container, row, 3)
-        data["Qty"] = get_safe_text(self.items_container, row, 4)
-        data["Unit"] = get_safe_text(self.items_container, row, 5)
-        data["Status"] = get_safe_text(self.items_container, row, 7)
-
-        data["Total"] = get_safe_text(self.items_container, row, 6)
-    
-        # NEW: Hidden Add-ons (Columns 9, 10, 11) - Useful for a detailed view
-        data["PrintAddOn"] = get_safe_text(self.items_container, row, 9)
-        data["CollarAddOn"] = get_safe_text(self.items_container, row, 10)
-        data["TrackAddOn"] = get_safe_text(self.items_container, row, 11)
-        data["Barcode"] = get_safe_text(self.items_container, row, 12)
-        data["Remark"] = get_safe_text(self.items_container, row, 13)
-        data["Cutting Employee Name"] = get_safe_text(self.items_container, row, 14)
-        data["Printing Employee Name"] = get_safe_text(self.items_container, row, 15)
-        data["RIB Collar Employee Name"] = get_safe_text(self.items_container, row, 16)
-        data["Stretching Employee Name"] = get_safe_text(self.items_container, row, 17)
-                
-        return data
+        return self.item_model.line(row).to_data()
     
     @staticmethod
     def _set_dialog_read_only(dialog, is_read_only=True):
@@ -1475,7 +1873,7 @@ class OrderForm(QWidget):
 
         current_data = self._get_row_data(row)
         
-        dialog = ItemInputDialog(self, is_view_only=True) 
+        dialog = self.dialogs.get("item_view", lambda: ItemInputDialog(self, is_view_only=True))
         dialog.setWindowTitle("View an Item") 
         
         dialog.cloth_combo.setCurrentText(current_data["Fabric"])
@@ -1491,15 +1889,9 @@ class OrderForm(QWidget):
         
         def save_barcode_only_in_view():
             new_barcode = dialog.barcode_input.text()
-            item = self.items_container.item(row, 12)
-            if item is None:
-                from PyQt5.QtWidgets import QTableWidgetItem
-                item = QTableWidgetItem(new_barcode)
-                self.items_container.setItem(row, 12, item)
-            else:
-                item.setText(new_barcode) 
+            self.item_model.replace_line(row, self.item_model.line(row).replace(barcode=new_barcode))
             print(f"Barcode for row {row} updated to: {new_barcode} from View Item dialog.")
-            dialog.barcode_save_btn.setStyleSheet("background-color: lightgreen;")
+            set_state(dialog.barcode_save_btn, "saved", True)
             
             dialog.barcode_input.setReadOnly(True)
         try:
@@ -1508,9 +1900,6 @@ class OrderForm(QWidget):
             pass 
             
         dialog.barcode_save_btn.clicked.connect(save_barcode_only_in_view)
-        dialog.job_btn.clicked.connect(dialog._open_job_work_dialog)
-        dialog.cut_btn.clicked.connect(dialog._open_cutting_dialog)
-        dialog.print_btn.clicked.connect(dialog._open_printing_dialog)
             
         self._set_dialog_read_only(dialog, is_read_only=True)
         
@@ -1519,7 +1908,7 @@ class OrderForm(QWidget):
     def _edit_item(self, row):        
         current_data = self._get_row_data(row)
         
-        dialog = ItemInputDialog(self)
+        dialog = self.dialogs.get("item", lambda: ItemInputDialog(self))
         dialog.setWindowTitle("Edit an Item") 
         
         dialog.cloth_combo.setCurrentText(current_data["Fabric"])
@@ -1535,14 +1924,9 @@ class OrderForm(QWidget):
         
         def save_barcode_only():
             new_barcode = dialog.barcode_input.text()
-            item = self.items_container.item(row, 12)
-            if item is None:
-                item = QTableWidgetItem(new_barcode)
-                self.items_container.setItem(row, 12, item)
-            else:
-                item.setText(new_barcode)     
+            self.item_model.replace_line(row, self.item_model.line(row).replace(barcode=new_barcode))
             print(f"Barcode for row {row} updated to: {new_barcode}")
-            dialog.barcode_save_btn.setStyleSheet("background-color: lightgreen;")
+            set_state(dialog.barcode_save_btn, "saved", True)
         try:
             dialog.barcode_save_btn.clicked.disconnect()
         except:
@@ -1554,11 +1938,7 @@ class OrderForm(QWidget):
             item_data = dialog.get_data()
             
             # 🌟 STEP 2: Open the Employee Dialog, passing existing data
-            employee_dialog = EmployeeDetailsDialog(
-                item_type=item_data["Type"], 
-                current_data=current_data, # Pass existing data to pre-fill fields
-                parent=self
-            )
+            employee_dialog = self._employee_dialog(item_data["Type"], current_data) # Pre-filled with the existing data
             
             if employee_dialog.exec_() == QDialog.Accepted:
                 employee_data = employee_dialog.get_employee_data()
@@ -1569,94 +1949,60 @@ class OrderForm(QWidget):
                 # Final update to the table
                 self._update_item_row(row, final_data)
 
+    def _employee_dialog(self, item_type, current_data=None):
+        dialog = self.dialogs.get("employee", lambda: EmployeeDetailsDialog(item_type=item_type, parent=self))
+        dialog.set_data(item_type, current_data)
+        return dialog
+
+    def _line_from_data(self, data):
+        """Builds an OrderLine priced with the add-on options currently selected on the form.
+        Raises ValueError if Qty or Unit are not numbers."""
+        line = OrderLine.from_data(data)
+        if line.is_shirt:
+            line.print_add_on = self.get_total_printing_price()
+            line.collar_add_on = self.get_selected_collar_price()
+            line.collar_type = self._get_selected_collar_type()
+        elif line.is_pant:
+            line.track_add_on = self.get_total_track_options_price()
+        return line
+
+    def _get_selected_collar_type(self):
+        if hasattr(self, 'rb_rib') and self.rb_rib.isChecked():
+            return "RIB"
+        elif hasattr(self, 'rb_patti') and self.rb_patti.isChecked():
+            return "PATTI"
+        elif hasattr(self, 'rb_self') and self.rb_self.isChecked():
+            return "SELF"
+        return "NONE"
+
     def _update_item_row(self, row, data):
         try:
-            qty = int(data["Qty"])
-            unit = float(data["Unit"])
+            line = self._line_from_data(data)
         except ValueError:
             print("Error: Quantity or Unit Price must be valid numbers. Update cancelled.")
             return
-        
-        type_text = data["Type"].lower()
-        is_shirt_item = "t-shirt" in type_text 
-        is_pant_item = "track-pant" in type_text or "shorts" in type_text
-                
-        printing_add_on_per_unit = 0.0
-        collar_add_on_per_unit = 0.0
-        track_add_on_per_unit = 0.0
-        
-        if is_shirt_item:
-            printing_add_on_per_unit = self.get_total_printing_price()
-            collar_add_on_per_unit = self.get_selected_collar_price()
-            
-        elif is_pant_item:
-            track_add_on_per_unit = self.get_total_track_options_price()
-                    
-        add_ons = printing_add_on_per_unit + collar_add_on_per_unit + track_add_on_per_unit
-        total = (unit + add_ons) * qty
-
-        def safe_set_item(table, r, c, text):
-            item = table.item(r, c)
-            if item is None:
-                item = QTableWidgetItem(text)
-                table.setItem(r, c, item)
-            else:
-                item.setText(text)
-            return item
-
-        safe_set_item(self.items_container, row, 0, data["Fabric"])
-        safe_set_item(self.items_container, row, 1, data["Type"])
-        safe_set_item(self.items_container, row, 2, data["Color"])
-        safe_set_item(self.items_container, row, 3, data["Size"])
-        safe_set_item(self.items_container, row, 4, str(qty))
-        safe_set_item(self.items_container, row, 5, f"{unit:.2f}")
-        safe_set_item(self.items_container, row, 6, f"{total:.2f}") 
-        safe_set_item(self.items_container, row, 7, data["Status"])
-        safe_set_item(self.items_container, row, 12, data["Barcode"])
-        safe_set_item(self.items_container, row, 13, data["Remark"])
-        safe_set_item(self.items_container, row, 14, data["Cutting Employee Name"])
-        safe_set_item(self.items_container, row, 15, data["Printing Employee Name"])
-        safe_set_item(self.items_container, row, 16, data["RIB Collar Employee Name"])
-        safe_set_item(self.items_container, row, 17, data["Stretching Employee Name"])
-        
-        # Columns 9-11 (Hidden add-ons data)
-        safe_set_item(self.items_container, row, 9, f"{printing_add_on_per_unit:.2f}")
-        safe_set_item(self.items_container, row, 10, f"{collar_add_on_per_unit:.2f}")
-        safe_set_item(self.items_container, row, 11, f"{track_add_on_per_unit:.2f}")
-
-        for col in range(8): 
-            item = self.items_container.item(row, col)
-            if item:
-                item.setTextAlignment(Qt.AlignCenter)
+
+        self.item_model.replace_line(row, line)
         self._update_grand_total()
 
-    def _delete_item(self): 
-        button = self.sender()
-        if not isinstance(button, QPushButton):
-            return
-        action_widget = button.parentWidget() 
-        row_to_delete = -1
-        for r in range(self.items_container.rowCount()):
-            if self.items_container.cellWidget(r, 8) == action_widget:
-                row_to_delete = r
-                break        
-        if row_to_delete == -1:
+    def _delete_item(self, row):
+        if row < 0 or row >= self.item_model.rowCount():
             print("Error: Could not determine row for delete action.")
             return    
         reply = QMessageBox.question(self, 'Confirm Delete',
-            f"Are you sure you want to delete the item at row {row_to_delete}?", 
+            f"Are you sure you want to delete the item at row {row}?", 
             QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
-            self.items_container.removeRow(row_to_delete)
+            self.item_model.remove_line(row)
             self._update_grand_total()
-            print(f"Item at row {row_to_delete} deleted.")
+            print(f"Item at row {row} deleted.")
     
     def _open_add_item_dialog(self):
-        dialog = ItemInputDialog(self)
+        dialog = self.dialogs.get("item", lambda: ItemInputDialog(self))
         dialog.barcode_save_btn.show()
 
         def save_barcode_only():
-            dialog.barcode_save_btn.setStyleSheet("background-color: lightgreen;")
+            set_state(dialog.barcode_save_btn, "saved", True)
             print(f"Barcode saved temporarily in dialog: {dialog.barcode_input.text()}")
         try:
             dialog.barcode_save_btn.clicked.disconnect()
@@ -1665,11 +2011,7 @@ class OrderForm(QWidget):
         dialog.barcode_save_btn.clicked.connect(save_barcode_only)
         if dialog.exec_() == QDialog.Accepted:
             item_data = dialog.get_data()
-            employee_dialog = EmployeeDetailsDialog(
-                item_type=item_data["Type"], 
-                current_data=None, # No existing employee data for new item
-                parent=self
-            )            
+            employee_dialog = self._employee_dialog(item_data["Type"]) # No existing employee data for new item
             if employee_dialog.exec_() == QDialog.Accepted:
                 employee_data = employee_dialog.get_employee_data()
                 
@@ -1680,77 +2022,45 @@ class OrderForm(QWidget):
                 self._add_item_row(final_data)
     
     def _add_item_row(self, data):
-        row = self.items_container.rowCount()
-        self.items_container.insertRow(row)
-
         try:
-            qty = int(data["Qty"])
-            unit = float(data["Unit"])
+            line = self._line_from_data(data)
         except ValueError:
             print("Error: Quantity or Unit Price must be valid numbers.")
-            self.items_container.removeRow(row)
             return
-        
-        # T-SHIRT FILTERING (Kept as is for add-on logic)
-        type_text = data["Type"].lower() 
-        is_shirt_item = "t-shirt" in type_text 
-        is_pant_item = "track-pant" in type_text or "shorts" in type_text
-
-        printing_add_on_per_unit = 0.0
-        collar_add_on_per_unit = 0.0
-        track_add_on_per_unit = 0.0 
 
-        if is_shirt_item:
-            printing_add_on_per_unit = self.get_total_printing_price()
-            collar_add_on_per_unit = self.get_selected_collar_price()
-
-        elif is_pant_item:
-            track_add_on_per_unit = self.get_total_track_options_price()
-        
-        add_ons = printing_add_on_per_unit + collar_add_on_per_unit + track_add_on_per_unit
-        total = (unit + add_ons) * qty
-
-        # Fabric
-        item = QTableWidgetItem(data["Fabric"])
-        item.setTextAlignment(Qt.AlignCenter)
-        self.items_container.setItem(row, 0, item)
+        row = self.item_model.append_line(line)
+        self._add_action_buttons(row)
+        self._update_grand_total()
 
-        # Type
-        item = QTableWidgetItem(data["Type"])
-        item.setTextAlignment(Qt.AlignCenter)
-        self.items_container.setItem(row, 1, item)
+    def _open_size_run_dialog(self):
+        dialog = self.dialogs.get("size_run", lambda: SizeRunDialog(self))
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        items = dialog.get_items()
+        # One set of employee names for the whole run
+        employee_dialog = self._employee_dialog(items[0]["Type"])
+        if employee_dialog.exec_() == QDialog.Accepted:
+            employee_data = employee_dialog.get_employee_data()
+            self._add_item_rows([{**item, **employee_data} for item in items])
+            dialog.clear()
+
+    def _add_item_rows(self, items):
+        """Adds many items as one batch: one model insert, one totals update, one repaint."""
+        try:
+            lines = [self._line_from_data(data) for data in items]
+        except ValueError:
+            print("Error: Quantity or Unit Price must be valid numbers.")
+            return
 
-        # Color
-        item = QTableWidgetItem(data["Color"])
-        item.setTextAlignment(Qt.AlignCenter)
-        self.items_container.setItem(row, 2, item)
+        self.items_container.setUpdatesEnabled(False)
+        try:
+            for row in self.item_model.append_lines(lines):
+                self._add_action_buttons(row)
+        finally:
+            self.items_container.setUpdatesEnabled(True)
+        self._update_grand_total()
 
-        # Size
-        item = QTableWidgetItem(data["Size"])
-        item.setTextAlignment(Qt.AlignCenter)
-        self.items_container.setItem(row, 3, item)
-
-        # Qty
-        item = QTableWidgetItem(str(qty))
-        item.setTextAlignment(Qt.AlignCenter)
-        self.items_container.setItem(row, 4, item)
-
-        # Unit
-        item = QTableWidgetItem(f"{unit:.2f}")
-        item.setTextAlignment(Qt.AlignCenter)
-        self.items_container.setItem(row, 5, item)
-
-        # Total
-        item = QTableWidgetItem(f"{total:.2f}")
-        item.setTextAlignment(Qt.AlignCenter)
-        self.items_container.setItem(row, 6, item)
-
-        # Status
-        item = QTableWidgetItem(data["Status"])
-        item.setTextAlignment(Qt.AlignCenter)
-        self.items_container.setItem(row, 7, item)
-
-        # Action Buttons
+    def _add_action_buttons(self, row):
         action_widget = QWidget()
         action_layout = QHBoxLayout(action_widget)
         action_layout.setContentsMargins(5, 0, 5, 0)
@@ -1759,71 +2069,18 @@ class OrderForm(QWidget):
         view_btn = QPushButton("👁️ View")
         edit_btn = QPushButton("✏️ Edit")
         delete_btn = QPushButton("🗑️ Delete")
-        
-        view_btn.clicked.connect(lambda checked, r=row: self._view_item(r))
-        edit_btn.clicked.connect(lambda checked, r=row: self._edit_item(r))
-        delete_btn.clicked.connect(self._delete_item)
+
+        # Persistent index follows the row when rows above it are deleted
+        index = QPersistentModelIndex(self.item_model.index(row, ItemTableModel.ACTION_COLUMN))
+        view_btn.clicked.connect(lambda checked, idx=index: self._view_item(idx.row()))
+        edit_btn.clicked.connect(lambda checked, idx=index: self._edit_item(idx.row()))
+        delete_btn.clicked.connect(lambda checked, idx=index: self._delete_item(idx.row()))
 
         action_layout.addWidget(view_btn)
         action_layout.addWidget(edit_btn)
         action_layout.addWidget(delete_btn)
 
-        self.items_container.setCellWidget(row, 8, action_widget)
-
-        item_print = QTableWidgetItem(f"{printing_add_on_per_unit:.2f}")
-        self.items_container.setItem(row, 9, item_print) 
-
-        item_collar = QTableWidgetItem(f"{collar_add_on_per_unit:.2f}")
-        self.items_container.setItem(row, 10, item_collar)
-
-        item_track = QTableWidgetItem(f"{track_add_on_per_unit:.2f}")
-        self.items_container.setItem(row, 11, item_track)
-
-        item_barcode = QTableWidgetItem(data["Barcode"])
-        self.items_container.setItem(row, 12, item_barcode)
-
-        item_remark = QTableWidgetItem(data["Remark"]) 
-        self.items_container.setItem(row, 13, item_remark)
-
-        self.items_container.setItem(row, 14, QTableWidgetItem(data["Cutting Employee Name"]))
-        self.items_container.setItem(row, 15, QTableWidgetItem(data["Printing Employee Name"]))
-        self.items_container.setItem(row, 16, QTableWidgetItem(data["RIB Collar Employee Name"]))
-        self.items_container.setItem(row, 17, QTableWidgetItem(data["Stretching Employee Name"]))
-
-        collar_type_flag = "NONE" 
-    
-        if is_shirt_item: 
-            
-            if hasattr(self, 'rb_rib') and self.rb_rib.isChecked(): 
-                collar_type_flag = "RIB"
-            elif hasattr(self, 'rb_patti') and self.rb_patti.isChecked():
-                collar_type_flag = "PATTI"
-            elif hasattr(self, 'rb_self') and self.rb_self.isChecked():
-                collar_type_flag = "SELF"
-                
-        # Save the collar type flag in Column 18 (index 18)
-        self.items_container.setItem(row, 18, QTableWidgetItem(collar_type_flag))
-        
-        if len(self.item_collar_flags) <= row:
-            self.item_collar_flags.append(collar_type_flag)
-        else:
-            # यह केवल edit/replace के लिए होगा, लेकिन हम इसे सुरक्षित रूप से यहाँ सेट करते हैं
-            self.item_collar_flags[row] = collar_type_flag
-
-        if self.items_container.columnCount() < 19:
-            self.items_container.setColumnCount(19)
-
-        self.items_container.setColumnHidden(9, True)
-        self.items_container.setColumnHidden(10, True)
-        self.items_container.setColumnHidden(11, True) 
-        self.items_container.setColumnHidden(12, True) 
-        self.items_container.setColumnHidden(13, True)
-        self.items_container.setColumnHidden(14, True) # Cutting
-        self.items_container.setColumnHidden(15, True) # Printing
-        self.items_container.setColumnHidden(16, True) # Collar
-        self.items_container.setColumnHidden(17, True) # Stretching
-        self.items_container.setColumnHidden(18, True) # NEW Collar Type Flag
-        self._update_grand_total()
+        self.items_container.setIndexWidget(self.item_model.index(row, ItemTableModel.ACTION_COLUMN), action_widget)
 
     def get_total_printing_price(self):
         total_print_price = 0.0
@@ -1890,6 +2147,7 @@ class OrderForm(QWidget):
                                     QMessageBox.Ok)
             return
         collar_name = self._get_collar_name()
+        from prints import RibCollarPrintDialog
         dialog = RibCollarPrintDialog(self, breakdown_data=rib_collar_data, collar_name=collar_name)
         dialog.exec_()
         
@@ -1898,30 +2156,13 @@ class OrderForm(QWidget):
         unique_colors = set()
         total_qty = 0
         
-        # Assuming self.items_container exists and is populated
-        if not hasattr(self, 'items_container'):
-            return {'breakdown': {}, 'colors': [], 'total_qty': 0}
-
-        for row in range(self.items_container.rowCount()):
-            collar_type_text = self.item_collar_flags[row].upper() if row < len(self.item_collar_flags) else ""
-            
-            type_item = self.items_container.item(row, 1) # Type is in column 1 (T-shirt)
-            #collar_type_flag_item = self.items_container.item(row, 18)
-            
-            if (type_item and "t-shirt" in type_item.text().lower() and 
-                collar_type_text == "RIB"):
-                
-                try:
-                    size = self.items_container.item(row, 3).text()
-                    qty = int(self.items_container.item(row, 4).text())
-                    color = self.items_container.item(row, 2).text().strip()
-                except (AttributeError, ValueError, TypeError):
-                    continue
-
-                key = (size, color)
-                breakdown[key] = breakdown.get(key, 0) + qty
+        for line in self.order:
+            if line.is_shirt and line.collar_type.upper() == "RIB":
+                color = line.color.strip()
+                key = (line.size, color)
+                breakdown[key] = breakdown.get(key, 0) + line.qty
                 unique_colors.add(color)
-                total_qty += qty
+                total_qty += line.qty
 
         if not breakdown:
             # This will show the error message if no items pass the filter
@@ -1940,52 +2181,16 @@ class OrderForm(QWidget):
         return total
     
     def _recalculate_all_item_totals(self):
-        """Recalculates the Total Price for all rows in the table and updates the Grand Total."""
-        from PyQt5.QtWidgets import QTableWidgetItem
-        
-        for row in range(self.items_container.rowCount()):
-            unit_price_item = self.items_container.item(row, 5) 
-            qty_item = self.items_container.item(row, 4) 
-            print_add_on_item = self.items_container.item(row, 9) 
-            collar_add_on_item = self.items_container.item(row, 10)
-            track_add_on_item = self.items_container.item(row, 11) 
-
-            if unit_price_item and qty_item and print_add_on_item and collar_add_on_item and track_add_on_item:
-                try:
-                    unit_price = float(unit_price_item.text())
-                    qty = int(qty_item.text())
-                    printing_add_on_per_unit = float(print_add_on_item.text())
-                    collar_add_on_per_unit = float(collar_add_on_item.text())
-                    track_add_on_per_unit = float(track_add_on_item.text())
-
-                    new_total_price = (unit_price + printing_add_on_per_unit + collar_add_on_per_unit + track_add_on_per_unit) * qty
-
-                    total_price_item = self.items_container.item(row, 6)
-                    if not total_price_item:
-                        total_price_item = QTableWidgetItem()
-                        self.items_container.setItem(row, 6, total_price_item)
-                        
-                    total_price_item.setText(f"{new_total_price:.2f}") 
-                    total_price_item.setTextAlignment(Qt.AlignCenter) 
-
-                except ValueError:
-                    continue 
+        """Full recount of the order totals. Normal edits keep them up to date incrementally,
+        this is only for when lines were changed outside the Order's add/replace/remove."""
+        self.order.totals.rebuild(self.order.lines)
+        if len(self.order):
+            self.item_model.dataChanged.emit(
+                self.item_model.index(0, 6), self.item_model.index(len(self.order) - 1, 6))
         self._update_grand_total()
         
     def _update_grand_total(self):
-        self._total_items_sum = 0.0
-        
-        # 1. Calculate Subtotal (Total Items Price)
-        for row in range(self.items_container.rowCount()):
-            item = self.items_container.item(row, 6)  # Column 6 = Total price (unit + add-ons) * Qty
-            if item:
-                try:
-                    # Use the class attribute
-                    self._total_items_sum += float(item.text())
-                except ValueError:
-                    pass
-                    
-        # 2. Get Tax Rate
+        # 1. Get Tax Rate
         tax_apply = self.tax_apply_combo.currentText()
         self._tax_percentage = 0.0
         if tax_apply == "Y":
@@ -1994,12 +2199,14 @@ class OrderForm(QWidget):
             except ValueError:
                 self._tax_percentage = 0.0
                 
-        # 3. Calculate Tax Amount and Grand Total
-        tax_rate = self._tax_percentage / 100.0
-        self._tax_amount = self._total_items_sum * tax_rate
-        self._grand_total = self._total_items_sum + self._tax_amount
+        # 2. Subtotal, Tax Amount and Grand Total are kept up to date by the order's
+        #    running totals, so this is O(1) no matter how many rows the table has
+        self.order.tax_percentage = self._tax_percentage
+        self._total_items_sum = self.order.subtotal
+        self._tax_amount = self.order.tax_amount
+        self._grand_total = self.order.grand_total
         
-        # 4. Update UI Labels (The required fix is here)
+        # 3. Update UI Labels (The required fix is here)
         
         # Update the label that should show the subtotal
         if hasattr(self, 'total_items_price_label'):
@@ -2028,21 +2235,21 @@ class OrderForm(QWidget):
         tax_label = QLabel("TAX (GST):")
         tax_label.setFixedWidth(80) # Adjusted width
         tax_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        tax_label.setStyleSheet("font-size: 16px; font-weight: bold;")
+        set_role(tax_label, "section")
         tax_fields_layout.addWidget(tax_label)
 
         # Y/N Selector
         self.tax_apply_combo = QComboBox()
         self.tax_apply_combo.addItems(["N", "Y"])
         self.tax_apply_combo.setFixedWidth(50)
-        self.tax_apply_combo.setStyleSheet("border: 1px solid black; border-radius: 0px; padding: 2px;")
+        set_role(self.tax_apply_combo, "box")
         tax_fields_layout.addWidget(self.tax_apply_combo)
 
         # Percentage Input Field
         self.tax_percentage_input = QLineEdit("0.0")
         self.tax_percentage_input.setPlaceholderText("Percentage (%)")
         self.tax_percentage_input.setFixedWidth(120)
-        self.tax_percentage_input.setStyleSheet("border: 1px solid black; border-radius: 0px; padding: 4px 6px;")
+        set_role(self.tax_percentage_input, "box")
         self.tax_percentage_input.setDisabled(True) # Disabled by default ("N" selected)
         tax_fields_layout.addWidget(self.tax_percentage_input)
         
@@ -2062,21 +2269,12 @@ class OrderForm(QWidget):
         remark_label = QLabel("REMARK:")
         remark_label.setFixedWidth(90) # Adjusted width
         remark_label.setAlignment(Qt.AlignCenter)
-        remark_label.setStyleSheet("""
-            QLabel {
-                font-size: 16px;
-                font-weight: bold;
-                border: 1px solid black;
-                padding: 2px 4px;
-                border-radius: 4px;
-                background-color: #f9f9f9;
-            }
-        """)
+        remark_label.setObjectName("remarkLabel")
         
         self.remark_input = QLineEdit()
         self.remark_input.setPlaceholderText("Enter remark here...")
         self.remark_input.setFixedWidth(500)
-        self.remark_input.setStyleSheet("QLineEdit { border: 1px solid black; border-radius: 0px; padding: 4px 6px; }")
+        set_role(self.remark_input, "box")
 
         remark_fields_layout.addWidget(remark_label)
         remark_fields_layout.addWidget(self.remark_input)
@@ -2131,6 +2329,8 @@ class OrderForm(QWidget):
         #self.print_btn.setFixedWidth(140)
 
         #Connect Buttons to functions
+        self.save_btn.clicked.connect(self.save_order)
+        self.undo_btn.clicked.connect(self.revert_order)
         self.quotatation_btn.clicked.connect(self.show_quotation_preview)
         self.rib_btn.clicked.connect(self._open_rib_collar_breakdown)
 
@@ -2141,10 +2341,7 @@ class OrderForm(QWidget):
 
         for i, btn in enumerate(buttons):
             btn.setFixedHeight(60)
-            btn.setStyleSheet(" background-color: #EEEEEE; "
-           " color: #fc83a0;" 
-            "font-weight: bold; "
-            "padding:10px;")
+            set_role(btn, "toolbar")
             
             buttons_layout.addWidget(btn)
         
@@ -2154,11 +2351,181 @@ class OrderForm(QWidget):
         buttons_layout.addStretch()
         return buttons_layout
     
+    def get_order_state(self):
+        """Everything on the form except the item lines, as plain data (see order_io)."""
+        return {
+            "header": {
+                "order_number": self.order_number.text(),
+                "order_date": self.order_date.date().toString("yyyy-MM-dd"),
+                "delivery_date": self.delivery_date.date().toString("yyyy-MM-dd"),
+                "barcode": self.barcode_number.text(),
+                "gst_no": self.gst_no.text(),
+                "advance_paid": self.advance_paid.value(),
+                "party_name": self.party_name.text(),
+                "school_name": self.school_name.text(),
+                "address": self.address.text(),
+                "status": self.status_combo.currentText(),
+                "remark": self.remark_input.text(),
+                "tax_apply": self.tax_apply_combo.currentText(),
+                "tax_percentage": self.tax_percentage_input.text(),
+            },
+            "options": {
+                "print": {key: [cb.isChecked(), edit.text()] for key, (cb, edit) in self.print_vars.items()},
+                "collar": {
+                    "self": [self.rb_self.isChecked(), self.collar_price_self.text()],
+                    "rib": [self.rb_rib.isChecked(), self.collar_price_rib.text()],
+                    "patti": [self.rb_patti.isChecked(), self.collar_price_patti.text()],
+                },
+                "collar_cloth": self.collar_cloth.currentText(),
+                "style": {
+                    "button": self.rb_button.isChecked(),
+                    "plain": self.rb_plain.isChecked(),
+                    "box": self.rb_box.isChecked(),
+                    "vplus": self.rb_vplus.isChecked(),
+                },
+                "track": self._track_options_state(),
+            },
+            "canvas": {
+                "template": self.cmb.currentText(),
+                "entries": {key: proxy.widget().text() for key, proxy in self.entries.items()},
+            },
+            "references": list(self.reference_image_paths),
+        }
+
+    def apply_order_state(self, state, lines):
+        """Inverse of get_order_state(), plus the item lines."""
+        header = state.get("header", {})
+        self.order_number.setText(header.get("order_number", ""))
+        self.order_date.setDate(QDate.fromString(header.get("order_date", ""), "yyyy-MM-dd"))
+        self.delivery_date.setDate(QDate.fromString(header.get("delivery_date", ""), "yyyy-MM-dd"))
+        self.barcode_number.setText(header.get("barcode", ""))
+        self.gst_no.setText(header.get("gst_no", ""))
+        self.advance_paid.setValue(float(header.get("advance_paid", 0.0)))
+        self.party_name.setText(header.get("party_name", ""))
+        self.school_name.setText(header.get("school_name", ""))
+        self.address.setText(header.get("address", ""))
+        self.status_combo.setCurrentText(header.get("status", "Pending"))
+        self.remark_input.setText(header.get("remark", ""))
+        self.tax_apply_combo.setCurrentText(header.get("tax_apply", "N"))
+        self.tax_percentage_input.setText(header.get("tax_percentage", "0.0"))
+
+        options = state.get("options", {})
+        for key, (checked, price) in options.get("print", {}).items():
+            if key in self.print_vars:
+                cb, edit = self.print_vars[key]
+                cb.setChecked(checked)
+                edit.setText(price)
+        collar = options.get("collar", {})
+        for key, checkbox, price_edit in (("self", self.rb_self, self.collar_price_self),
+                                          ("rib", self.rb_rib, self.collar_price_rib),
+                                          ("patti", self.rb_patti, self.collar_price_patti)):
+            if key in collar:
+                checkbox.setChecked(collar[key][0])
+                price_edit.setText(collar[key][1])
+        self.collar_cloth.setCurrentText(options.get("collar_cloth", self.collar_cloth.currentText()))
+        style = options.get("style", {})
+        for key, widget in (("button", self.rb_button), ("plain", self.rb_plain),
+                            ("box", self.rb_box), ("vplus", self.rb_vplus)):
+            if key in style:
+                widget.setChecked(style[key])
+        track = options.get("track", {})
+        if track and not self.track_vars and any(track.get(key) != value for key, value in self._track_options_state().items()):
+            self.track_toggle.setChecked(True)  # saved with track options set: build and show them
+        for key, (checked, price, extra) in track.items():
+            if key in self.track_vars:
+                cb, edit = self.track_vars[key]
+                cb.setChecked(checked)
+                edit.setText(price)
+                self.track_extra_vars[key].setText(extra)
+
+        canvas = state.get("canvas", {})
+        template = canvas.get("template")
+        if template and self.cmb.findText(template) != -1:
+            self.cmb.setCurrentText(template)
+        for key, text in canvas.get("entries", {}).items():
+            if key in self.entries:
+                self.entries[key].widget().setText(text)
+
+        self.reference_image_paths = [p for p in state.get("references", []) if os.path.exists(p)]
+        self._mark_dirty()
+
+        self.item_model.set_lines(lines)
+        for row in range(len(lines)):
+            self._add_action_buttons(row)
+        self._update_grand_total()
+
+    def _order_record(self):
+        """Searchable columns for the order store."""
+        return {
+            "order_number": self.order_number.text(),
+            "party_name": self.party_name.text(),
+            "school_name": self.school_name.text(),
+            "barcode": self.barcode_number.text(),
+            "order_date": self.order_date.date().toString("yyyy-MM-dd"),
+            "delivery_date": self.delivery_date.date().toString("yyyy-MM-dd"),
+            "status": self.status_combo.currentText(),
+            "total": self._grand_total,
+            "remark": " ".join(filter(None, [self.remark_input.text()] + [line.remark for line in self.order])),
+        }
+
+    def save_order(self):
+        if not self.order_number.text().strip():
+            QMessageBox.warning(self, "Order No Missing", "Please enter an Order No before saving.")
+            return
+        payload = order_io.dumps(self.get_order_state(), self.order.lines)
+        try:
+            self._get_order_store().save_order(
+                self._order_record(), payload, barcodes=[line.barcode for line in self.order])
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Could not save the order: {e}")
+            return
+        # Keeps the order's reference photos even if they're removed from the gallery
+        self.media_store.link_order(self.order_number.text().strip(), self.reference_image_paths)
+        self.media_store.collect_garbage(keep_paths=self.reference_image_paths + [self._template_path])
+        self._saved_payload = payload
+        QMessageBox.information(self, "Saved", f"Order {self.order_number.text()} saved.")
+
+    def load_order(self, order_id):
+        payload = self._get_order_store().get_payload(order_id)
+        if not payload:
+            return False
+        try:
+            state, lines = order_io.loads(payload)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Could not open the order: {e}")
+            return False
+        self.apply_order_state(state, lines)
+        self._saved_payload = payload
+        return True
+
+    def revert_order(self):
+        """CANCEL: throw away unsaved changes (back to the last saved/opened order, or a blank one)."""
+        reply = QMessageBox.question(self, 'Cancel Changes',
+            "Discard all unsaved changes to this order?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        if self._saved_payload:
+            self.apply_order_state(*order_io.loads(self._saved_payload))
+        else:
+            self.apply_order_state(self._blank_state, [])
+
+    def open_batch_export(self):
+        from batch_export import BatchExportDialog
+        dialog = self.dialogs.get("batch_export", lambda: BatchExportDialog(self._get_order_store(), self))
+        dialog.exec_()
+
     def show_quotation_preview(self): 
-        content_data = self._generate_item_table_html()
-        dialog = QuotationPreviewDialog(self, content_data)
+        from prints import QuotationPreviewDialog
+        dialog = self.dialogs.get("quotation", lambda: QuotationPreviewDialog(self, ()))
+        dialog.set_lines(self.order.lines)
         dialog.exec_()
     
+    def _get_order_store(self):
+        if self._order_store is None:
+            self._order_store = OrderStore()
+        return self._order_store
+
     def open_search_window(self):
         # नया window बनाओ
         self.search_window = QWidget()
@@ -2169,7 +2536,7 @@ class OrderForm(QWidget):
 
         # Header
         header = QLabel("Select an Order from the list")
-        header.setStyleSheet("font-size: 14pt; font-weight: bold;")
+        set_role(header, "title")
         layout.addWidget(header, alignment=Qt.AlignCenter)
 
         # Search bar
@@ -2177,19 +2544,12 @@ class OrderForm(QWidget):
         self.search_input.setPlaceholderText("🔍 Search...")
         layout.addWidget(self.search_input)
 
-        # Order list
-        self.list_widget = QListWidget()
-        orders = [
-            {"id": 1, "customer": "Ashwini", "total": 500},
-            {"id": 2, "customer": "Rahul", "total": 700},
-            {"id": 3, "customer": "Sneha", "total": 300},
-        ]
-        self.orders = orders
-        for order in orders:
-            item_text = f"Order {order['id']} | {order['customer']} | ₹{order['total']}"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, order)
-            self.list_widget.addItem(item)
+        # Order list (model/view, loads pages lazily while scrolling)
+        self.order_list_model = OrderListModel(self._get_order_store(), self.search_window)
+        self.list_widget = QListView()
+        self.list_widget.setUniformItemSizes(True)  # lets the view skip measuring every row
+        self.list_widget.setModel(self.order_list_model)
+        self.order_list_model.set_query("")
         layout.addWidget(self.list_widget)
 
         # Close button
@@ -2198,61 +2558,43 @@ class OrderForm(QWidget):
 
         # Connections
         def filter_list(text):
-            for i in range(self.list_widget.count()):
-                item = self.list_widget.item(i)
-                item.setHidden(text.lower() not in item.text().lower())
+            self.order_list_model.schedule_query(text)
 
         self.search_input.textChanged.connect(filter_list)
         close_btn.clicked.connect(self.search_window.close)
 
-        def on_item_selected(item):
-            order = item.data(Qt.UserRole)
+        def on_item_selected(index):
+            order = self.order_list_model.order_at(index.row())
             # 👇 main form ke fields fill
-            self.party_name.setText(order["customer"])
-            self.total_price_input.setText(str(order["total"]))
+            if not self.load_order(order["id"]):
+                self.order_number.setText(order["order_number"])
+                self.party_name.setText(order["party_name"])
+                self.school_name.setText(order["school_name"])
             self.search_window.close()
 
-        self.list_widget.itemDoubleClicked.connect(on_item_selected)
+        self.list_widget.doubleClicked.connect(on_item_selected)
 
         # Show new window
         self.search_window.show()
 
-    def _generate_item_table_html(self):
-        
-        table = self.items_container 
-        if table.rowCount() == 0:
-            return "<p>No items added to the order.</p>"
-        
-        html = '<table class="item-table">\n'
-        header_labels = []
-        for col in range(table.columnCount()):
-            header_item = table.horizontalHeaderItem(col)
-            if header_item is not None:
-                header_labels.append(header_item.text())
-            else:
-                header_labels.append(f"Col {col+1}")
-        
-        html += '<tr><th>Fabric</th><th>Type</th><th>Color</th><th>Size</th><th>Qty</th><th>Unit Price</th><th>Total Price</th></tr>\n'
-        
-        for row in range(table.rowCount()):
-            html += '<tr>'
-            for col in range(table.columnCount()):
-                item = table.item(row, col)
-                text = item.text() if item is not None else ""
-                html += f'<td>{text}</td>'
-            html += '</tr>\n'
-        
-        html += '</table>'
-        return html
-
     def open_print_dialog(self):
-        item_table_html = self._generate_item_table_html()
-        
-        dialog = PrintExportDialog(content_data=item_table_html, parent=self)
+        from prints import PrintExportDialog
+        dialog = self.dialogs.get("print_export", lambda: PrintExportDialog(self, ()))
+        dialog.set_lines(self.order.lines)
         dialog.exec_()
+    def _invalidate_canvas_snapshot(self, *args):
+        self._canvas_snapshot = None
+        self._mark_dirty()
+
     def _capture_canvas_as_base64(self):
+        """
+        Canvas as a PNG data URI. Previews call this on every repaint/save/share,
+        so the result is kept until the template or an entry's text changes.
+        """
         if not hasattr(self, 'canvas') or not self.canvas:
             return ""
+        if self._canvas_snapshot is not None:
+            return self._canvas_snapshot
 
         pixmap = QPixmap(self.canvas.size())
         pixmap.fill(Qt.white) # Ensure white background
@@ -2268,17 +2610,20 @@ class OrderForm(QWidget):
         pixmap.save(buffer, "PNG") 
         
         base64_data = byte_array.toBase64().data().decode()
-        return f"data:image/png;base64,{base64_data}"
+        self._canvas_snapshot = f"data:image/png;base64,{base64_data}"
+        return self._canvas_snapshot
     
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-
-    app.setStyleSheet("""
-        QWidget {
-            font-size: 11pt;
-            font-family: Arial;
-        }
-    """)
-    window = OrderForm()
-    window.show()
+    # QtWebEngine is imported late (RIB collar preview), which Qt only allows with shared GL contexts
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    with startup_profile.phase("QApplication"):
+        app = QApplication(sys.argv)
+
+    theme.apply_theme()  # The one stylesheet for every window, see theme.py
+    with startup_profile.phase("OrderForm"):
+        window = OrderForm()
+    with startup_profile.phase("show"):
+        window.show()
+    QTimer.singleShot(0, lambda: startup_profile.finish(window))  # after the first event loop turn
+    QTimer.singleShot(lazy_imports.PREWARM_DELAY_MS, lazy_imports.prewarm)
     sys.exit(app.exec_())
\ No newline at end of file
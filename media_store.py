@@ -0,0 +1,217 @@
+"""
+Content-addressed store for template and reference images.
+
+Files are kept once per content hash under media/blobs/<2 hex>/<sha256><ext>
+and copied byte for byte (no re-encoding). A small SQLite index maps the
+names shown in the UI, and the orders that use an image, to those blobs, so
+listing or looking up images never has to scan a directory.
+
+Images that were already in media/templates or media/references before the
+store existed are indexed in place the first time the store opens.
+"""
+import hashlib
+import os
+import shutil
+import sqlite3
+from collections import namedtuple
+from datetime import datetime
+
+# The whole media tree (templates, references, layouts, blobs, caches) lives next to
+# the code, so it is found whatever directory the app is started from
+MEDIA_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'media')
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+MediaEntry = namedtuple("MediaEntry", "kind name digest path")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    path   TEXT NOT NULL,          -- relative to the media root
+    size   INTEGER NOT NULL,
+    added  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS names (
+    kind   TEXT NOT NULL,          -- 'template' or 'reference'
+    name   TEXT NOT NULL,
+    digest TEXT NOT NULL REFERENCES blobs(digest),
+    PRIMARY KEY (kind, name)
+);
+CREATE INDEX IF NOT EXISTS idx_names_digest ON names(digest);
+CREATE TABLE IF NOT EXISTS order_media (
+    order_number TEXT NOT NULL,
+    digest       TEXT NOT NULL REFERENCES blobs(digest),
+    PRIMARY KEY (order_number, digest)
+);
+CREATE INDEX IF NOT EXISTS idx_order_media_digest ON order_media(digest);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class MediaStore:
+
+    def __init__(self, root=MEDIA_ROOT):
+        self.root = root
+        os.makedirs(os.path.join(root, 'blobs'), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, 'media_index.sqlite3'))
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def _abs(self, rel_path):
+        return os.path.join(self.root, rel_path)
+
+    def _blob_path(self, digest):
+        row = self.conn.execute("SELECT path FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        return self._abs(row[0]) if row else None
+
+    def _add_blob(self, src_path, digest, in_place=False):
+        """Returns the absolute path of the blob, storing `src_path` only if the content is new."""
+        existing = self._blob_path(digest)
+        if existing and os.path.exists(existing):
+            return existing
+
+        if in_place:
+            rel_path = os.path.relpath(os.path.abspath(src_path), self.root)
+        else:
+            ext = os.path.splitext(src_path)[1].lower()
+            rel_path = os.path.join('blobs', digest[:2], digest + ext)
+            dest = self._abs(rel_path)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            tmp = dest + ".part"
+            shutil.copyfile(src_path, tmp)
+            os.replace(tmp, dest)  # never leaves a half-written blob behind
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO blobs (digest, path, size, added) VALUES (?, ?, ?, ?)",
+                (digest, rel_path, os.path.getsize(self._abs(rel_path)),
+                 datetime.now().isoformat(timespec="seconds")),
+            )
+        return self._abs(rel_path)
+
+    def _free_name(self, kind, name, digest):
+        """`name`, or `name (2)`, `name (3)`... if another image already uses it."""
+        candidate, n = name, 1
+        while True:
+            row = self.conn.execute(
+                "SELECT digest FROM names WHERE kind = ? AND name = ?", (kind, candidate)
+            ).fetchone()
+            if row is None or row[0] == digest:
+                return candidate
+            n += 1
+            candidate = f"{name} ({n})"
+
+    def add_file(self, src_path, kind, name=None, in_place=False):
+        """
+        Adds an image under `name` (default: its file name) and returns its
+        MediaEntry. Adding the same picture again, under any name, reuses the
+        stored blob.
+        """
+        digest = file_digest(src_path)
+        path = self._add_blob(src_path, digest, in_place=in_place)
+        name = self._free_name(kind, name or os.path.basename(src_path), digest)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO names (kind, name, digest) VALUES (?, ?, ?)",
+                (kind, name, digest),
+            )
+        return MediaEntry(kind, name, digest, path)
+
+    def entries(self, kind):
+        rows = self.conn.execute(
+            """
+            SELECT n.name, n.digest, b.path FROM names AS n JOIN blobs AS b ON b.digest = n.digest
+            WHERE n.kind = ? ORDER BY n.name
+            """,
+            (kind,),
+        ).fetchall()
+        return [MediaEntry(kind, name, digest, self._abs(path)) for name, digest, path in rows]
+
+    def find(self, kind, name):
+        row = self.conn.execute(
+            """
+            SELECT n.digest, b.path FROM names AS n JOIN blobs AS b ON b.digest = n.digest
+            WHERE n.kind = ? AND n.name = ?
+            """,
+            (kind, name),
+        ).fetchone()
+        return MediaEntry(kind, name, row[0], self._abs(row[1])) if row else None
+
+    def digest_for_path(self, path):
+        rel_path = os.path.relpath(os.path.abspath(path), self.root)
+        row = self.conn.execute("SELECT digest FROM blobs WHERE path = ?", (rel_path,)).fetchone()
+        return row[0] if row else None
+
+    def remove(self, kind, name):
+        """
+        Drops a name. The blob stays on disk: an unsaved order may still show
+        it, so files are only deleted by collect_garbage().
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM names WHERE kind = ? AND name = ?", (kind, name))
+
+    def collect_garbage(self, keep_paths=()):
+        """
+        Deletes blobs no name and no saved order uses any more, apart from the
+        images in `keep_paths` (whatever the open order form shows). Only
+        copies under media/blobs/ are deleted; images indexed in place belong
+        to their folder and are never touched. Returns how many were deleted.
+        """
+        keep = {d for d in (self.digest_for_path(p) for p in keep_paths if p) if d}
+        rows = self.conn.execute(
+            """
+            SELECT digest, path FROM blobs AS b
+            WHERE path LIKE 'blobs%'
+              AND NOT EXISTS (SELECT 1 FROM names WHERE digest = b.digest)
+              AND NOT EXISTS (SELECT 1 FROM order_media WHERE digest = b.digest)
+            """
+        ).fetchall()
+        blob_dir = os.path.join(os.path.abspath(self.root), 'blobs') + os.sep
+        removed = 0
+        for digest, rel_path in rows:
+            path = os.path.abspath(self._abs(rel_path))
+            if digest in keep or not path.startswith(blob_dir):
+                continue
+            with self.conn:
+                self.conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            removed += 1
+        return removed
+
+    def link_order(self, order_number, paths):
+        """Records which images an order uses, so deleting them from the gallery keeps the files."""
+        digests = {d for d in (self.digest_for_path(p) for p in paths) if d}
+        with self.conn:
+            self.conn.execute("DELETE FROM order_media WHERE order_number = ?", (order_number,))
+            self.conn.executemany(
+                "INSERT INTO order_media (order_number, digest) VALUES (?, ?)",
+                [(order_number, d) for d in digests],
+            )
+
+    def import_directory(self, kind, directory, name_func=None):
+        """One-time indexing of images that already sit in `directory` (they are not moved)."""
+        key = f"imported:{kind}:{os.path.relpath(os.path.abspath(directory), self.root)}"
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+            return
+        if os.path.isdir(directory):
+            for filename in sorted(os.listdir(directory)):
+                if filename.lower().endswith(IMAGE_EXTENSIONS):
+                    name = name_func(filename) if name_func else filename
+                    self.add_file(os.path.join(directory, filename), kind, name, in_place=True)
+        with self.conn:
+            self.conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)",
+                              (key, datetime.now().isoformat(timespec="seconds")))
@@ -0,0 +1,76 @@
+"""
+Order serialisation.
+
+An order is written as compact JSON Lines:
+
+    {"v": 1, "header": {...}, "options": {...}, "canvas": {...}, "references": [...], "line_fields": [...]}
+    ["Cotton", "T-shirt", "red", "M", 10, 200.0, ...]
+    ["Cotton", "T-shirt", "blue", "L", 5, 200.0, ...]
+
+The first record holds everything except the item lines; each following
+record is one OrderLine as a plain list in `line_fields` order. Readers can
+therefore stream the lines one by one without building a big dict first,
+and lines written by an older version (fewer fields) still load.
+"""
+import json
+
+from order_model import OrderLine
+
+SCHEMA_VERSION = 1
+LINE_FIELDS = OrderLine.__slots__
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def dumps(state, lines):
+    """Serialise an order. `state` is the dict from OrderForm.get_order_state()."""
+    meta = {"v": SCHEMA_VERSION, **state, "line_fields": list(LINE_FIELDS)}
+    out = [_dumps(meta)]
+    out.extend(_dumps([getattr(line, f) for f in LINE_FIELDS]) for line in lines)
+    return "\n".join(out)
+
+
+def iter_records(text_lines):
+    """
+    Streaming reader: yields the state dict first and then one OrderLine per
+    record. `text_lines` can be an open file or any iterable of strings.
+    """
+    records = iter(text_lines)
+    for raw in records:
+        if raw.strip():
+            meta = json.loads(raw)
+            break
+    else:
+        raise ValueError("Empty order data.")
+
+    version = meta.pop("v", None)
+    if version is None or version > SCHEMA_VERSION:
+        raise ValueError(f"Unsupported order format version: {version}")
+    fields = meta.pop("line_fields", LINE_FIELDS)
+    known = [f in LINE_FIELDS for f in fields]
+    yield meta
+
+    for raw in records:
+        if not raw.strip():
+            continue
+        values = json.loads(raw)
+        yield OrderLine(**{f: v for f, v, ok in zip(fields, values, known) if ok})
+
+
+def loads(text):
+    """Returns (state, [OrderLine, ...])."""
+    records = iter_records(text.splitlines())
+    state = next(records)
+    return state, list(records)
+
+
+def save_file(path, state, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps(state, lines))
+
+
+def load_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        records = iter_records(f)
+        state = next(records)
+        return state, list(records)
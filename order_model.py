@@ -0,0 +1,255 @@
+"""
+Headless order model.
+
+Keeps quantities, prices and add-ons as numbers so pricing (and printing)
+does not depend on the QTableWidget/QTableView that displays them.
+"""
+
+SHIRT_TYPES = ("t-shirt",)
+PANT_TYPES = ("track-pant", "shorts")
+
+
+def header_tax_percentage(header):
+    """Tax rate of a saved order header (see OrderForm.get_order_state): 0 unless tax is applied."""
+    if header.get("tax_apply") != "Y":
+        return 0.0
+    try:
+        return float(header.get("tax_percentage") or 0)
+    except ValueError:
+        return 0.0
+
+
+class OrderLine:
+    """One (fabric, type, colour, size) row of an order."""
+
+    __slots__ = (
+        "fabric", "item_type", "color", "size", "qty", "unit_price", "status",
+        "print_add_on", "collar_add_on", "track_add_on",
+        "barcode", "remark",
+        "cutting_employee", "printing_employee", "collar_employee", "stretching_employee",
+        "collar_type",
+    )
+
+    def __init__(self, fabric="", item_type="", color="", size="", qty=0, unit_price=0.0,
+                 status="Pending", print_add_on=0.0, collar_add_on=0.0, track_add_on=0.0,
+                 barcode="", remark="", cutting_employee="", printing_employee="",
+                 collar_employee="", stretching_employee="", collar_type="NONE"):
+        self.fabric = fabric
+        self.item_type = item_type
+        self.color = color
+        self.size = size
+        self.qty = int(qty)
+        self.unit_price = float(unit_price)
+        self.status = status
+        self.print_add_on = float(print_add_on)
+        self.collar_add_on = float(collar_add_on)
+        self.track_add_on = float(track_add_on)
+        self.barcode = barcode
+        self.remark = remark
+        self.cutting_employee = cutting_employee
+        self.printing_employee = printing_employee
+        self.collar_employee = collar_employee
+        self.stretching_employee = stretching_employee
+        self.collar_type = collar_type
+
+    def replace(self, **changes):
+        """A copy with some fields changed, for Order.replace_line (lines aren't edited in place)."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return OrderLine(**values)
+
+    @property
+    def is_shirt(self):
+        type_text = self.item_type.lower()
+        return any(t in type_text for t in SHIRT_TYPES)
+
+    @property
+    def is_pant(self):
+        type_text = self.item_type.lower()
+        return any(t in type_text for t in PANT_TYPES)
+
+    @property
+    def add_ons(self):
+        return self.print_add_on + self.collar_add_on + self.track_add_on
+
+    @property
+    def total(self):
+        """(unit + add-ons) * qty"""
+        return (self.unit_price + self.add_ons) * self.qty
+
+    @classmethod
+    def from_data(cls, data, print_add_on=0.0, collar_add_on=0.0, track_add_on=0.0, collar_type="NONE"):
+        """
+        Build a line from the dict used by ItemInputDialog/EmployeeDetailsDialog.
+        Raises ValueError if Qty or Unit are not numbers.
+        """
+        return cls(
+            fabric=data.get("Fabric", ""),
+            item_type=data.get("Type", ""),
+            color=data.get("Color", ""),
+            size=data.get("Size", ""),
+            qty=int(data["Qty"]),
+            unit_price=float(data["Unit"]),
+            status=data.get("Status", "Pending"),
+            print_add_on=print_add_on,
+            collar_add_on=collar_add_on,
+            track_add_on=track_add_on,
+            barcode=data.get("Barcode", ""),
+            remark=data.get("Remark", ""),
+            cutting_employee=data.get("Cutting Employee Name", ""),
+            printing_employee=data.get("Printing Employee Name", ""),
+            collar_employee=data.get("RIB Collar Employee Name", ""),
+            stretching_employee=data.get("Stretching Employee Name", ""),
+            collar_type=collar_type,
+        )
+
+    def to_data(self):
+        """Inverse of from_data(), text values as the dialogs expect them."""
+        return {
+            "Fabric": self.fabric,
+            "Type": self.item_type,
+            "Color": self.color,
+            "Size": self.size,
+            "Qty": str(self.qty),
+            "Unit": f"{self.unit_price:.2f}",
+            "Status": self.status,
+            "Total": f"{self.total:.2f}",
+            "PrintAddOn": f"{self.print_add_on:.2f}",
+            "CollarAddOn": f"{self.collar_add_on:.2f}",
+            "TrackAddOn": f"{self.track_add_on:.2f}",
+            "Barcode": self.barcode,
+            "Remark": self.remark,
+            "Cutting Employee Name": self.cutting_employee,
+            "Printing Employee Name": self.printing_employee,
+            "RIB Collar Employee Name": self.collar_employee,
+            "Stretching Employee Name": self.stretching_employee,
+        }
+
+
+class OrderTotals:
+    """
+    Running subtotal, per-type subtotals and tax for an Order.
+    Every change is applied as a delta, so one edit costs the same on a
+    5 line order and on a 500 line one.
+    """
+
+    __slots__ = ("subtotal", "by_type", "line_counts", "tax_percentage")
+
+    def __init__(self, tax_percentage=0.0):
+        self.subtotal = 0.0
+        self.by_type = {}
+        self.line_counts = {}  # item type -> lines of that type, so free lines keep their type listed
+        self.tax_percentage = float(tax_percentage)
+
+    def add(self, line):
+        self._apply(line.item_type, line.total, 1)
+
+    def remove(self, line):
+        self._apply(line.item_type, -line.total, -1)
+
+    def replace(self, old_line, new_line):
+        self.remove(old_line)
+        self.add(new_line)
+
+    def rebuild(self, lines):
+        """Full recount, only needed when the lines were changed behind the Order's back."""
+        self.subtotal = 0.0
+        self.by_type = {}
+        self.line_counts = {}
+        for line in lines:
+            self.add(line)
+
+    def _apply(self, item_type, delta, count):
+        self.subtotal += delta
+        remaining = self.line_counts.get(item_type, 0) + count
+        if remaining <= 0:
+            # Last line of this type is gone, drop the float residue with it
+            self.line_counts.pop(item_type, None)
+            self.by_type.pop(item_type, None)
+        else:
+            self.line_counts[item_type] = remaining
+            self.by_type[item_type] = self.by_type.get(item_type, 0.0) + delta
+        if not self.line_counts:
+            self.subtotal = 0.0
+
+    @property
+    def tax_amount(self):
+        return self.subtotal * self.tax_percentage / 100.0
+
+    @property
+    def grand_total(self):
+        return self.subtotal + self.tax_amount
+
+
+class Order:
+    """
+    Ordered list of OrderLines plus their running totals.
+    Lines must be changed through add_line/replace_line/remove_line (not
+    edited in place) so the totals stay in step.
+    """
+
+    __slots__ = ("lines", "totals")
+
+    def __init__(self, lines=None, tax_percentage=0.0):
+        self.lines = list(lines) if lines else []
+        self.totals = OrderTotals(tax_percentage)
+        self.totals.rebuild(self.lines)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def add_line(self, line):
+        self.lines.append(line)
+        self.totals.add(line)
+        return len(self.lines) - 1
+
+    def add_lines(self, lines):
+        """Appends several lines at once; returns the row of the first one."""
+        first = len(self.lines)
+        for line in lines:
+            self.add_line(line)
+        return first
+
+    def replace_line(self, row, line):
+        self.totals.replace(self.lines[row], line)
+        self.lines[row] = line
+
+    def remove_line(self, row):
+        line = self.lines.pop(row)
+        self.totals.remove(line)
+        return line
+
+    def set_lines(self, lines):
+        """Replaces all lines at once (loading an order), with a single totals recount."""
+        self.lines = list(lines)
+        self.totals.rebuild(self.lines)
+
+    def clear(self):
+        self.set_lines([])
+
+    @property
+    def tax_percentage(self):
+        return self.totals.tax_percentage
+
+    @tax_percentage.setter
+    def tax_percentage(self, value):
+        self.totals.tax_percentage = float(value)
+
+    @property
+    def subtotal(self):
+        return self.totals.subtotal
+
+    @property
+    def subtotal_by_type(self):
+        return dict(self.totals.by_type)
+
+    @property
+    def tax_amount(self):
+        return self.totals.tax_amount
+
+    @property
+    def grand_total(self):
+        return self.totals.grand_total
@@ -0,0 +1,389 @@
+"""
+On-disk order store (SQLite, standard library only).
+
+Only the columns the order list searches on are stored as columns, each with
+its own index; the complete order goes into `payload` as serialized text.
+Remarks are additionally indexed with FTS5 so free-text search is a lookup
+instead of a scan.
+"""
+import os
+import difflib
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+
+# Saved orders live here, next to media/ and the code (not the working directory, which
+# a shortcut can set to anything and which would quietly start an empty store)
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+ORDER_DB_PATH = os.path.join(DATA_DIR, 'orders.sqlite3')
+
+FUZZY_NAME_LIMIT = 10  # close party/school names considered per search
+FUZZY_CANDIDATES = 50  # names sharing the most trigrams with the query, compared with difflib
+
+SEARCH_COLUMNS = "id, order_number, party_name, school_name, barcode, order_date, delivery_date, status, total"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id            INTEGER PRIMARY KEY,
+    order_number  TEXT NOT NULL COLLATE NOCASE,
+    party_name    TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    school_name   TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    barcode       TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    order_date    TEXT NOT NULL DEFAULT '',   -- yyyy-MM-dd so ranges and sorting work on text
+    delivery_date TEXT NOT NULL DEFAULT '',
+    status        TEXT NOT NULL DEFAULT '',
+    total         REAL NOT NULL DEFAULT 0,
+    remark        TEXT NOT NULL DEFAULT '',
+    payload       TEXT,
+    updated_at    TEXT NOT NULL DEFAULT ''
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_number ON orders(order_number);
+CREATE INDEX IF NOT EXISTS idx_orders_party ON orders(party_name);
+CREATE INDEX IF NOT EXISTS idx_orders_school ON orders(school_name);
+CREATE INDEX IF NOT EXISTS idx_orders_barcode ON orders(barcode);
+CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders(order_date);
+CREATE INDEX IF NOT EXISTS idx_orders_delivery_date ON orders(delivery_date);
+CREATE INDEX IF NOT EXISTS idx_orders_updated ON orders(updated_at, id);
+
+-- Item level barcodes, so scanning any garment finds its order
+CREATE TABLE IF NOT EXISTS order_barcodes (
+    barcode  TEXT NOT NULL COLLATE NOCASE,
+    order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_order_barcodes_barcode ON order_barcodes(barcode);
+CREATE INDEX IF NOT EXISTS idx_order_barcodes_order ON order_barcodes(order_id);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS orders_fts USING fts5(
+    remark, content='orders', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS orders_fts_insert AFTER INSERT ON orders BEGIN
+    INSERT INTO orders_fts(rowid, remark) VALUES (new.id, new.remark);
+END;
+CREATE TRIGGER IF NOT EXISTS orders_fts_delete AFTER DELETE ON orders BEGIN
+    INSERT INTO orders_fts(orders_fts, rowid, remark) VALUES ('delete', old.id, old.remark);
+END;
+CREATE TRIGGER IF NOT EXISTS orders_fts_update AFTER UPDATE OF remark ON orders BEGIN
+    INSERT INTO orders_fts(orders_fts, rowid, remark) VALUES ('delete', old.id, old.remark);
+    INSERT INTO orders_fts(rowid, remark) VALUES (new.id, new.remark);
+END;
+"""
+
+
+def _like_prefix(text):
+    """Escapes LIKE wildcards so user text is matched literally, as a prefix."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _trigrams(text):
+    """'kvs' -> {'  k', ' kv', 'kvs', 'vs '}"""
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _fts_query(text):
+    """'red coll' -> '"red"* "coll"*' (every word, as a prefix)"""
+    words = [w.replace('"', '""') for w in text.split()]
+    return " ".join(f'"{w}"*' for w in words if w)
+
+
+class OrderStore:
+    """
+    Thin wrapper around the orders database.
+    Each thread gets its own connection, so searches can run off the GUI thread.
+    """
+
+    def __init__(self, path=ORDER_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self.has_fts = False
+        self._names = None  # lower-cased name -> name, see _name_index()
+        self._trigrams = None
+        self._names_lock = threading.Lock()  # saves run on the GUI thread, searches on a worker
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._create_schema()
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys = ON")
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode = WAL")  # readers don't block the SAVE button
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self.connection()
+        with conn:
+            conn.executescript(SCHEMA)
+            try:
+                conn.executescript(FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: remarks fall back to a LIKE scan
+                self.has_fts = False
+
+    def save_order(self, record, payload=None, barcodes=()):
+        """
+        Inserts or updates (by order number) one order and returns its id.
+        `record` holds the searchable header fields: order_number, party_name,
+        school_name, barcode, order_date, delivery_date (yyyy-MM-dd), status,
+        total and remark.
+        """
+        order_number = (record.get("order_number") or "").strip()
+        if not order_number:
+            raise ValueError("Order number is required to save an order.")
+
+        values = (
+            order_number,
+            record.get("party_name", ""),
+            record.get("school_name", ""),
+            record.get("barcode", ""),
+            record.get("order_date", ""),
+            record.get("delivery_date", ""),
+            record.get("status", ""),
+            float(record.get("total", 0.0) or 0.0),
+            record.get("remark", ""),
+            payload,
+            datetime.now().isoformat(timespec="seconds"),
+        )
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO orders (order_number, party_name, school_name, barcode, order_date,
+                                    delivery_date, status, total, remark, payload, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(order_number) DO UPDATE SET
+                    party_name = excluded.party_name, school_name = excluded.school_name,
+                    barcode = excluded.barcode, order_date = excluded.order_date,
+                    delivery_date = excluded.delivery_date, status = excluded.status,
+                    total = excluded.total, remark = excluded.remark,
+                    payload = excluded.payload, updated_at = excluded.updated_at
+                """,
+                values,
+            )
+            order_id = conn.execute(
+                "SELECT id FROM orders WHERE order_number = ?", (order_number,)
+            ).fetchone()["id"]
+            conn.execute("DELETE FROM order_barcodes WHERE order_id = ?", (order_id,))
+            conn.executemany(
+                "INSERT INTO order_barcodes (barcode, order_id) VALUES (?, ?)",
+                [(b, order_id) for b in set(barcodes) if b],
+            )
+        with self._names_lock:
+            if self._names is not None:
+                self._add_name(record.get("party_name", ""))
+                self._add_name(record.get("school_name", ""))
+        return order_id
+
+    def delete_order(self, order_id):
+        conn = self.connection()
+        with conn:
+            conn.execute("DELETE FROM orders WHERE id = ?", (order_id,))
+        with self._names_lock:
+            self._names = self._trigrams = None  # rebuilt by the next fuzzy search
+
+    def get_payload(self, order_id):
+        row = self.connection().execute(
+            "SELECT payload FROM orders WHERE id = ?", (order_id,)
+        ).fetchone()
+        return row["payload"] if row else None
+
+    def find_by_number(self, order_number):
+        row = self.connection().execute(
+            f"SELECT {SEARCH_COLUMNS} FROM orders WHERE order_number = ?", (order_number,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def count(self):
+        return self.connection().execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    def list_orders(self, limit=100, offset=0, after=None):
+        """
+        Newest first. Pass the (order_date, id) of the last row already shown
+        as `after` to get the next page straight from the index (keyset
+        paging), so page 3000 costs the same as page 1.
+        """
+        if after is not None:
+            rows = self.connection().execute(
+                f"""
+                SELECT {SEARCH_COLUMNS} FROM orders
+                WHERE (order_date, id) < (?, ?)
+                ORDER BY order_date DESC, id DESC LIMIT ?
+                """,
+                (after[0], after[1], limit),
+            ).fetchall()
+        else:
+            rows = self.connection().execute(
+                f"SELECT {SEARCH_COLUMNS} FROM orders ORDER BY order_date DESC, id DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def filter_orders(self, date_from=None, date_to=None, party="", school="", status=""):
+        """
+        Orders for batch exports, oldest first. Dates are yyyy-MM-dd and
+        inclusive; party and school match as prefixes, status exactly. Empty
+        filters are left out.
+        """
+        where, params = [], []
+        if date_from:
+            where.append("order_date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("order_date <= ?")
+            params.append(date_to)
+        if party:
+            where.append("party_name LIKE ? ESCAPE '\\'")
+            params.append(_like_prefix(party.strip()))
+        if school:
+            where.append("school_name LIKE ? ESCAPE '\\'")
+            params.append(_like_prefix(school.strip()))
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        sql = f"SELECT {SEARCH_COLUMNS} FROM orders"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self.connection().execute(sql + " ORDER BY order_date, id", params).fetchall()
+        return [dict(r) for r in rows]
+
+    def _name_index(self):
+        """
+        Distinct party and school names plus a trigram index over them, built
+        once and then kept up to date by save_order(), so a fuzzy search only
+        compares `text` with the few names that share letters with it.
+        Only call with _names_lock held.
+        """
+        if self._names is None:
+            rows = self.connection().execute(
+                "SELECT party_name FROM orders UNION SELECT school_name FROM orders"
+            ).fetchall()
+            self._names, self._trigrams = {}, {}
+            for r in rows:
+                self._add_name(r[0])
+        return self._names, self._trigrams
+
+    def _add_name(self, name):
+        """Only call with _names_lock held."""
+        key = (name or "").strip().lower()
+        if not key or key in self._names:
+            return
+        self._names[key] = name
+        for gram in _trigrams(key):
+            self._trigrams.setdefault(gram, set()).add(key)
+
+    def _close_names(self, text):
+        """Party/school names that look like `text` (typos, missing letters)."""
+        if len(text) < 3:
+            return []
+        grams = _trigrams(text.lower())
+        with self._names_lock:
+            names, index = self._name_index()
+            shared = Counter()
+            for gram in grams:
+                shared.update(index.get(gram, ()))
+            # Only names sharing a good part of the trigrams are worth a difflib compare
+            candidates = {n: names[n] for n, c in shared.most_common(FUZZY_CANDIDATES) if c * 3 >= len(grams)}
+        matches = difflib.get_close_matches(text.lower(), list(candidates), n=FUZZY_NAME_LIMIT, cutoff=0.6)
+        return [candidates[m] for m in matches]
+
+    def _search_ranks(self, ranks, params, limit, after):
+        """
+        One pass of search(): every branch of `ranks` is its own small query
+        with its own LIMIT (newest first, past the `after` key), and each rank
+        leaves out rows a better rank already matched, so a row shows up once.
+        """
+        branches, seen = [], []
+        for rank, conditions in ranks:
+            taken = " AND ".join(f"NOT ({c})" for c in seen)
+            seen.extend(conditions)
+            if after is not None and rank < after[0]:
+                continue  # pages before this one already went past this rank
+            for condition in conditions:
+                where = [condition]
+                if taken:
+                    where.append(taken)
+                if after is not None and rank == after[0]:
+                    where.append("(o.updated_at, o.id) < (:after_updated, :after_id)")
+                branches.append(
+                    f"""SELECT * FROM (
+                        SELECT o.id AS id, {rank} AS rank FROM orders AS o
+                        WHERE {" AND ".join(where)}
+                        ORDER BY o.updated_at DESC, o.id DESC LIMIT :limit)"""
+                )
+        if not branches:
+            return []
+        if after is not None:
+            params = dict(params, after_updated=after[1], after_id=after[2])
+        columns = ", ".join(f"o.{c.strip()}" for c in SEARCH_COLUMNS.split(","))
+        rows = self.connection().execute(
+            f"""
+            WITH hits(id, rank) AS ({" UNION ALL ".join(branches)})
+            SELECT {columns}, o.updated_at AS updated_at, h.rank AS rank
+            FROM (SELECT id, MIN(rank) AS rank FROM hits GROUP BY id) AS h
+            JOIN orders AS o ON o.id = h.id
+            ORDER BY h.rank, o.updated_at DESC, o.id DESC
+            LIMIT :limit
+            """,
+            dict(params, limit=limit),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def search(self, text, limit=100, after=None):
+        """
+        Ranked search:
+          0 - order number or barcode (header or item) equals `text`
+          1 - party or school name starts with `text`
+          2 - order number prefix or remark words (FTS)
+          3 - party/school name close to `text` (typos); only looked up when
+              ranks 0-2 don't fill the page
+        then most recently saved first inside each rank. Rows carry their
+        `rank` and `updated_at`; pass (rank, updated_at, id) of the last row
+        shown as `after` for the next page (keyset paging, like list_orders).
+
+        Ranks 0, 1 and the order number prefix come from indexes and the
+        remarks from FTS5. Without FTS5 the remark match is a LIKE scan, and
+        rank 1 still has to sort every name starting with `text` to find the
+        newest, which is a lot of rows for a one-letter prefix.
+        """
+        text = text.strip()
+        if not text:
+            return self.list_orders(limit)
+
+        prefix = _like_prefix(text)
+        params = {"text": text, "prefix": prefix}
+        remark = []
+        fts = _fts_query(text)
+        if self.has_fts and fts:
+            remark.append("o.id IN (SELECT rowid FROM orders_fts WHERE orders_fts MATCH :fts)")
+            params["fts"] = fts
+        elif not self.has_fts:
+            remark.append("o.remark LIKE :contains ESCAPE '\\'")
+            params["contains"] = "%" + prefix
+        ranks = [
+            (0, ["o.order_number = :text", "o.barcode = :text",
+                 "o.id IN (SELECT order_id FROM order_barcodes WHERE barcode = :text)"]),
+            (1, ["o.party_name LIKE :prefix ESCAPE '\\'", "o.school_name LIKE :prefix ESCAPE '\\'"]),
+            (2, ["o.order_number LIKE :prefix ESCAPE '\\'"] + remark),
+        ]
+        rows = self._search_ranks(ranks, params, limit, after)
+        if len(rows) >= limit:
+            return rows
+
+        names = self._close_names(text)
+        if not names:
+            return rows
+        params.update((f"name{i}", name) for i, name in enumerate(names))
+        listed = ", ".join(f":name{i}" for i in range(len(names)))
+        ranks.append((3, [f"o.party_name IN ({listed})", f"o.school_name IN ({listed})"]))
+        if rows:
+            last = rows[-1]
+            after = (last["rank"], last["updated_at"], last["id"])
+        return rows + self._search_ranks(ranks, params, limit - len(rows), after)
@@ -3,14 +3,248 @@ import os
 import webbrowser
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QMessageBox, QFileDialog, QMenu, QApplication)
 from PyQt5.QtPrintSupport import QPrinter, QPrintDialog, QPrintPreviewDialog
-from PyQt5.QtGui import QTextDocument, QCursor, QPixmap, QPainter
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-from PyQt5.QtCore import QUrl, QSize, QRectF, QDate
-from openpyxl import Workbook
-from docx import Document
-from pptx import Presentation
-from pptx.util import Inches
-import re
+from PyQt5.QtGui import QTextDocument, QCursor, QPixmap, QPainter, QFontMetricsF, QPageLayout
+from PyQt5.QtCore import QUrl, QSize, QSizeF, QRectF, QMarginsF, QDate
+from collections import namedtuple
+import templating
+from order_model import Order, header_tax_percentage
+
+# One column of an item table: header text, how to get the value from an
+# OrderLine, and how to print it.
+ItemColumn = namedtuple("ItemColumn", "header value fmt")
+
+ORDER_COLUMNS = (
+    ItemColumn("Fabric", lambda line: line.fabric, "{}"),
+    ItemColumn("Type", lambda line: line.item_type, "{}"),
+    ItemColumn("Color", lambda line: line.color, "{}"),
+    ItemColumn("Size", lambda line: line.size, "{}"),
+    ItemColumn("Qty", lambda line: line.qty, "{}"),
+    ItemColumn("Unit Price", lambda line: line.unit_price, "{:.2f}"),
+    ItemColumn("Total Price", lambda line: line.total, "{:.2f}"),
+)
+# Workshop slips: what to make, no prices
+WORKSHOP_COLUMNS = ORDER_COLUMNS[:5]
+
+def _item_table_html(columns, rows):
+    if not rows:
+        return "<p>No items added to the order.</p>"
+    header = "".join(f"<th>{col.header}</th>" for col in columns)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{col.fmt.format(value)}</td>" for col, value in zip(columns, row)) + "</tr>\n"
+        for row in rows
+    )
+    return f'<table class="item-table">\n<tr>{header}</tr>\n{body}</table>'
+
+def _tax_summary_html(subtotal, tax_percent, tax_amount, grand_total):
+    return templating.render('tax_summary', {
+        'subtotal': f"{subtotal:.2f}",
+        'tax_percent': f"{tax_percent:.1f}",
+        'tax_amount': f"{tax_amount:.2f}",
+        'grand_total': f"{grand_total:.2f}",
+    })
+
+def _remarks_text(remarks):
+    return remarks if remarks != "N/A" and remarks else "No special remarks."
+
+def _reference_images_html(uris):
+    """Customer reference photos, two per row ("" if there are none)."""
+    if not uris:
+        return ""
+    rows = []
+    for i in range(0, len(uris), 2):
+        cells = templating.render('reference_image_cell', {'uri': uris[i], 'padding': "5 25px", 'alt': "Reference Image 1"})
+        if i + 1 < len(uris):
+            cells += templating.render('reference_image_cell', {'uri': uris[i + 1], 'padding': "5 85px", 'alt': "Reference Image 2"})
+        else:
+            cells += '<td style="width: 50%; border: none;"></td>'
+        rows.append(f'<tr style="page-break-inside: avoid;">{cells}</tr>')
+    return templating.render('reference_images', {'rows': "".join(rows)})
+
+# Labels of the option widgets on the OrderForm, for documents built from a saved order
+COLLAR_LABELS = {'self': "Self Collar", 'rib': "RIB collar", 'patti': "RIB Patti"}
+STYLE_LABELS = {'button': "BUTTON", 'plain': "PLAIN", 'box': "BOX", 'vplus': "V+"}
+
+# A QTextDocument without a paint device lays out in pixels at Qt's default 96 dpi
+LAYOUT_DPI = 96
+
+def _display_date(iso_date):
+    """yyyy-MM-dd (as saved) -> dd-MM-yyyy (as the form shows it)"""
+    parts = (iso_date or "").split("-")
+    return "-".join(reversed(parts)) if len(parts) == 3 else (iso_date or "N/A")
+
+def saved_order_html(state, lines):
+    """
+    Order summary of a saved order (state and lines from order_io), without
+    an OrderForm, for batch exports. The design canvas isn't saved with the
+    order, so there is no product image.
+    """
+    header = state.get("header", {})
+    options = state.get("options", {})
+    order = Order(lines, header_tax_percentage(header))
+
+    printing = "".join(f"<li>{key.upper()} (Price: {price} INR)</li>"
+                       for key, (checked, price) in options.get("print", {}).items() if checked)
+    collar = "".join(f"<li>{COLLAR_LABELS.get(key, key)} (Price: {price})</li>"
+                     for key, (checked, price) in options.get("collar", {}).items() if checked)
+    buttons = "".join(f"<li>{STYLE_LABELS.get(key, key)}</li>"
+                      for key, checked in options.get("style", {}).items() if checked)
+    track = "".join(f"<li>{key}{f' ({extra})' if extra else ''} (Price: {price} INR)</li>"
+                    for key, (checked, price, extra) in options.get("track", {}).items() if checked)
+
+    return templating.render('order_summary', {
+        'order_no': header.get("order_number") or "N/A",
+        'order_date': _display_date(header.get("order_date")),
+        'delivery_date': _display_date(header.get("delivery_date")),
+        'party_name': header.get("party_name") or "N/A",
+        'gst_no': header.get("gst_no") or "N/A",
+        'school_name': header.get("school_name") or "N/A",
+        'address': header.get("address") or "N/A",
+        'barcode': header.get("barcode") or "N/A",
+        'advance_paid': f"{float(header.get('advance_paid') or 0):.2f}",
+        'product_image': '<p>No Product Image Selected.</p>',
+        'printing_options': printing or "<li>None Selected</li>",
+        'collar_options': collar or "<li>None Selected</li>",
+        'button_options': buttons or "<li>None Selected (Default)</li>",
+        'track_pant_options': track or "<li>None Selected</li>",
+        'item_table': _item_table_html(ORDER_COLUMNS, [[col.value(line) for col in ORDER_COLUMNS] for line in order]),
+        'tax_summary': _tax_summary_html(order.subtotal, order.tax_percentage, order.tax_amount, order.grand_total),
+        'remarks': _remarks_text(header.get("remark")),
+    })
+
+class DocumentCacheMixin:
+    """
+    Builds a dialog's HTML and parses it into a QTextDocument once, and hands
+    the same document to preview, direct print, PDF and PNG. The parent
+    OrderForm bumps its `revision` on every edit; a different revision means
+    rebuild.
+
+    Printing also keeps the document laid out into pages, one layout per
+    printer page size, so preview repaints, zooms and page changes only paint
+    the pages again (see paged_document()).
+
+    The HTML is print_templates/<template_name>.html filled in with the dict
+    from print_context(), so a new slip type is a template plus a context.
+    Item tables are table_rows() projected onto table_columns(); by default
+    those are the dialog's `lines` (OrderLines) and `item_columns`.
+    """
+    template_name = None
+    item_columns = ORDER_COLUMNS
+    show_prices = True
+    lines = ()
+    _cached_html = None
+    _cached_document = None
+    _cached_revision = None
+    _paged_document = None
+    _paged_key = None
+
+    def set_lines(self, lines):
+        """New lines for a reused dialog; the next print rebuilds the document."""
+        self.lines = list(lines)
+        self._cached_html = None
+        self._cached_document = None
+        self._paged_document = None
+
+    def get_print_content(self):
+        return templating.render(self.template_name, self.print_context())
+
+    def table_rows(self):
+        """What the item table has one row per; dialogs that don't tabulate order lines override this."""
+        return self.lines
+
+    def table_columns(self):
+        return self.item_columns
+
+    def item_headers(self):
+        return [col.header for col in self.table_columns()]
+
+    def item_rows(self):
+        """Typed values (numbers stay numbers) for the table_columns() of every table row."""
+        columns = self.table_columns()
+        return [[col.value(row) for col in columns] for row in self.table_rows()]
+
+    def item_text_rows(self):
+        return [[col.fmt.format(value) for col, value in zip(self.table_columns(), row)] for row in self.item_rows()]
+
+    def item_table_html(self):
+        return _item_table_html(self.table_columns(), self.item_rows())
+
+    def _write_excel(self, fileName):
+        import excel_export
+        parent = self.parent()
+        header = parent.get_order_state()["header"] if hasattr(parent, 'get_order_state') else {}
+        columns = excel_export.LINE_COLUMNS if self.show_prices else excel_export.WORKSHOP_COLUMNS
+        excel_export.save_order(fileName, header, self.lines, columns)
+
+    def _source_revision(self):
+        return getattr(self.parent(), 'revision', None)
+
+    def cached_html(self):
+        revision = self._source_revision()
+        if self._cached_html is None or revision != self._cached_revision:
+            self._cached_html = self.get_print_content()
+            self._cached_document = None
+            self._paged_document = None
+            self._cached_revision = revision
+        return self._cached_html
+
+    def cached_document(self):
+        html = self.cached_html()
+        if self._cached_document is None:
+            doc = QTextDocument()
+            doc.setHtml(html)
+            self._cached_document = doc
+        return self._cached_document
+
+    def paged_document(self, printer):
+        """
+        The document laid out into pages of `printer`'s size, the way
+        QTextDocument.print_() lays it out (2 cm margins), but kept until the
+        revision or the page size changes instead of redone on every print.
+        Laid out at screen resolution; print_document() scales to the printer.
+        """
+        html = self.cached_html()
+        key = (printer.width(), printer.height(), printer.logicalDpiX(), printer.logicalDpiY())
+        if self._paged_document is None or key != self._paged_key:
+            doc = QTextDocument()
+            doc.setHtml(html)
+            fmt = doc.rootFrame().frameFormat()
+            fmt.setMargin(2 / 2.54 * LAYOUT_DPI)
+            doc.rootFrame().setFrameFormat(fmt)
+            doc.setPageSize(QSizeF(printer.width() * LAYOUT_DPI / printer.logicalDpiX(),
+                                   printer.height() * LAYOUT_DPI / printer.logicalDpiY()))
+            self._paged_document = doc
+            self._paged_key = key
+        return self._paged_document
+
+    def print_document(self, printer):
+        if all(m == 0 for m in printer.pageLayout().margins(QPageLayout.Millimeter).getCoords()):
+            printer.setPageMargins(QMarginsF(2, 2, 2, 2), QPageLayout.Millimeter)  # as print_() does
+        doc = self.paged_document(printer)
+        page = doc.pageSize()
+        scale_x = printer.logicalDpiX() / LAYOUT_DPI
+        scale_y = printer.logicalDpiY() / LAYOUT_DPI
+        painter = QPainter(printer)
+        try:
+            font = doc.defaultFont()
+            metrics = QFontMetricsF(font, printer)
+            margin_x = 2 / 2.54 * printer.logicalDpiX()
+            margin_y = 2 / 2.54 * printer.logicalDpiY()
+            for index in range(doc.pageCount()):
+                if index:
+                    printer.newPage()
+                painter.save()
+                painter.scale(scale_x, scale_y)
+                painter.translate(0, -index * page.height())
+                doc.drawContents(painter, QRectF(0, index * page.height(), page.width(), page.height()))
+                painter.restore()
+                # Page number in the bottom right margin, like print_()
+                number = str(index + 1)
+                painter.setFont(font)
+                painter.drawText(round(printer.width() - margin_x - metrics.horizontalAdvance(number)),
+                                 round(printer.height() - margin_y + metrics.ascent() + 5 * printer.logicalDpiY() / 72),
+                                 number)
+        finally:
+            painter.end()
 
 class ExportShareMixin:
 
@@ -65,24 +299,13 @@ class ExportShareMixin:
             if not fileName: return None
             show_msg = True
         try:
-            from openpyxl import Workbook
-            wb = Workbook()
-            ws = wb.active
-            # Simplified Excel content extraction (adapt as needed)
-            ws['A1'] = "Order No:"
-            ws['B1'] = self.parent().order_number.text() if hasattr(self.parent(), 'order_number') else "N/A"
-            ws['A2'] = "Party Name:"
-            ws['B2'] = self.parent().party_name.text() if hasattr(self.parent(), 'party_name') else "N/A"
-            ws['A4'] = "Item Details (Raw Content):"
-            # NOTE: self.content_data is accessed directly from the inheriting class
-            ws['A5'] = self.content_data 
-            wb.save(fileName)
+            self._write_excel(fileName)
             if show_msg:
                 QMessageBox.information(self, "Success", f"Excel file saved to:\n{fileName}")
             return fileName
 
         except ImportError:
-            QMessageBox.critical(self, "Error", "The 'openpyxl' library is required for Excel export. Please install it.")
+            QMessageBox.critical(self, "Error", "The 'xlsxwriter' library is required for Excel export. Please install it.")
             return None
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An error occurred during Excel export: {e}")
@@ -98,8 +321,7 @@ class ExportShareMixin:
             if not fileName: return None
             show_msg = True        
 
-        doc = QTextDocument()
-        doc.setHtml(self.get_print_content())
+        doc = self.cached_document()
         image_size = doc.size().toSize()
         if image_size.isEmpty(): image_size = QSize(800, 1000)           
         image = QPixmap(image_size)
@@ -138,7 +360,12 @@ class ExportShareMixin:
                 doc.add_paragraph(f'Order No: {order_no}')
                 doc.add_paragraph(f'Party Name: {party_name}')
                 doc.add_heading('Item Details:', level=2)
-                doc.add_paragraph(self.content_data) 
+                table = doc.add_table(rows=1, cols=len(self.table_columns()))
+                for cell, header in zip(table.rows[0].cells, self.item_headers()):
+                    cell.text = header
+                for row in self.item_text_rows():
+                    for cell, text in zip(table.add_row().cells, row):
+                        cell.text = text
                 
                 doc.save(fileName)
 
@@ -153,7 +380,8 @@ class ExportShareMixin:
                 title.text = "Order Report"
                 
                 body = slide.placeholders[1]
-                body.text = f"Order No: {order_no}\nParty Name: {party_name}\n\nItem Details:\n{self.content_data}"               
+                item_lines = "\n".join(" | ".join(row) for row in [self.item_headers()] + self.item_text_rows())
+                body.text = f"Order No: {order_no}\nParty Name: {party_name}\n\nItem Details:\n{item_lines}"
                 prs.save(fileName)
             if show_msg:
                 QMessageBox.information(self, "Success", f"{title_verb} saved to:\n{fileName}")
@@ -244,11 +472,13 @@ class ExportShareMixin:
         if file_path:
             self.share_via_whatsapp(file_path)
 
-class PrintExportDialog(QDialog):
-    def __init__(self, parent, content_data, document_type="ORDER", **kwargs):
+class PrintExportDialog(QDialog, DocumentCacheMixin):
+    template_name = "order_summary"
+
+    def __init__(self, parent, lines, document_type="ORDER", **kwargs):
         super().__init__(parent, **kwargs)
         self.setWindowTitle("Print and Export Options")
-        self.content_data = content_data 
+        self.lines = list(lines)
         self.document_type = document_type
         self.setGeometry(200, 200, 350, 200)
 
@@ -347,112 +577,12 @@ class PrintExportDialog(QDialog):
             tax_amount = 0.0
             grand_total = 0.0
 
-        tax_apply_text = self._get_parent_text('tax_apply_combo')
         display_grand_total = f"{grand_total:.2f}"
 
-        tax_summary_html = f"""
-        <table style="width: 100%; text-align: right; border-collapse: collapse; margin-top: 10px;">
-            <tr>
-                <td style="padding: 3px 0; border-top: 1px solid #ddd;"><b>Total Items Price:</b></td>
-                <td style="padding: 3px 0; border-top: 1px solid #ddd;">₹ {total_items_price:.2f}</td>
-            </tr>
-            <tr>
-                <td style="padding: 3px 0;"><b>Tax (GST) @ {tax_percent:.1f}%:</b></td>
-                <td style="padding: 3px 0;">₹ {tax_amount:.2f}</td>
-            </tr>
-            <tr>
-                <td style="font-size: 14pt; color: #d9534f; padding: 5px 0; border-top: 2px solid #333; border-bottom: 2px solid #333;"><b>GRAND TOTAL:</b></td>
-                <td style="font-size: 14pt; color: #d9534f; padding: 5px 0; border-top: 2px solid #333; border-bottom: 2px solid #333;">₹ {display_grand_total}</td>
-            </tr>
-        </table>
-        """
+        tax_summary_html = _tax_summary_html(total_items_price, tax_percent, tax_amount, grand_total)
         return tax_summary_html, display_grand_total
     
-    def _clean_table_html(self, html_content):
-        """
-        A dedicated helper to remove all table columns (<th>/<td>) that appear 
-        AFTER the 'Total Price' column.
-        """
-        if not html_content:
-            return ""
-
-        # Pattern 1: Target the Header Row (assumed to be the first <tr>...</tr>)
-        def clean_header(match):
-            header_row = match.group(0)
-            # Find the position right after "Total Price</th>"
-            # Use re.escape to handle potential special chars in "Total Price" if they were present
-            pattern = r'(Total Price<\/th>)'
-            
-            match_end = re.search(pattern, header_row, re.IGNORECASE)
-            if match_end:
-                # Keep everything up to the end of "Total Price</th>", then close the row
-                return header_row[:match_end.end()] + '</tr>'
-            return header_row # Return original if Total Price not found
-        
-        # Pattern 2: Target the Data Rows (all <tr>...</tr> after the header)
-        def clean_data_row(row_match):
-            data_row = row_match.group(0)
-            
-            # Count <td>...</td> pairs to find the one for "Total Price" (it's the 7th column in the image)
-            # Fabric (1), Type (2), Color (3), Size (4), Qty (5), Unit Price (6), Total Price (7)
-            td_matches = list(re.finditer(r'<td.*?>.*?<\/td>', data_row, re.DOTALL | re.IGNORECASE))
-            
-            if len(td_matches) >= 7:
-                # The 7th match is the Total Price column (index 6 since it's 0-based)
-                total_price_td_end = td_matches[6].end()
-                
-                # Now, find the closing </tr> tag
-                tr_end_match = re.search(r'<\/tr>', data_row)
-                
-                if tr_end_match:
-                    tr_end_pos = tr_end_match.start()
-                    
-                    # Ensure the total_price_td_end is before the </tr>
-                    if total_price_td_end < tr_end_pos:
-                        # Reconstruct the row: everything before the end of 7th <td> + the final </tr>
-                        return data_row[:total_price_td_end] + data_row[tr_end_pos:]
-            
-            return data_row # Return original if criteria not met
-
-        # Split content into rows based on <tr> and </tr>
-        rows = re.split(r'(<tr>.*?<\/tr>)', html_content, flags=re.DOTALL | re.IGNORECASE)
-        
-        cleaned_rows = []
-        if rows:
-            # The first non-empty row segment is usually the header row
-            for i, row in enumerate(rows):
-                if not row.strip():
-                    continue
-
-                if i == 1: # The first actual <tr>...</tr> block (the header)
-                    cleaned_rows.append(clean_header(re.search(r'<tr>.*?<\/tr>', row, re.DOTALL | re.IGNORECASE)))
-                
-                elif '<tr>' in row and '</tr>' in row: # Data rows
-                    cleaned_rows.append(clean_data_row(re.search(r'<tr>.*?<\/tr>', row, re.DOTALL | re.IGNORECASE)))
-                
-                else: # Any text before/after the table (like wrapper divs)
-                    cleaned_rows.append(row)
-
-        return "".join(cleaned_rows).replace('None', '') # Final cleanup and reassembly
-    
-    def get_print_content(self):
-
-        order_no = self._get_parent_text('order_number')
-        party_name = self._get_parent_text('party_name')
-        order_date = self._get_parent_text('order_date') 
-        delivery_date = self._get_parent_text('delivery_date')
-        gst_no = self._get_parent_text('gst_no') 
-        address = self._get_parent_text('address') 
-        raw_grand_total_text = self._get_parent_text('grand_total_label')
-        if ':' in raw_grand_total_text:
-            grand_total = raw_grand_total_text.split(':')[-1].strip()
-        else:
-            grand_total = "0.00" 
-        remarks = self._get_parent_text('remark_input') 
-        school_name = self._get_parent_text('school_name') 
-        barcode = self._get_parent_text('barcode')
-        advance_paid = self._get_parent_text('advance_paid')
-
+    def print_context(self):
         parent = self.parent()
         image_base64_uri = ""
         if hasattr(parent, '_capture_canvas_as_base64'):
@@ -481,154 +611,25 @@ class PrintExportDialog(QDialog):
                     
         button_options_list = "".join(f"<li>{opt}</li>" for opt in button_options) or "<li>None Selected (Default)</li>"
 
-        printing_options_list = self._get_parent_printing_options()
-
-        track_pant_options_list = self._get_parent_track_options()
-
-        if self.document_type == "QUOTATION":
-            report_title = "Quotation / Estimate"   
-        else: 
-            report_title = "Order Summary"
-
-        cleaned_content_data = self._clean_table_html(self.content_data)
-    
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: 'Arial', sans-serif; font-size: 10pt; }}
-                h1 {{ text-align: center; margin-bottom: 5px; color: #333; }}
-                hr {{ border: 0.5px solid #ccc; }}
-                .header-table {{ width: 100%; border-collapse: collapse; margin-bottom: 10px; }}
-                .header-table td {{ padding: 3px 5px; vertical-align: top; }}
-                .section-header {{ background-color: #f0f0f0; padding: 5px; margin-top: 15px; margin-bottom: 5px; border-left: 5px solid #007bff; }}
-                
-                .main-content-footer {{display: flex; flex-direction: row; justify-content: space-between; align-items: flex-start; width: 100%;}}
-                
-                .item-details-section {{flex-grow: 1; flex-basis: 60%; min-width: 0%; padding-right: 15px; box-sizing: border-box; overflow: hidden;}}
-
-                .item-table-container {{ overflow-x: auto; }}
-                .item-table {{ width: 100%; border-collapse: collapse; margin-top: 10px; }}
-                .item-table th, .item-table td {{ border: 1px solid #ddd; padding: 6px; text-align: left; }}
-                .item-table th {{ background-color: #e9ecef; }}
-
-                .summary {{flex-basis: 35%; flex-basis: 35%; width: 35%; padding: 10px; border: 2px solid #333; text-align: right; margin-top: 15px;}}
-                
-                .options-table td {{ font-size: 9pt; }}
-                .options-cell {{width: 55%; 
-                    vertical-align: top; 
-                    border-left: 1px solid #ddd; 
-                    padding-left: 15px;
-                    box-sizing: border-box; 
-                    word-wrap: break-word;
-                }}                
-                .image-cell {{
-                    width: 45%; 
-                    vertical-align: top; 
-                    padding-right: 15px; 
-                    text-align: center;
-                }}
-                .product-image-preview {{ max-width: 100%; max-height: 250px; width: auto; height: auto; border: 1px solid #ccc; object-fit: contain;}}
-                .options-table ul {{margin: 0 0 5px 0 !important; padding-left: 10px !important;}}
-            </style>
-        </head>
-        <body>
-            <h1>Order Summary</h1>
-            <hr>
-
-            <table class="header-table">
-                <tr>
-                    <td width="33%"><b>Order No:</b> {order_no}</td>
-                    <td width="33%"><b>Order Date:</b> {order_date}</td>
-                    <td width="34%"><b>Delivery Date:</b> {delivery_date}</td>
-                </tr>
-                <tr>
-                    <td><b>Party Name:</b> {party_name}</td>
-                    <td><b>GST No:</b> {gst_no}</td>
-                </tr>
-                <tr>
-                    <td colspan="3"><b>School Name:</b> {school_name}</td>
-                </tr>
-                <tr>
-                    <td colspan="3"><b>Address:</b> {address}</td>
-                </tr>
-                <tr>
-                    
-                    <td><b>Barcode:</b> {barcode}</td>
-                    <td><b>Advance Paid:</b> ₹ {advance_paid}</td>
-                </tr>
-            </table>
-
-            <h2 class="section-header">Product Design & Customization</h2>
-            <table style="width: 100%; border-collapse: collapse; margin-bottom: 20px;">
-                <tr>
-                    <td class="image-cell">
-                        <div style="max-width: 100%; margin: 0 auto; display: flex; align-items: center; justify-content: center;">
-                            {f'<img src="{image_base64_uri}" class="product-image-preview" alt="Product Design"/>' if image_base64_uri else '<p>No Product Image Selected.</p>'}
-                        </div>
-                    </td>
-
-                    <table style="width: 100%; border-collapse: collapse;">
-                        <tr>
-                            <td style="width: 50%; vertical-align: top; padding-right: 10px;">
-                                <h3 style="margin-top: 0; margin-bottom: 5px; font-size: 11pt; color: #007bff;">Printing Options</h3>
-                                <ul style="list-style-type: disc; padding-left: 20px; margin: 0 0 10px 0; font-size: 10pt;">
-                                    {printing_options_list.replace('list-style-type: none;','')}
-                                </ul>
-            
-                                <h3 style="margin-top: 0; margin-bottom: 5px; font-size: 11pt; color: #007bff;">Collar Options</h3>
-                                <ul style="list-style-type: disc; padding-left: 20px; margin: 0 0 10px 0; font-size: 10pt;">
-                                    {collar_options_list.replace('list-style-type: none;','')}
-                                </ul>
-                                
-                                <h3 style="margin-top: 5px; margin-bottom: 5px; font-size: 11pt; color: #007bff;">Button Options</h3>
-                                <ul style="list-style-type: disc; padding-left: 20px; margin: 0 0 0 0; font-size: 10pt;">
-                                    {button_options_list.replace('list-style-type: none;','')}
-                                </ul>
-
-                                <h3 style="margin-top: 5px; margin-bottom: 5px; font-size: 11pt; color: #007bff;">Track Pant Options</h3>
-                                <ul style="list-style-type: disc; padding-left: 20px; margin: 0 0 0 0; font-size: 10pt;">
-                                    {track_pant_options_list}
-                                </ul>
-                            </td>
-                        </tr>
-                    </table>
-                </tr>
-            </table>
-
-            <h2 class="section-header">Item Details</h2>
-            
-            <div class="main-content-footer">
-                
-                <div class="item-details-section">
-                    <div class="item-table-container">
-                        {cleaned_content_data}
-                    </div>
-                </div>
-
-                <div class="summary">
-                    {self._get_tax_info()[0]}
-                </div>
-            </div>
-            
-            <div style="clear: both; margin-top: 10px;">
-                <h2 class="section-header">Remark</h2>
-                <p>{remarks if remarks != "N/A" else "No special remarks."}</p>
-            </div>
-            
-            <div style="margin-top: 50px; text-align: center; font-size: 8pt; color: #777;">
-                <p>Signature (Seller)</p>
-            </div>
-
-        </body>
-        </html>
-        """
-        return html_content
-   
-    def print_document(self, printer):
-        doc = QTextDocument()
-        doc.setHtml(self.get_print_content())
-        doc.print_(printer)
+        return {
+            'order_no': self._get_parent_text('order_number'),
+            'order_date': self._get_parent_text('order_date'),
+            'delivery_date': self._get_parent_text('delivery_date'),
+            'party_name': self._get_parent_text('party_name'),
+            'gst_no': self._get_parent_text('gst_no'),
+            'school_name': self._get_parent_text('school_name'),
+            'address': self._get_parent_text('address'),
+            'barcode': self._get_parent_text('barcode'),
+            'advance_paid': self._get_parent_text('advance_paid'),
+            'product_image': f'<img src="{image_base64_uri}" class="product-image-preview" alt="Product Design"/>' if image_base64_uri else '<p>No Product Image Selected.</p>',
+            'printing_options': self._get_parent_printing_options().replace('list-style-type: none;', ''),
+            'collar_options': collar_options_list.replace('list-style-type: none;', ''),
+            'button_options': button_options_list.replace('list-style-type: none;', ''),
+            'track_pant_options': self._get_parent_track_options(),
+            'item_table': self.item_table_html(),
+            'tax_summary': self._get_tax_info()[0],
+            'remarks': _remarks_text(self._get_parent_text('remark_input')),
+        }
 
     def direct_print(self):
         printer = QPrinter(QPrinter.HighResolution)
@@ -699,22 +700,13 @@ class PrintExportDialog(QDialog):
             if not fileName: return None
             show_msg = True
         try:
-            from openpyxl import Workbook
-            wb = Workbook()
-            ws = wb.active
-            ws['A1'] = "Order No:"
-            ws['B1'] = self.parent().order_number.text() if hasattr(self.parent(), 'order_number') else "N/A"
-            ws['A2'] = "Party Name:"
-            ws['B2'] = self.parent().party_name.text() if hasattr(self.parent(), 'party_name') else "N/A"
-            ws['A4'] = "Item Details (Raw Content):"
-            ws['A5'] = self.content_data 
-            wb.save(fileName)
+            self._write_excel(fileName)
             if show_msg:
                 QMessageBox.information(self, "Success", f"Excel file saved to:\n{fileName}")
             return fileName
 
         except ImportError:
-            QMessageBox.critical(self, "Error", "The 'openpyxl' library is required for Excel export. Please install it.")
+            QMessageBox.critical(self, "Error", "The 'xlsxwriter' library is required for Excel export. Please install it.")
             return None
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An error occurred during Excel export: {e}")
@@ -730,8 +722,7 @@ class PrintExportDialog(QDialog):
             if not fileName: return None
             show_msg = True        
 
-        doc = QTextDocument()
-        doc.setHtml(self.get_print_content())
+        doc = self.cached_document()
         image_size = doc.size().toSize()
         if image_size.isEmpty(): image_size = QSize(800, 1000)           
         image = QPixmap(image_size)
@@ -770,7 +761,12 @@ class PrintExportDialog(QDialog):
                 doc.add_paragraph(f'Order No: {order_no}')
                 doc.add_paragraph(f'Party Name: {party_name}')
                 doc.add_heading('Item Details:', level=2)
-                doc.add_paragraph(self.content_data) 
+                table = doc.add_table(rows=1, cols=len(self.table_columns()))
+                for cell, header in zip(table.rows[0].cells, self.item_headers()):
+                    cell.text = header
+                for row in self.item_text_rows():
+                    for cell, text in zip(table.add_row().cells, row):
+                        cell.text = text
                 
                 doc.save(fileName)
 
@@ -785,7 +781,8 @@ class PrintExportDialog(QDialog):
                 title.text = "Order Report"
                 
                 body = slide.placeholders[1]
-                body.text = f"Order No: {order_no}\nParty Name: {party_name}\n\nItem Details:\n{self.content_data}"               
+                item_lines = "\n".join(" | ".join(row) for row in [self.item_headers()] + self.item_text_rows())
+                body.text = f"Order No: {order_no}\nParty Name: {party_name}\n\nItem Details:\n{item_lines}"
                 prs.save(fileName)
             if show_msg:
                 QMessageBox.information(self, "Success", f"{title_verb} saved to:\n{fileName}")
@@ -904,11 +901,13 @@ class PrintExportDialog(QDialog):
         if file_path:
             self.share_via_whatsapp(file_path)
 
-class QuotationPreviewDialog(QDialog, ExportShareMixin):
-    def __init__(self, parent, content_data, **kwargs):
+class QuotationPreviewDialog(QDialog, ExportShareMixin, DocumentCacheMixin):
+    template_name = "quotation"
+
+    def __init__(self, parent, lines, **kwargs):
         QDialog.__init__(self, parent, **kwargs)
         self.setWindowTitle("Quotation")
-        self.content_data = content_data 
+        self.lines = list(lines)
         self.document_type = "QUOTATION"
         self.setGeometry(200, 200, 350, 150) # Smaller dialog for simple actions
 
@@ -925,52 +924,6 @@ class QuotationPreviewDialog(QDialog, ExportShareMixin):
         direct_print_btn.clicked.connect(self.direct_print)
         preview_btn.clicked.connect(self.show_preview)
         
-    def _clean_table_html(self, html_content):
-        if not html_content:
-            return ""
-        def clean_header(match):
-            header_row = match.group(0)
-            pattern = r'(Total Price<\/th>)'
-            
-            match_end = re.search(pattern, header_row, re.IGNORECASE)
-            if match_end:
-                return header_row[:match_end.end()] + '</tr>'
-            return header_row # Return original if Total Price not found
-        def clean_data_row(row_match):
-            data_row = row_match.group(0)
-            
-            td_matches = list(re.finditer(r'<td.*?>.*?<\/td>', data_row, re.DOTALL | re.IGNORECASE))
-            
-            if len(td_matches) >= 7:
-                total_price_td_end = td_matches[6].end()
-                tr_end_match = re.search(r'<\/tr>', data_row)
-                if tr_end_match:
-                    tr_end_pos = tr_end_match.start()
-                    if total_price_td_end < tr_end_pos:
-                        return data_row[:total_price_td_end] + data_row[tr_end_pos:]
-            
-            return data_row # Return original if criteria not met
-
-        rows = re.split(r'(<tr>.*?<\/tr>)', html_content, flags=re.DOTALL | re.IGNORECASE)
-        
-        cleaned_rows = []
-        if rows:
-            is_header_found = False
-            for i, row_part in enumerate(rows):
-                if not row_part.strip():
-                    continue
-
-                if '<tr>' in row_part and '</tr>' in row_part:
-                    # This is a full row block
-                    if not is_header_found:
-                        cleaned_rows.append(clean_header(re.search(r'<tr>.*?<\/tr>', row_part, re.DOTALL | re.IGNORECASE)))
-                        is_header_found = True
-                    else:
-                        cleaned_rows.append(clean_data_row(re.search(r'<tr>.*?<\/tr>', row_part, re.DOTALL | re.IGNORECASE)))
-                else: # Any text before/after the table (like wrapper divs)
-                    cleaned_rows.append(row_part)
-        return "".join(cleaned_rows).replace('None', '') # Final cleanup and reassembly
-    
     def _get_parent_text(self, attribute_name, default="N/A"):
         parent = self.parent()
         if hasattr(parent, attribute_name) and getattr(parent, attribute_name):
@@ -993,7 +946,7 @@ class QuotationPreviewDialog(QDialog, ExportShareMixin):
                 return option_text
         return None
 
-    def _get_parent_printing_options(self):
+    def _get_parent_printing_options(self, show_price=True):
         parent = self.parent()
         printing_options = []
         keys = ['front', 'back', 'patch', 'embroidery', 'Dtf', 'Front sablimation', 'Back sablimation']
@@ -1006,10 +959,11 @@ class QuotationPreviewDialog(QDialog, ExportShareMixin):
                     if checkbox.isChecked():
                         price = price_edit.text() if hasattr(price_edit, 'text') else "0"
                         option_text = checkbox.text().strip()
-                        printing_options.append(f"<li>{option_text} (Price: {price} INR)</li>")
+                        price_info = f" (Price: {price} INR)" if show_price else ""
+                        printing_options.append(f"<li>{option_text}{price_info}</li>")
         return "".join(printing_options) or "<li>None Selected</li>"
     
-    def _get_parent_track_options(self):
+    def _get_parent_track_options(self, show_price=True):
         parent = self.parent()
         track_options_list = []
         
@@ -1028,7 +982,8 @@ class QuotationPreviewDialog(QDialog, ExportShareMixin):
                         extra_detail = extra_edit.text() if extra_edit and hasattr(extra_edit, 'text') else ""
                         option_text = checkbox.text().strip()
                         detail_info = f" ({extra_detail})" if extra_detail else ""
-                        track_options_list.append(f"<li>{option_text}{detail_info} (Price: {price} INR)</li>")
+                        price_info = f" (Price: {price} INR)" if show_price else ""
+                        track_options_list.append(f"<li>{option_text}{detail_info}{price_info}</li>")
         return "".join(track_options_list) or "<li>None Selected</li>"
 
     def _get_tax_info(self, main_window):
@@ -1046,30 +1001,10 @@ class QuotationPreviewDialog(QDialog, ExportShareMixin):
 
         display_grand_total = f"{grand_total:.2f}"
 
-        tax_summary_html = f"""
-        <table style="width: 100%; text-align: right; border-collapse: collapse; margin-top: 10px;">
-            <tr>
-                <td style="padding: 3px 0; border-top: 1px solid #ddd;"><b>Total Items Price:</b></td>
-                <td style="padding: 3px 0; border-top: 1px solid #ddd;">₹ {total_items_price:.2f}</td>
-            </tr>
-            <tr>
-                <td style="padding: 3px 0;"><b>Tax (GST) @ {tax_percent:.1f}%:</b></td>
-                <td style="padding: 3px 0;">₹ {tax_amount:.2f}</td>
-            </tr>
-            <tr>
-                <td style="font-size: 14pt; color: #d9534f; padding: 5px 0; border-top: 2px solid #333; border-bottom: 2px solid #333;"><b>GRAND TOTAL:</b></td>
-                <td style="font-size: 14pt; color: #d9534f; padding: 5px 0; border-top: 2px solid #333; border-bottom: 2px solid #333;">₹ {display_grand_total}</td>
-            </tr>
-        </table>
-        """
+        tax_summary_html = _tax_summary_html(total_items_price, tax_percent, tax_amount, grand_total)
         return tax_summary_html, display_grand_total
 
     # --- Print Methods ---
-    def print_document(self, printer):
-        doc = QTextDocument()
-        doc.setHtml(self.get_print_content())
-        doc.print_(printer)
-
     def direct_print(self):
         printer = QPrinter(QPrinter.HighResolution)
         dialog = QPrintDialog(printer, self)
@@ -1082,199 +1017,46 @@ class QuotationPreviewDialog(QDialog, ExportShareMixin):
         preview.paintRequested.connect(self.print_document)
         preview.exec_()
 
-    def get_print_content(self):
-        order_no = self._get_parent_text('order_number')
-        party_name = self._get_parent_text('party_name')
-        order_date = self._get_parent_text('order_date') 
-        delivery_date = self._get_parent_text('delivery_date')
-        address = self._get_parent_text('address') 
-        remarks = self._get_parent_text('remark_input') 
-        school_name = self._get_parent_text('school_name') 
-        barcode = self._get_parent_text('barcode')
-
-        parent = self.parent()
-        tax_summary_html, grand_total = self._get_tax_info(parent)
-        
-        canvas_image_base64_uri = parent._capture_canvas_as_base64() if hasattr(parent, '_capture_canvas_as_base64') else ""
-        reference_image_base64_uris = parent._get_reference_images_base64()
-        collar_options_list = "".join(f"<li>{opt}</li>" for opt in [self._get_parent_checkbox_state('rb_self', 'collar_price_self'), self._get_parent_checkbox_state('rb_rib', 'collar_price_rib'), self._get_parent_checkbox_state('rb_patti', 'collar_price_patti')] if opt) or "<li>None Selected</li>"
+    def _option_lists(self):
+        """Printing / collar / button / track pant options as <li> lists, priced unless show_prices is off."""
+        show_price = self.show_prices
+        collar_prices = {'rb_self': 'collar_price_self', 'rb_rib': 'collar_price_rib', 'rb_patti': 'collar_price_patti'}
+        collar_options_list = "".join(f"<li>{opt}</li>" for opt in [self._get_parent_checkbox_state(rb, price if show_price else None) for rb, price in collar_prices.items()] if opt) or "<li>None Selected</li>"
         button_option_map = {'BUTTON': 'rb_button', 'PLAIN': 'rb_plain', 'BOX': 'rb_box', 'V+': 'rb_vplus'}
         button_options_list = "".join(f"<li>{self._get_parent_checkbox_state(attr)}</li>" for attr in button_option_map.values() if self._get_parent_checkbox_state(attr)) or "<li>None Selected (Default)</li>"
-        printing_options_list = self._get_parent_printing_options()
-        track_pant_options_list = self._get_parent_track_options()
-
-        cleaned_content_data = self._clean_table_html(self.content_data)
-
-        # --- NEW: Reference Image Block HTML ---
-        reference_images_html = ""
-        if reference_image_base64_uris:
-            image_table_rows = ""
-            num_images = len(reference_image_base64_uris)
-            
-            # Iterate through the list, grabbing two URIs at a time
-            for i in range(0, num_images, 2):
-                uri1 = reference_image_base64_uris[i]
-                uri2 = reference_image_base64_uris[i+1] if i + 1 < num_images else None
-                
-                # Cell 1 (always present)
-                cell1 = f"""
-                    <td style="width: 50%; padding: 5 25px; text-align: center; vertical-align: top; border: none;">
-                        <img src="{uri1}" 
-                            width="230"
-                            height="250"
-                            style="max-width: 100%; max-height: 250px; 
-                                    border: 1px solid #ccc; object-fit: contain; display: block; margin: 0 auto;"
-                            alt="Reference Image 1"/>
-                    </td>
-                """
-                
-                # Cell 2 (optional)
-                cell2 = ""
-                if uri2:
-                    cell2 = f"""
-                        <td style="width: 50%; padding: 5 85px; text-align: center; vertical-align: top; border: none;">
-                            <img src="{uri2}" 
-                                width="230"
-                                height="250"
-                                style="max-width: 100%; max-height: 250px; 
-                                        border: 1px solid #ccc; object-fit: contain; display: block; margin: 0 auto;"
-                                alt="Reference Image 2"/>
-                        </td>
-                    """
-                else:
-                    cell2 = '<td style="width: 50%; border: none;"></td>' 
-                
-                image_table_rows += f'<tr style="page-break-inside: avoid;">{cell1}{cell2}</tr>'
-
-            # Final HTML structure for the image block
-            reference_images_html = f"""
-            <div style="margin-top: 20px; clear: both;">
-                <h2 class="section-header" style="background-color: #f0f0f0; border-left: 5px solid #007bff;">Customer Reference Images</h2>
-                <table style="width: 100%; border-collapse: collapse; margin-top: 5px;">
-                    <tbody>
-                        {image_table_rows}
-                    </tbody>
-                </table>
-            </div>
-            """
-        # --- END: FIX FOR REFERENCE IMAGES ---
-
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                @page {{ size: A4; margin: 20mm; }} 
-                body {{ font-family: 'Arial', sans-serif; font-size: 10pt; line-height: 1.4; }}
-                h1 {{ text-align: center; margin-bottom: 5px; color: #333; }}
-                hr {{ border: 0.5px solid #ccc; }}
-                .company-header {{ text-align: center; margin-bottom: 20px; }}
-                .company-header h2 {{ margin: 0; font-size: 14pt; color: #007bff; }}
-                .company-header p {{ margin: 2px 0; font-size: 9pt; color: #555; }}
-                .header-table {{ width: 100%; border-collapse: collapse; margin-bottom: 10px; }}
-                .header-table td {{ padding: 3px 5px; vertical-align: top; }}
-                .section-header {{ background-color: #f0f0f0; padding: 5px; margin-top: 15px; margin-bottom: 5px; border-left: 5px solid #007bff; font-size: 12pt; }}
-                .main-content-footer {{display: flex; flex-direction: row; justify-content: space-between; align-items: flex-start; width: 100%;}}
-                .item-details-section {{flex-grow: 1; flex-basis: 60%; min-width: 0%; padding-right: 15px; box-sizing: border-box; overflow: hidden;}}
-                .item-table {{ width: 100%; border-collapse: collapse; margin-top: 10px; }}
-                .item-table th, .item-table td {{ border: 1px solid #ddd; padding: 6px; text-align: left; }}
-                .item-table th {{ background-color: #e9ecef; }}
-                .summary-container {{flex-basis: 35%; width: 35%; padding: 0; text-align: right; margin-top: 15px;}}
-                .product-design-preview {{ max-width: 150px; max-height: 250px; width: auto; height: auto; border: 1px solid #ccc; object-fit: contain; display: block; margin: 0 auto;}}
-                .options-list {{list-style-type: disc; padding-left: 20px; margin: 0 0 10px 0; font-size: 10pt;}}
-            </style>
-        </head>
-        <body>
-            <div class="company-header">
-                <h2>[YOUR COMPANY NAME HERE]</h2>
-                <p>[YOUR ADDRESS LINE 1]</p>
-                <p>[YOUR CONTACT INFO]</p>
-                <hr>
-            </div>
-            <hr>
-
-            <table class="header-table">
-                <tr>
-                    <td width="33%"><b>Order No:</b> {order_no}</td>
-                    <td width="33%"><b>Order Date:</b> {order_date}</td>
-                    <td width="34%"><b>Delivery Date:</b> {delivery_date}</td>
-                </tr>
-                <tr>
-                    <td width="33%"><b>Barcode:</b> {barcode}</td>
-                    <td colspan="2"><b>Address:</b> {address}</td>
-                </tr>
-                <tr>
-                    <td width="33%"><b>Party Name:</b> {party_name}</td>
-                    <td colspan="2"><b>School Name:</b> {school_name}</td>
-                </tr>
-            </table>
-
-            <h2 class="section-header" style="margin-top: 10px; margin-bottom: 5px;">Product Design & Customization</h2>
-            <table style="width: 100%; border-collapse: collapse; margin-top: 0; margin-bottom: 0;">
-                <tr>
-                    <td style="width: 50%; vertical-align: top; padding: 0 5px 0 0; text-align: center;">
-                        <h3 style="margin-top: 0; margin-bottom: 3px; font-size: 11pt; color: #007bff;">Product Image</h3>
-                        <div style="max-width: 100%; margin: 0 auto; line-height: 1;">
-                            {f'<img src="{canvas_image_base64_uri}" class="product-image-preview" alt="Product Design" style="max-height: 150px;"/>' if canvas_image_base64_uri else '<p style="margin: 0; font-size: 9pt;">No Product Image Selected</p>'}
-                        </div>
-                    </td>
-                </tr>
-                <tr>
-                    <td style="width: 50%; vertical-align: top; border-left: 1px solid #ddd; padding: 0 0 0 10px;">
-                        <h3 style="margin-top: 0; margin-bottom: 3px; font-size: 11pt; color: #007bff;">Printing Options (Only Selected)</h3>
-                        <ul class="options-list" style="margin-bottom: 3px;">{printing_options_list}</ul>
-                        
-                        <h3 style="margin-top: 3px; margin-bottom: 3px; font-size: 11pt; color: #007bff;">Collar Options (Only Selected)</h3>
-                        <ul class="options-list" style="margin-bottom: 3px;">{collar_options_list}</ul>
-                        
-                        <h3 style="margin-top: 3px; margin-bottom: 3px; font-size: 11pt; color: #007bff;">Button Options (Only Selected)</h3>
-                        <ul class="options-list" style="margin-bottom: 3px;">{button_options_list}</ul>
-
-                        <h3 style="margin-top: 3px; margin-bottom: 3px; font-size: 11pt; color: #007bff;">Track Pant Options (Only Selected)</h3>
-                        <ul class="options-list" style="margin-bottom: 0;">{track_pant_options_list}</ul>
-                    </td>
-                </tr>
-            </table>
-
-            <h2 class="section-header">Item Details & Pricing</h2>
-            
-            <div class="main-content-footer">
-                <div class="item-details-section">
-                    <div class="item-table-container">
-                        {cleaned_content_data}
-                    </div>
-                </div>
-
-                <div class="summary-container">
-                    {tax_summary_html}
-                </div>
-            </div>
-            
-            <div style="clear: both; margin-top: 10px;">
-                <h2 class="section-header">Remark</h2>
-                <p>{remarks if remarks != "N/A" and remarks else "No special remarks."}</p>
-            </div>
+        return {
+            'printing_options': self._get_parent_printing_options(show_price),
+            'collar_options': collar_options_list,
+            'button_options': button_options_list,
+            'track_pant_options': self._get_parent_track_options(show_price),
+        }
 
-            {reference_images_html}
-            
-            <div style="margin-top: 50px; text-align: center; font-size: 8pt; color: #777;">
-                <p>Signature (Seller)</p>
-            </div>
+    def _product_image_html(self):
+        parent = self.parent()
+        canvas_image_base64_uri = parent._capture_canvas_as_base64() if hasattr(parent, '_capture_canvas_as_base64') else ""
+        if canvas_image_base64_uri:
+            return f'<img src="{canvas_image_base64_uri}" class="product-image-preview" alt="Product Design" style="max-height: 150px;"/>'
+        return '<p style="margin: 0; font-size: 9pt;">No Product Image Selected</p>'
 
-        </body>
-        </html>
-        """
-        return html_content
-    
-    def print_document(self, printer):
-        doc = QTextDocument()
-        doc.setHtml(self.get_print_content())
-        doc.print_(printer)
+    def print_context(self):
+        parent = self.parent()
+        tax_summary_html, grand_total = self._get_tax_info(parent)
+        return {
+            'order_no': self._get_parent_text('order_number'),
+            'order_date': self._get_parent_text('order_date'),
+            'delivery_date': self._get_parent_text('delivery_date'),
+            'barcode': self._get_parent_text('barcode'),
+            'address': self._get_parent_text('address'),
+            'party_name': self._get_parent_text('party_name'),
+            'school_name': self._get_parent_text('school_name'),
+            'product_image': self._product_image_html(),
+            **self._option_lists(),
+            'item_table': self.item_table_html(),
+            'tax_summary': tax_summary_html,
+            'remarks': _remarks_text(self._get_parent_text('remark_input')),
+            'reference_images': _reference_images_html(parent._get_reference_images_base64()),
+        }
 
-    def direct_print(self):
-        printer = QPrinter(QPrinter.HighResolution)
-        dialog = QPrintDialog(printer, self)
-        if dialog.exec_() == QDialog.Accepted:
-            self.print_document(printer)
     def show_preview(self):
         printer = QPrinter(QPrinter.HighResolution)
         preview = QPrintPreviewDialog(printer, self)
@@ -1293,361 +1075,81 @@ class QuotationPreviewDialog(QDialog, ExportShareMixin):
         preview.exec_()
 
 class JobWorkPreviewDialog(QuotationPreviewDialog):
+    template_name = "job_work"
+    item_columns = WORKSHOP_COLUMNS
+    show_prices = False  # the workshop doesn't get prices, in the table or the option lists
+    include_reference_images = True  # customer photos at the bottom of the slip
     
-    def __init__(self, parent, content_data, **kwargs):
-        super().__init__(parent, content_data, **kwargs)
+    def __init__(self, parent, lines, **kwargs):
+        super().__init__(parent, lines, **kwargs)
         self.setWindowTitle("Job Work (Stretching)")
         self.document_type = "JOB_WORK"
 
-    def _clean_table_html(self, html_content):
-        
-        if not html_content:
-            return ""
-        
-        def clean_header(match):
-            header_row = match.group(0)
-            header_row = re.sub(r'<th[^>]*>Total Price<\/th>', '', header_row, flags=re.IGNORECASE)
-            header_row = re.sub(r'<th[^>]*>Status<\/th>', '', header_row, flags=re.IGNORECASE)
-            header_row = re.sub(r'<th[^>]*>Unit<\/th>', '', header_row, flags=re.IGNORECASE)
-            
-            return header_row
-            
-        def clean_data_row(row_match):
-            data_row = row_match.group(0)
-            td_matches = list(re.finditer(r'<td.*?<\/td>', data_row, re.DOTALL | re.IGNORECASE))
-
-            if len(td_matches) >= 8:
-                new_row_content = "".join(td_matches[i].group(0) for i in range(5))
-                tr_end_match = re.search(r'<\/tr>', data_row)
-                if tr_end_match:
-                    return f'<tr>{new_row_content}{data_row[tr_end_match.start():]}'
-            
-            return data_row 
-
-        rows = re.split(r'(<tr>.*?<\/tr>)', html_content, flags=re.DOTALL | re.IGNORECASE)
-        
-        cleaned_rows = []
-        if rows:
-            is_header_found = False
-            for i, row_part in enumerate(rows):
-                if not row_part.strip():
-                    continue
-
-                if '<tr>' in row_part and '</tr>' in row_part:
-                    row_match = re.search(r'<tr>.*?<\/tr>', row_part, re.DOTALL | re.IGNORECASE)
-                    if row_match:
-                        if not is_header_found:
-                            cleaned_rows.append(clean_header(row_match))
-                            is_header_found = True
-                        else:
-                            cleaned_rows.append(clean_data_row(row_match))
-                else: 
-                    cleaned_rows.append(row_part)
-        return "".join(cleaned_rows).replace('None', '')
-
     def _get_tax_info(self, main_window):
         return "", "0.00"
 
-    def get_print_content(self):
-        order_no = self._get_parent_text('order_number')
-        barcode = self._get_parent_text('barcode')
-        employee_name = self._get_parent_text('employee_name', 'N/A') # Assuming employee_name field exists on parent
-        remarks = self._get_parent_text('remark_input') 
-
+    def _product_image_html(self):
         parent = self.parent()
-        tax_summary_html, grand_total = self._get_tax_info(parent) # Will be empty
-        
         canvas_image_base64_uri = parent._capture_canvas_as_base64() if hasattr(parent, '_capture_canvas_as_base64') else ""
-        reference_image_base64_uris = parent._get_reference_images_base64()
-        
-        collar_options_list = "".join(f"<li>{opt}</li>" for opt in [self._get_parent_checkbox_state('rb_self', 'collar_price_self'), self._get_parent_checkbox_state('rb_rib', 'collar_price_rib'), self._get_parent_checkbox_state('rb_patti', 'collar_price_patti')] if opt) or "<li>None Selected</li>"
-        collar_options_list = re.sub(r' \(Price: .*?\)', '', collar_options_list) 
-        
-        button_option_map = {'BUTTON': 'rb_button', 'PLAIN': 'rb_plain', 'BOX': 'rb_box', 'V+': 'rb_vplus'}
-        button_options_list = "".join(f"<li>{self._get_parent_checkbox_state(attr)}</li>" for attr in button_option_map.values() if self._get_parent_checkbox_state(attr)) or "<li>None Selected (Default)</li>"
-        
-        printing_options_list = self._get_parent_printing_options()
-        printing_options_list = re.sub(r' \(Price: .*? INR\)', '', printing_options_list)
-
-        track_pant_options_list = self._get_parent_track_options()
-        track_pant_options_list = re.sub(r' \(Price: .*? INR\)', '', track_pant_options_list)
-
-        cleaned_content_data = self._clean_table_html(self.content_data)
+        if canvas_image_base64_uri:
+            return f'<img src="{canvas_image_base64_uri}" class="product-design-preview" alt="Product Design" style="max-height: 150px;"/>'
+        return '<p style="margin: 0; font-size: 9pt;">No Product Image</p>'
 
-        reference_images_html = ""
-        if reference_image_base64_uris:
-            image_table_rows = ""
-            num_images = len(reference_image_base64_uris)
-            
-            # Iterate through the list, grabbing two URIs at a time
-            for i in range(0, num_images, 2):
-                uri1 = reference_image_base64_uris[i]
-                uri2 = reference_image_base64_uris[i+1] if i + 1 < num_images else None
-                
-                # Cell 1 (always present)
-                cell1 = f"""
-                    <td style="width: 50%; padding: 5 25px; text-align: center; vertical-align: top; border: none;">
-                        <img src="{uri1}" 
-                            width="230"
-                            height="250"
-                            style="max-width: 100%; max-height: 250px; 
-                                    border: 1px solid #ccc; object-fit: contain; display: block; margin: 0 auto;"
-                            alt="Reference Image 1"/>
-                    </td>
-                """
-                
-                # Cell 2 (optional)
-                cell2 = ""
-                if uri2:
-                    cell2 = f"""
-                        <td style="width: 50%; padding: 5 85px; text-align: center; vertical-align: top; border: none;">
-                            <img src="{uri2}" 
-                                width="230"
-                                height="250"
-                                style="max-width: 100%; max-height: 250px; 
-                                        border: 1px solid #ccc; object-fit: contain; display: block; margin: 0 auto;"
-                                alt="Reference Image 2"/>
-                        </td>
-                    """
-                else:
-                    cell2 = '<td style="width: 50%; border: none;"></td>' 
-                
-                image_table_rows += f'<tr style="page-break-inside: avoid;">{cell1}{cell2}</tr>'
-
-            # Final HTML structure for the image block
-            reference_images_html = f"""
-            <div style="margin-top: 20px; clear: both;">
-                <h2 class="section-header" style="background-color: #f0f0f0; border-left: 5px solid #007bff;">Customer Reference Images</h2>
-                <table style="width: 100%; border-collapse: collapse; margin-top: 5px;">
-                    <tbody>
-                        {image_table_rows}
-                    </tbody>
-                </table>
-            </div>
-            """
-        # --- END: FIX FOR REFERENCE IMAGES ---
-
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                @page {{ size: A4; margin: 20mm; }} 
-                body {{ font-family: 'Arial', sans-serif; font-size: 10pt; line-height: 1.4; }}
-                h1 {{ text-align: center; margin-bottom: 5px; color: #333; }}
-                hr {{ border: 0.5px solid #ccc; }}
-                .company-header {{ text-align: center; margin-bottom: 20px; }}
-                .company-header h2 {{ margin: 0; font-size: 16pt; color: #d9534f; }}
-                .company-header p {{ margin: 2px 0; font-size: 9pt; color: #555; }}
-                .header-table {{ width: 100%; border-collapse: collapse; margin-bottom: 10px; }}
-                .header-table td {{ padding: 3px 5px; vertical-align: top; }}
-                .section-header {{ background-color: #f0f0f0; padding: 5px; margin-top: 15px; margin-bottom: 5px; border-left: 5px solid #007bff; font-size: 12pt; }}
-                .item-table-container {{ overflow-x: auto; }}
-                .item-table {{ width: 100%; border-collapse: collapse; margin-top: 10px; }}
-                .item-table th, .item-table td {{ border: 1px solid #ddd; padding: 6px; text-align: left; }}
-                .item-table th {{ background-color: #e9ecef; }}
-                .product-design-preview {{ max-width: 150px; max-height: 250px; width: auto; height: auto; border: 1px solid #ccc; object-fit: contain; display: block; margin: 0 auto;}}
-                .options-list {{list-style-type: disc; padding-left: 20px; margin: 0 0 10px 0; font-size: 10pt;}}
-            </style>
-        </head>
-        <body>
-            <div class="company-header">
-                <h2>JOB WORK (STRETCHING) SLIP</h2>
-                <p>Company Logo and Company Details</p>
-                <hr>
-            </div>
-
-            <table class="header-table">
-                <tr>
-                    <td width="33%"><b>Order No:</b> {order_no}</td>
-                    <td width="33%"><b>Barcode:</b> {barcode}</td>
-                    <td width="34%"><b>Employee Name:</b> {employee_name}</td>
-                </tr>
-            </table>
-
-            <h2 class="section-header" style="margin-top: 10px; margin-bottom: 5px;">Product Design & Customization</h2>
-            <table style="width: 100%; border-collapse: collapse; margin-top: 0; margin-bottom: 0;">
-                <tr>
-                    <td style="width: 50%; vertical-align: top; padding: 0 5px 0 0; text-align: center;">
-                        <h3 style="margin-top: 0; margin-bottom: 3px; font-size: 11pt; color: #007bff;">Product Image</h3>
-                        <div style="max-width: 100%; margin: 0 auto; line-height: 1;">
-                            {f'<img src="{canvas_image_base64_uri}" class="product-design-preview" alt="Product Design" style="max-height: 150px;"/>' if canvas_image_base64_uri else '<p style="margin: 0; font-size: 9pt;">No Product Image</p>'}
-                        </div>
-                    </td>
-                </tr>
-                <tr>    
-                    <td style="width: 50%; vertical-align: top; border-left: 1px solid #ddd; padding: 0 0 0 10px;">
-                        <h3 style="margin-top: 0; margin-bottom: 3px; font-size: 11pt; color: #007bff;">Printing Options (Only Selected)</h3>
-                        <ul class="options-list" style="margin-bottom: 3px;">{printing_options_list}</ul>
-                        
-                        <h3 style="margin-top: 3px; margin-bottom: 3px; font-size: 11pt; color: #007bff;">Collar Options (Only Selected)</h3>
-                        <ul class="options-list" style="margin-bottom: 3px;">{collar_options_list}</ul>
-                        
-                        <h3 style="margin-top: 3px; margin-bottom: 3px; font-size: 11pt; color: #007bff;">Button Options (Only Selected)</h3>
-                        <ul class="options-list" style="margin-bottom: 3px;">{button_options_list}</ul>
-
-                        <h3 style="margin-top: 3px; margin-bottom: 3px; font-size: 11pt; color: #007bff;">Track Pant Options (Only Selected)</h3>
-                        <ul class="options-list" style="margin-bottom: 0;">{track_pant_options_list}</ul>
-                    </td>
-                </tr>
-            </table>
-
-            <h2 class="section-header">Item Details</h2>
-            <div class="item-table-container">
-                {cleaned_content_data}
-            </div>
-
-            {tax_summary_html} <div style="clear: both; margin-top: 10px;">
-                <h2 class="section-header">Remark</h2>
-                <p>{remarks if remarks != "N/A" and remarks else "No special remarks."}</p>
-            </div>
-
-            {reference_images_html}
-            
-            <div style="margin-top: 50px; text-align: center; font-size: 8pt; color: #777;">
-                <p>Signature (Job Work Manager)</p>
-            </div>
+    def print_context(self):
+        parent = self.parent()
+        tax_summary_html, grand_total = self._get_tax_info(parent) # Will be empty
+        context = {
+            'order_no': self._get_parent_text('order_number'),
+            'barcode': self._get_parent_text('barcode'),
+            'employee_name': self._get_parent_text('employee_name', 'N/A'), # Assuming employee_name field exists on parent
+            'product_image': self._product_image_html(),
+            **self._option_lists(),
+            'item_table': self.item_table_html(),
+            'tax_summary': tax_summary_html,
+            'remarks': _remarks_text(self._get_parent_text('remark_input')),
+        }
+        if self.include_reference_images:
+            context['reference_images'] = _reference_images_html(parent._get_reference_images_base64())
+        return context
 
-        </body>
-        </html>
-        """
-        return html_content
-    
 class CuttingJobPreviewDialog(JobWorkPreviewDialog):
+    template_name = "cutting_slip"
+    include_reference_images = False
 
-    def __init__(self, parent=None, html_content=""):
-        super().__init__(parent, html_content)
+    def __init__(self, parent=None, lines=()):
+        super().__init__(parent, lines)
         self.setWindowTitle("Cutting Job Slip Preview")
 
-    def get_print_content(self):
-        current_date = QDate.currentDate().toString("dd-MM-yyyy")
-
-        base_html = super().get_print_content()
-
-        order_no = self._get_parent_text('order_number')
-        barcode = self._get_parent_text('barcode')
-        employee_name = self._get_parent_text('employee_name', 'N/A')
-        
-        new_header_table_html = f"""
-            <table class="header-table">
-                <tr>
-                    <td width="33%"><b>Order No:</b> {order_no}</td>
-                    <td width="33%"><b>Barcode:</b> {barcode}</td>
-                    <td width="34%"><b>Current Date:</b> {current_date}</td>
-                </tr>
-                <tr>
-                    <td width="33%"><b>Employee Name:</b> {employee_name}</td>
-                    <td colspan="2"></td> 
-                </tr>
-            </table>
-        """
-        new_html = re.sub(
-            r'<table class="header-table">.*?<\/table>', 
-            new_header_table_html, 
-            base_html, 
-            flags=re.DOTALL | re.IGNORECASE,
-            count=1 
-        )
-        new_html = new_html.replace("JOB WORK (STRETCHING) SLIP", "CUTTING JOB SLIP")
-        
-        images_block_regex = r'<div\s+style="margin-top:\s*20px;.*?">.*?Customer Reference Images<\/h2>.*?<\/div>'
-        final_html = re.sub(
-            images_block_regex, 
-            '', # Replace with empty string
-            new_html, 
-            flags=re.DOTALL | re.IGNORECASE
-        )
-        return final_html
+    def print_context(self):
+        context = super().print_context()
+        context['current_date'] = QDate.currentDate().toString("dd-MM-yyyy")
+        return context
 
 class PrintingJobPreviewDialog(JobWorkPreviewDialog):
+    template_name = "printing_slip"
+    include_reference_images = False
 
-    def __init__(self, parent, content_data, **kwargs):
-        super().__init__(parent, content_data, **kwargs)
+    def __init__(self, parent, lines, **kwargs):
+        super().__init__(parent, lines, **kwargs)
         self.setWindowTitle("Printing Job Slip")
         self.document_type = "PRINTING_JOB"
         
-    def _clean_table_html(self, html_content):
+    def print_context(self):
+        return {
+            'order_no': self._get_parent_text('order_number'),
+            'barcode': self._get_parent_text('barcode'),
+            'current_date': self._get_parent_text('order_date'),
+            'employee_name': self._get_parent_text('employee_name', 'N/A'),
+            'school_name': self._get_parent_text('school_name', 'N/A'),
+            'product_image': self._product_image_html(),
+            'remarks': _remarks_text(self._get_parent_text('remark_input')),
+        }
 
-        if not html_content:
-            return ""
-        
-    def get_print_content(self):
-        order_no = self._get_parent_text('order_number')
-        barcode = self._get_parent_text('barcode')
-        current_date = self._get_parent_text('order_date')
-        employee_name = self._get_parent_text('employee_name', 'N/A') 
-        school_name = self._get_parent_text('school_name', 'N/A')
-        remarks = self._get_parent_text('remark_input') 
+COLLAR_SIZES = ("12", "13", "14", "15", "16")
 
-        parent = self.parent()
-        canvas_image_base64_uri = parent._capture_canvas_as_base64() if hasattr(parent, '_capture_canvas_as_base64') else ""
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                @page {{ size: A4; margin: 20mm; }} 
-                body {{ font-family: 'Arial', sans-serif; font-size: 10pt; line-height: 1.4; }}
-                h1 {{ text-align: center; margin-bottom: 5px; color: #333; }}
-                hr {{ border: 0.5px solid #ccc; }}
-                .company-header {{ text-align: center; margin-bottom: 20px; }}
-                .company-header h2 {{ margin: 0; font-size: 16pt; color: #d9534f; }}
-                .company-header p {{ margin: 2px 0; font-size: 9pt; color: #555; }}
-                .header-table {{ width: 100%; border-collapse: collapse; margin-bottom: 10px; }}
-                .header-table td {{ padding: 3px 5px; vertical-align: top; }}
-                .section-header {{ background-color: #f0f0f0; padding: 5px; margin-top: 15px; margin-bottom: 5px; border-left: 5px solid #007bff; font-size: 12pt; }}
-                .item-table-container {{ overflow-x: auto; }}
-                .item-table {{ width: 100%; border-collapse: collapse; margin-top: 10px; }}
-                .item-table th, .item-table td {{ border: 1px solid #ddd; padding: 6px; text-align: left; }}
-                .item-table th {{ background-color: #e9ecef; }}
-                .product-design-preview {{ max-width: 150px; max-height: 250px; width: auto; height: auto; border: 1px solid #ccc; object-fit: contain; display: block; margin: 0 auto;}}
-                .options-list {{list-style-type: disc; padding-left: 20px; margin: 0 0 10px 0; font-size: 10pt;}}
-            </style>
-        </head>
-        <body>
-            <div class="company-header">
-                <h2>PRINTING JOB SLIP</h2>
-                <p>Company Logo and Company Details</p>
-                <hr>
-            </div>
-
-            <table class="header-table">
-                <tr>
-                    <td width="33%"><b>Order No:</b> {order_no}</td>
-                    <td width="33%"><b>Barcode:</b> {barcode}</td>
-                    <td width="34%"><b>Current Date:</b> {current_date}</td>
-                </tr>
-                <tr>
-                    <td width="33%"><b>Employee Name:</b> {employee_name}</td>
-                    <td colspan="2"><b>School Name:</b> {school_name}</td>
-                </tr>
-            </table>
-
-            <h2 class="section-header" style="margin-top: 10px; margin-bottom: 5px;">Product Design & Customization Details</h2>
-            <table style="width: 100%; border-collapse: collapse; margin-top: 0; margin-bottom: 0;">
-                <tr>
-                    <td style="width: 50%; vertical-align: top; padding: 0 5px 0 0; text-align: center;">
-                        <h3 style="margin-top: 0; margin-bottom: 3px; font-size: 11pt; color: #007bff;">Product Image</h3>
-                        <div style="max-width: 100%; margin: 0 auto; line-height: 1;">
-                            {f'<img src="{canvas_image_base64_uri}" class="product-design-preview" alt="Product Design" style="max-height: 150px;"/>' if canvas_image_base64_uri else '<p style="margin: 0; font-size: 9pt;">No Product Image</p>'}
-                        </div>
-                    </td>
-                </tr>
-            </table>
-
-            <div style="clear: both; margin-top: 10px;">
-                <h2 class="section-header">Remark</h2>
-                <p>{remarks if remarks != "N/A" and remarks else "No special remarks."}</p>
-            </div>
-            
-            <div style="margin-top: 50px; text-align: center; font-size: 8pt; color: #777;">
-                <p>Signature (Printing Manager)</p>
-            </div>
+class RibCollarPrintDialog(QDialog, ExportShareMixin, DocumentCacheMixin): # Assuming ExportShareMixin is available
+    template_name = "rib_collar"
 
-        </body>
-        </html>
-        """
-        return html_content
-    
-class RibCollarPrintDialog(QDialog, ExportShareMixin): # Assuming ExportShareMixin is available
     def __init__(self, parent, breakdown_data, collar_name="N/A", **kwargs):
         QDialog.__init__(self, parent, **kwargs)
         self.setWindowTitle("RIB Collar Breakdown (A5)")
@@ -1681,15 +1183,27 @@ class RibCollarPrintDialog(QDialog, ExportShareMixin): # Assuming ExportShareMix
                 return widget.currentText()
         return default
 
-    @property
-    def content_data(self):
-        import json
-        return json.dumps(self.breakdown_data, indent=2)
+    # For the Excel/Word/PPT exports: one row per collar size, one column per colour
+    def table_rows(self):
+        return COLLAR_SIZES
+
+    def table_columns(self):
+        breakdown = self.breakdown_data['breakdown']
+        return (ItemColumn("COLLAR SIZE", lambda size: size, "{}"),) + tuple(
+            ItemColumn(color.upper(), lambda size, color=color: breakdown.get((size, color), 0), "{}")
+            for color in self.breakdown_data['colors']
+        )
     
-    def _get_rib_collar_breakdown_content(self):        
+    def _write_excel(self, fileName):
+        import excel_export
+        with excel_export.OrderWorkbook(fileName) as book:
+            book.add_table(f"RIB Collar: {self.collar_name}", self.item_headers(), self.item_rows(), sheet_name="RIB Collar")
+
+    def _get_rib_collar_breakdown_content(self):
+        """The size x colour quantity table."""
         breakdown = self.breakdown_data['breakdown']
         colors = self.breakdown_data['colors']
-        all_sizes = ["12", "13", "14", "15", "16"]
+        all_sizes = self.table_rows()
                 
         spacer = "&nbsp;" * 35 
         first_size = all_sizes[0]
@@ -1721,8 +1235,7 @@ class RibCollarPrintDialog(QDialog, ExportShareMixin): # Assuming ExportShareMix
             header_row_html += f'<th style="text-align: center;">{color.upper()}</th>'
         header_row_html += '</tr>'
         
-        # --- Table HTML ---
-        table_html = f"""
+        return f"""
         <table class="collar-table">
             <thead>{header_row_html}</thead>
             <tbody>
@@ -1731,69 +1244,14 @@ class RibCollarPrintDialog(QDialog, ExportShareMixin): # Assuming ExportShareMix
             </tbody>
         </table>
         """
-        
-        # --- Metadata ---
-        order_no = self._get_parent_text('order_number')
-        order_date = self._get_parent_text('order_date')
-        collar_name = self.collar_name
-        
-        # 6. Full A5 Document HTML with Aggressive CSS Fixes
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                @page {{ 
-                    size: A5; 
-                    margin: 10mm; 
-                }} 
-                body {{ font-family: 'Arial', sans-serif; font-size: 10pt; line-height: 1.2; }}
-                .company-header {{ text-align: center; margin-bottom: 5px; }}
-                .company-header h2 {{ margin: 0; font-size: 14pt; color: #007bff; }}
-                .company-header p {{ margin: 2px 0; font-size: 8pt; color: #555; }}
-                .meta-data {{ width: 100%; border-collapse: collapse; margin-bottom: 10px; }}
-                .meta-data td {{ padding: 2px 0; font-size: 10pt; }}
-                .collar-table {{ width: 100%; border-collapse: collapse; margin-top: 10px; table-layout: fixed; }}
-                
-                .collar-table th, .collar-table td {{
-                    border: 1px solid #333;
-                    padding: 6px 5px;
-                    font-size: 9pt;
-                    word-wrap: break-word;
-                    text-align: center;
-                }}                
-                .collar-table th {{ font-weight: bold; background-color: #f0f8ff; text-align: center; }}
-                .collar-table td:first-child {{ font-weight: bold; text-align: center;}}
-            </style>
-        </head>
-        <body>
-            <div class="company-header">
-                <h2 style="color: #0000ff;">[YOUR COMPANY NAME HERE]</h2>
-                <p>[YOUR CONTACT INFO]</p>
-                <hr style="border: 0.5px solid #007bff; margin: 5px 0;">
-            </div>
-            
-            <table class="meta-data">
-                <tr>
-                    <td width="50%"><b>Order No:</b> {order_no}</td>
-                    <td width="50%" style="text-align: right;"><b>Date:</b> {order_date}</td>
-                </tr>
-                <tr>
-                    <td colspan="2"><b>Collar Name:</b> {collar_name}</td>
-                </tr>
-            </table>            
-            {table_html}
-        </body>
-        </html>
-        """
-        return html_content
 
-    def get_print_content(self):
-        return self._get_rib_collar_breakdown_content()
-    
-    def print_document(self, printer):
-        doc = QTextDocument()
-        doc.setHtml(self._get_rib_collar_breakdown_content())
-        doc.print_(printer)
+    def print_context(self):
+        return {
+            'order_no': self._get_parent_text('order_number'),
+            'order_date': self._get_parent_text('order_date'),
+            'collar_name': self.collar_name,
+            'collar_table': self._get_rib_collar_breakdown_content(),
+        }
 
     def direct_print(self):
         printer = QPrinter(QPrinter.HighResolution)
@@ -1802,13 +1260,14 @@ class RibCollarPrintDialog(QDialog, ExportShareMixin): # Assuming ExportShareMix
             self.print_document(printer)
 
     def show_preview(self):
-        html = self._get_rib_collar_breakdown_content()
+        html = self.cached_html()
 
         self.preview_dialog = QDialog(self)
         self.preview_dialog.setWindowTitle("RIB Collar Preview")
         self.preview_dialog.resize(800, 600)
         layout = QVBoxLayout(self.preview_dialog)
 
+        from PyQt5.QtWebEngineWidgets import QWebEngineView  # starts Chromium, so only when needed
         self.web_view = QWebEngineView()
         self.web_view.setHtml(html)
         layout.addWidget(self.web_view)
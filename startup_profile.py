@@ -0,0 +1,173 @@
+"""
+Startup profiler for the order form.
+
+Off unless asked for, either with an environment variable or a command line
+switch:
+
+    ORDERFORM_PROFILE=1 python main.py
+    ORDERFORM_PROFILE=C:\\temp\\counter2.json python main.py
+    python main.py --profile-startup[=report.json]
+
+When on, it records
+  - wall time of each startup phase (OrderForm.__init__ wraps its build steps
+    in phase()), with the number of widgets each one created,
+  - the time spent importing every module loaded during startup (total, and
+    self time without the modules it pulled in),
+  - how many widgets the finished window has, by class,
+and writes it all as JSON (default data/startup_profile.json) once the window
+has been shown and the event loop has had its first turn.
+
+Only the standard library is used here, so main.py can start it before any
+other import. Qt is imported lazily, for counting widgets.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import builtins
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+ENV_VAR = "ORDERFORM_PROFILE"
+CLI_FLAG = "--profile-startup"
+DEFAULT_REPORT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'startup_profile.json')
+TOP_WIDGET_CLASSES = 25  # by-class widget counts kept in the report
+
+
+def _count_widgets():
+    from PyQt5.QtWidgets import QApplication
+    return len(QApplication.allWidgets()) if QApplication.instance() else 0
+
+
+class StartupProfiler:
+
+    def __init__(self, report_path=DEFAULT_REPORT):
+        self.report_path = report_path
+        self.started = time.perf_counter()
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.phases = []
+        self.imports = []
+        self._import_stack = []  # child import time per import in progress
+        self._original_import = None
+
+    # --- imports -------------------------------------------------------
+
+    def hook_imports(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def unhook_imports(self):
+        if self._original_import is not None and builtins.__import__ == self._timed_import:
+            builtins.__import__ = self._original_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if level or name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+        self._import_stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._import_stack.pop()
+            if self._import_stack:
+                self._import_stack[-1] += elapsed
+            self.imports.append({
+                "module": name,
+                "total_ms": round(elapsed * 1000, 2),
+                "self_ms": round((elapsed - children) * 1000, 2),
+            })
+
+    # --- phases --------------------------------------------------------
+
+    @contextmanager
+    def phase(self, name):
+        widgets = _count_widgets()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append({
+                "phase": name,
+                "start_ms": round((start - self.started) * 1000, 2),
+                "ms": round((end - start) * 1000, 2),
+                "widgets_created": _count_widgets() - widgets,
+            })
+
+    # --- report --------------------------------------------------------
+
+    def report(self, window=None):
+        by_class = Counter()
+        if window is not None:
+            from PyQt5.QtWidgets import QWidget
+            by_class.update(type(w).__name__ for w in window.findChildren(QWidget))
+        return {
+            "started_at": self.started_at,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "phases": self.phases,
+            "imports_ms": round(sum(i["self_ms"] for i in self.imports), 2),
+            "imports": sorted(self.imports, key=lambda i: i["total_ms"], reverse=True),
+            "widgets": {
+                "application": _count_widgets(),
+                "window": sum(by_class.values()),
+                "by_class": dict(by_class.most_common(TOP_WIDGET_CLASSES)),
+            },
+        }
+
+    def finish(self, window=None):
+        """Stops timing imports and writes the report; returns its path (None if it couldn't be written)."""
+        self.unhook_imports()
+        data = self.report(window)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.report_path)), exist_ok=True)
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            print(f"Warning: Could not write startup profile to {self.report_path}: {e}")
+            return None
+        slowest = ", ".join(f"{p['phase']} {p['ms']:.0f} ms" for p in sorted(self.phases, key=lambda p: p["ms"], reverse=True)[:3])
+        print(f"Startup: {data['total_ms']:.0f} ms ({slowest}); report written to {self.report_path}")
+        return self.report_path
+
+
+PROFILER = None
+
+
+def _requested_report_path(argv):
+    """Report path if profiling was asked for in argv or the environment, else None. Removes the CLI switch from argv."""
+    for i, arg in enumerate(argv):
+        if arg == CLI_FLAG or arg.startswith(CLI_FLAG + "="):
+            del argv[i]  # keep it away from QApplication
+            return arg.partition("=")[2] or DEFAULT_REPORT
+    value = os.environ.get(ENV_VAR, "").strip()
+    if not value or value.lower() in ("0", "no", "off", "false"):
+        return None
+    return DEFAULT_REPORT if value.lower() in ("1", "yes", "on", "true") else value
+
+
+def start(argv=None):
+    """Starts profiling if it was asked for. Call before the heavy imports."""
+    global PROFILER
+    if PROFILER is None:
+        path = _requested_report_path(sys.argv if argv is None else argv)
+        if path:
+            PROFILER = StartupProfiler(path)
+            PROFILER.hook_imports()
+    return PROFILER
+
+
+def phase(name):
+    """`with phase("header"):` times that block when profiling, does nothing otherwise."""
+    return PROFILER.phase(name) if PROFILER is not None else nullcontext()
+
+
+def finish(window=None):
+    global PROFILER
+    if PROFILER is not None:
+        PROFILER.finish(window)
+        PROFILER = None
@@ -0,0 +1,65 @@
+"""
+HTML templates for the printed documents.
+
+Each file in print_templates/ is one document (or a reusable block) with
+{{ name }} placeholders. All files are read and split into literal text and
+placeholder names once, when this module is imported; render() then only
+looks the names up in the context dict and joins the pieces.
+
+    render("job_work", {"order_no": "1042", ...})
+
+Values are inserted as they are (most of them are HTML snippets already).
+"""
+import os
+import re
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'print_templates')
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class CompiledTemplate:
+    __slots__ = ("name", "parts", "fields")
+
+    def __init__(self, name, text):
+        self.name = name
+        # split() with one group: even indexes are literal text, odd ones field names
+        self.parts = _PLACEHOLDER.split(text)
+        self.fields = frozenset(self.parts[1::2])
+
+    def render(self, context):
+        out = list(self.parts)
+        try:
+            out[1::2] = [str(context[field]) for field in self.parts[1::2]]
+        except KeyError as e:
+            raise KeyError(f"Template '{self.name}' needs {e} in its context") from None
+        return "".join(out)
+
+
+def load_templates(directory=TEMPLATE_DIR):
+    """All *.html files in `directory`, compiled and keyed by file name without extension."""
+    templates = {}
+    if not os.path.isdir(directory):
+        print(f"Warning: Print template folder not found: {directory}")
+        return templates
+    for filename in os.listdir(directory):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() != ".html":
+            continue
+        with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+            templates[name] = CompiledTemplate(name, f.read())
+    return templates
+
+
+TEMPLATES = load_templates()
+
+
+def get_template(name):
+    try:
+        return TEMPLATES[name]
+    except KeyError:
+        raise KeyError(f"No print template named '{name}' in {TEMPLATE_DIR}") from None
+
+
+def render(name, context):
+    return get_template(name).render(context)
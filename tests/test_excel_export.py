@@ -0,0 +1,74 @@
+import zipfile
+
+import pytest
+
+pytest.importorskip("xlsxwriter")
+
+import excel_export
+from order_model import OrderLine
+
+HEADER = {"order_number": "1042", "party_name": "Kendriya Vidyalaya", "tax_apply": "Y", "tax_percentage": "5"}
+
+
+def lines():
+    return [OrderLine("Cotton", "T-shirt", "Red", "M", 10, 200.0),
+            OrderLine("Poly", "Track Pant", "Blue", "L", 2, 350.0, track_add_on=25.0)]
+
+
+def sheets(path):
+    with zipfile.ZipFile(path) as z:
+        return sorted(n for n in z.namelist() if n.startswith("xl/worksheets/sheet"))
+
+
+def test_sheet_names_are_valid_and_unique():
+    used = set()
+    assert excel_export._sheet_name("a/b:c", used) == "a_b_c"
+    assert excel_export._sheet_name("A_B_C", used) == "A_B_C (2)"
+    assert excel_export._sheet_name("", used) == "Order"
+    assert len(excel_export._sheet_name("x" * 40, used)) == 31
+
+
+def test_save_order_writes_one_sheet_and_returns_totals(tmp_path):
+    path = tmp_path / "order.xlsx"
+    with excel_export.OrderWorkbook(str(path)) as book:
+        totals = book.add_order(HEADER, iter(lines()))
+    assert totals.subtotal == 2750.0
+    assert totals.grand_total == pytest.approx(2887.5)
+    assert len(sheets(path)) == 1
+
+
+def test_batch_orders_share_one_sheet(tmp_path):
+    path = tmp_path / "batch.xlsx"
+    with excel_export.OrderWorkbook(str(path)) as book:
+        book.add_summary()
+        book.add_orders_sheet()
+        for i in range(50):
+            book.add_order(dict(HEADER, order_number=str(i)), lines())
+    assert len(sheets(path)) == 2  # Summary + Orders, however many orders
+
+
+@pytest.mark.parametrize("columns", [excel_export.LINE_COLUMNS, excel_export.WORKSHOP_COLUMNS])
+def test_order_rows_matches_what_is_written(tmp_path, columns):
+    with excel_export.OrderWorkbook(str(tmp_path / "o.xlsx")) as book:
+        ws = book.workbook.add_worksheet()
+        row, _ = book._write_order(ws, 5, HEADER, lines(), columns)
+    assert row - 5 == excel_export._order_rows(len(lines()), columns)
+
+
+def test_orders_sheet_rolls_over_before_an_order_would_overflow(tmp_path, monkeypatch):
+    block = excel_export._order_rows(len(lines()), excel_export.LINE_COLUMNS)
+    monkeypatch.setattr(excel_export, "ROWS_PER_SHEET", 2 * block + 2)  # exactly two orders and the gap
+    path = tmp_path / "batch.xlsx"
+    with excel_export.OrderWorkbook(str(path)) as book:
+        book.add_orders_sheet()
+        for i in range(5):
+            book.add_order(dict(HEADER, order_number=str(i)), iter(lines()))
+    assert len(sheets(path)) == 3
+
+
+def test_order_longer_than_a_sheet_is_refused(tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_export, "ROWS_PER_SHEET", 10)
+    with excel_export.OrderWorkbook(str(tmp_path / "batch.xlsx")) as book:
+        book.add_orders_sheet()
+        with pytest.raises(ValueError, match="too many lines"):
+            book.add_order(HEADER, lines())
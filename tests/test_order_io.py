@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import order_io
+from order_model import OrderLine
+
+STATE = {
+    "header": {"order_number": "1042", "party_name": "Kendriya Vidyalaya", "remark": "नीला कॉलर"},
+    "options": {"collar": "rib"},
+    "references": [],
+}
+
+
+def lines():
+    return [
+        OrderLine("Cotton", "T-shirt", "Red", "M", 10, 200.0, barcode="B1"),
+        OrderLine("Poly", "Track Pant", "Blue", "L", 5, 350.0, track_add_on=25.0, collar_type="RIB"),
+    ]
+
+
+def as_tuples(order_lines):
+    return [tuple(getattr(line, f) for f in order_io.LINE_FIELDS) for line in order_lines]
+
+
+def test_round_trip():
+    state, loaded = order_io.loads(order_io.dumps(STATE, lines()))
+    assert state == STATE
+    assert as_tuples(loaded) == as_tuples(lines())
+
+
+def test_round_trip_without_lines():
+    state, loaded = order_io.loads(order_io.dumps(STATE, []))
+    assert state == STATE
+    assert loaded == []
+
+
+def test_file_round_trip(tmp_path):
+    path = tmp_path / "order.jsonl"
+    order_io.save_file(path, STATE, lines())
+    state, loaded = order_io.load_file(path)
+    assert state == STATE
+    assert as_tuples(loaded) == as_tuples(lines())
+
+
+def test_lines_from_an_older_version_still_load():
+    text = "\n".join([
+        json.dumps({"v": 1, "header": {}, "line_fields": ["fabric", "item_type", "qty", "gone"]}),
+        json.dumps(["Cotton", "T-shirt", 3, "dropped"]),
+    ])
+    _, (line,) = order_io.loads(text)
+    assert (line.fabric, line.item_type, line.qty, line.unit_price) == ("Cotton", "T-shirt", 3, 0.0)
+
+
+@pytest.mark.parametrize("meta", [{"header": {}}, {"v": order_io.SCHEMA_VERSION + 1, "header": {}}])
+def test_missing_or_newer_version_is_rejected(meta):
+    with pytest.raises(ValueError, match="version"):
+        order_io.loads(json.dumps(meta))
+
+
+def test_empty_data_is_rejected():
+    with pytest.raises(ValueError):
+        order_io.loads("\n  \n")
@@ -0,0 +1,95 @@
+import pytest
+
+from order_model import Order, OrderLine, header_tax_percentage
+
+
+def line(item_type="T-shirt", qty=2, unit_price=100.0, **kwargs):
+    return OrderLine("Cotton", item_type, "Red", "M", qty, unit_price, **kwargs)
+
+
+def test_line_total_includes_add_ons():
+    assert line(qty=3, unit_price=100.0, print_add_on=10.0, collar_add_on=5.0).total == 345.0
+
+
+def test_totals_follow_add_replace_remove():
+    order = Order(tax_percentage=5)
+    order.add_line(line("T-shirt", 2, 100.0))
+    order.add_line(line("Track Pant", 1, 300.0))
+    assert order.subtotal == 500.0
+    assert order.subtotal_by_type == {"T-shirt": 200.0, "Track Pant": 300.0}
+    assert order.tax_amount == pytest.approx(25.0)
+    assert order.grand_total == pytest.approx(525.0)
+
+    order.replace_line(0, line("T-shirt", 4, 100.0))
+    assert order.subtotal == 700.0
+    assert order.subtotal_by_type["T-shirt"] == 400.0
+
+    order.remove_line(1)
+    assert order.subtotal == 400.0
+    assert order.subtotal_by_type == {"T-shirt": 400.0}
+
+    order.remove_line(0)
+    assert len(order) == 0
+    assert order.subtotal == 0.0
+    assert order.subtotal_by_type == {}
+
+
+def test_float_residue_is_dropped_with_the_last_line():
+    order = Order()
+    for price in (0.1, 0.2, 0.3):
+        order.add_line(line(qty=1, unit_price=price))
+    for _ in range(3):
+        order.remove_line(0)
+    assert order.subtotal == 0.0
+    assert order.subtotal_by_type == {}
+
+
+def test_add_lines_and_set_lines_match_a_recount():
+    lines = [line(qty=q) for q in (1, 2, 3)]
+    order = Order()
+    assert order.add_lines(lines) == 0
+    assert order.add_lines([line(qty=4)]) == 3
+    assert order.subtotal == 1000.0
+    order.set_lines(lines[:1])
+    assert order.subtotal == Order(lines[:1]).subtotal == 100.0
+
+
+def test_tax_percentage_only_when_applied():
+    assert header_tax_percentage({"tax_apply": "Y", "tax_percentage": "12"}) == 12.0
+    assert header_tax_percentage({"tax_apply": "N", "tax_percentage": "12"}) == 0.0
+    assert header_tax_percentage({"tax_apply": "Y", "tax_percentage": "abc"}) == 0.0
+
+
+def test_from_data_round_trips_through_to_data():
+    original = line(qty=5, unit_price=120.0, barcode="B1", remark="rush", cutting_employee="Asha")
+    copy = OrderLine.from_data(original.to_data())
+    assert copy.to_data() == original.to_data()
+
+
+def test_from_data_rejects_bad_numbers():
+    with pytest.raises(ValueError):
+        OrderLine.from_data({"Qty": "two", "Unit": "100"})
+
+
+def test_replace_copies_the_line():
+    original = line(qty=2, barcode="OLD", remark="keep")
+    changed = original.replace(barcode="NEW")
+    assert (original.barcode, changed.barcode, changed.remark, changed.qty) == ("OLD", "NEW", "keep", 2)
+    order = Order([original])
+    order.replace_line(0, changed)
+    assert order.lines[0] is changed
+    assert order.subtotal == 200.0
+
+
+def test_free_lines_keep_their_type_listed():
+    order = Order()
+    order.add_line(line("T-shirt", 2, 100.0))
+    order.add_line(line("Sample", 1, 0.0))
+    assert order.subtotal_by_type == {"T-shirt": 200.0, "Sample": 0.0}
+    order.remove_line(0)
+    assert order.subtotal_by_type == {"Sample": 0.0}
+    assert order.subtotal == 0.0
+    order.add_line(line("T-shirt", 1, 50.0))
+    assert order.subtotal == 50.0
+    order.remove_line(0)
+    assert order.subtotal_by_type == {"T-shirt": 50.0}
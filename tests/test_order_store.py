@@ -0,0 +1,146 @@
+import threading
+
+import pytest
+
+from order_store import OrderStore
+
+
+def save(store, number, party="", school="", remark="", barcode="", order_date="2024-01-01", barcodes=()):
+    return store.save_order(
+        {"order_number": number, "party_name": party, "school_name": school, "remark": remark,
+         "barcode": barcode, "order_date": order_date},
+        barcodes=barcodes,
+    )
+
+
+@pytest.fixture
+def store():
+    store = OrderStore(":memory:")
+    save(store, "1001", party="Kendriya Vidyalaya", remark="red collar", barcode="KV1001")
+    save(store, "1002", party="Delhi Public", school="Kendriya School")
+    save(store, "KEN-7", party="Apex Traders", remark="kendriya blazer sample")
+    save(store, "1003", party="Greenwood", barcodes=["ITEM-9"])
+    save(store, "1004", party="Kendriya Vidyalya")  # typo'd duplicate of a party
+    return store
+
+
+def numbers(rows):
+    return [r["order_number"] for r in rows]
+
+
+def all_pages(store, text, limit):
+    rows, after = [], None
+    while True:
+        page = store.search(text, limit=limit, after=after)
+        rows += page
+        if len(page) < limit:
+            return rows
+        last = page[-1]
+        after = (last["rank"], last["updated_at"], last["id"])
+
+
+def test_exact_number_and_barcodes_rank_first(store):
+    assert numbers(store.search("1001"))[:1] == ["1001"]
+    assert numbers(store.search("kv1001")) == ["1001"]
+    assert numbers(store.search("ITEM-9")) == ["1003"]
+    assert store.search("1001")[0]["rank"] == 0
+
+
+def test_ranks_are_in_order(store):
+    rows = store.search("ken")
+    ranks = [r["rank"] for r in rows]
+    assert ranks == sorted(ranks)
+    assert set(numbers(rows)) == {"1001", "1002", "1004", "KEN-7"}
+    by_number = {r["order_number"]: r["rank"] for r in rows}
+    assert by_number["1001"] == by_number["1002"] == by_number["1004"] == 1  # party / school prefix
+    assert by_number["KEN-7"] == 2  # order number prefix
+    assert len(rows) == len(set(numbers(rows)))
+
+
+def test_newest_first_inside_a_rank(store):
+    rows = [r for r in store.search("kendriya") if r["rank"] == 1]
+    keys = [(r["updated_at"], r["id"]) for r in rows]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_remark_words_match(store):
+    assert numbers(store.search("blazer")) == ["KEN-7"]
+    assert numbers(store.search("red coll")) == ["1001"]
+
+
+def test_close_names_only_fill_a_short_page(store):
+    rows = store.search("greenwod")
+    assert numbers(rows) == ["1003"]
+    assert rows[0]["rank"] == 3
+    # A full page of better hits doesn't look at close names at all
+    assert all(r["rank"] < 3 for r in store.search("kendriya", limit=2))
+
+
+def test_like_wildcards_are_literal(store):
+    assert store.search("%") == []
+    assert all(r["rank"] == 3 for r in store.search("_endriya"))  # only as a close name, never as a prefix
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_keyset_pages_match_one_big_page(store, limit):
+    for text in ("ken", "kendriya vidyalya", "1001"):
+        paged = all_pages(store, text, limit)
+        assert [r["id"] for r in paged] == [r["id"] for r in store.search(text, limit=1000)]
+
+
+def test_keyset_pages_stay_unique_on_a_bigger_store():
+    store = OrderStore(":memory:")
+    for i in range(120):
+        save(store, f"A{i}", party=("Kendra School", "Kendriya Vidyalaya", "Apex")[i % 3],
+             school="St Mary", remark="red collar" if i % 2 else "blue")
+    rows = all_pages(store, "ken", 7)
+    assert len(rows) == len({r["id"] for r in rows}) == 80
+    assert len(all_pages(store, "red", 9)) == 60
+
+
+def test_empty_text_lists_newest_orders(store):
+    save(store, "1005", order_date="2025-06-01")
+    assert numbers(store.search("  "))[0] == "1005"
+
+
+def test_list_orders_keyset_paging(store):
+    first = store.list_orders(limit=2)
+    last = first[-1]
+    rest = store.list_orders(limit=100, after=(last["order_date"], last["id"]))
+    assert [r["id"] for r in first + rest] == [r["id"] for r in store.list_orders(limit=100)]
+
+
+def test_saved_names_are_found_without_a_reload(store):
+    store.search("greenwod")  # builds the name index
+    save(store, "1006", party="Riverside Academy")
+    assert "1006" in numbers(store.search("riversde academy"))
+
+
+def test_delete_and_update(store):
+    order_id = save(store, "1001", party="Renamed Party", remark="green")
+    assert numbers(store.search("renamed")) == ["1001"]
+    assert store.search("red collar") == []
+    store.delete_order(order_id)
+    assert store.find_by_number("1001") is None
+    assert store.search("kv1001") == []
+
+
+def test_saves_and_deletes_while_another_thread_searches(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.sqlite3"))
+    errors = []
+
+    def search():
+        try:
+            for _ in range(200):
+                store.search("kendrya vidyalaya")
+        except Exception as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=search)
+    worker.start()
+    for i in range(200):
+        order_id = save(store, f"T{i}", party=f"Kendriya Vidyalaya {i}")
+        if i % 3 == 0:
+            store.delete_order(order_id)
+    worker.join()
+    assert errors == []
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+import templating
+
+
+def test_render_fills_placeholders():
+    template = templating.CompiledTemplate("t", "<b>{{ name }}</b> x{{qty}} {{ name }}")
+    assert template.fields == {"name", "qty"}
+    assert template.render({"name": "Shirt", "qty": 3, "unused": 1}) == "<b>Shirt</b> x3 Shirt"
+
+
+def test_missing_field_names_the_template():
+    with pytest.raises(KeyError, match="'t' needs 'qty'"):
+        templating.CompiledTemplate("t", "{{ qty }}").render({})
+
+
+def test_template_without_placeholders():
+    assert templating.CompiledTemplate("t", "plain").render({}) == "plain"
+
+
+def test_shipped_templates_load_from_the_module_folder():
+    assert os.path.isdir(templating.TEMPLATE_DIR)
+    for name in ("quotation", "job_work", "order_summary", "rib_collar"):
+        assert name in templating.TEMPLATES
+    assert "item_table" in templating.get_template("quotation").fields
+
+
+def test_unknown_template():
+    with pytest.raises(KeyError, match="No print template"):
+        templating.get_template("no_such_slip")
@@ -0,0 +1,188 @@
+"""
+Application stylesheet and themes.
+
+The look of the order form and its dialogs is one Qt stylesheet, set on the
+QApplication by apply_theme(). Widgets don't call setStyleSheet themselves;
+one-off widgets get an objectName and groups of alike widgets a "role"
+property, and the stylesheet picks them up by selector:
+
+    btn.setProperty("role", "toolbar")    ->  QPushButton[role="toolbar"] { ... }
+    label.setObjectName("grandTotal")     ->  QLabel#grandTotal { ... }
+
+The sheet is a {{ name }} template (see templating.py) compiled once; a theme
+is the dict of colours it is rendered with. Switching themes is one render
+and one app.setStyleSheet(), Qt then re-polishes every widget in one pass.
+
+Properties that change at runtime (e.g. "dimmed" on a collar price) go
+through set_state(), which re-polishes just that widget.
+"""
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QApplication
+
+import templating
+
+THEMES = {
+    "Mint": {
+        "window": "#F5FFFA",
+        "text": "#000000",
+        "field": "#FFFFFF",
+        "field_border": "gray",
+        "box_border": "#000000",
+        "dim": "#A9A9A9",
+        "panel": "#FFFFFF",
+        "panel_border": "#DDDDDD",
+        "canvas": "#FAFAFA",
+        "canvas_border": "#D1D5DB",
+        "group_border": "#D1D5DB",
+        "group_title": "#F0FFF0",
+        "button": "#EEEEEE",
+        "button_text": "#FC83A0",
+        "button_hover": "#FC83A0",
+        "button_hover_text": "#FFFFFF",
+        "slip_button": "#CCCCFF",
+        "slip_button_hover": "#AAAAEE",
+        "plain_button": "#F0F0F0",
+        "plain_button_hover": "#E0E0E0",
+        "saved": "lightgreen",
+        "accent": "#2563EB",
+        "accent_text": "#FFFFFF",
+        "add_button": "#87CEFA",
+        "label_box": "#F9F9F9",
+        "grid": "gray",
+        "tile": "#EEEEEE",
+        "tile_text": "#888888",
+        "tile_button": "#AAAAAA",
+    },
+    "Dark": {
+        "window": "#202124",
+        "text": "#E8EAED",
+        "field": "#2D2E31",
+        "field_border": "#5F6368",
+        "box_border": "#9AA0A6",
+        "dim": "#6B6F74",
+        "panel": "#28292C",
+        "panel_border": "#3C4043",
+        "canvas": "#F5F5F5",  # garment templates are drawn on white
+        "canvas_border": "#3C4043",
+        "group_border": "#5F6368",
+        "group_title": "#202124",
+        "button": "#303134",
+        "button_text": "#F48FB1",
+        "button_hover": "#F48FB1",
+        "button_hover_text": "#202124",
+        "slip_button": "#3F3F6E",
+        "slip_button_hover": "#52528F",
+        "plain_button": "#303134",
+        "plain_button_hover": "#3C4043",
+        "saved": "#2E7D32",
+        "accent": "#4C8DF6",
+        "accent_text": "#FFFFFF",
+        "add_button": "#1E6A96",
+        "label_box": "#2D2E31",
+        "grid": "#5F6368",
+        "tile": "#303134",
+        "tile_text": "#9AA0A6",
+        "tile_button": "#5F6368",
+    },
+}
+DEFAULT_THEME = "Mint"
+
+STYLESHEET = templating.CompiledTemplate("stylesheet", """
+QWidget { font-size: 11pt; font-family: Arial; color: {{ text }}; }
+QWidget#orderForm, QDialog { background-color: {{ window }}; }
+QLineEdit, QComboBox, QDateEdit, QDoubleSpinBox, QListView, QTableView { background-color: {{ field }}; }
+
+/* Header and option inputs */
+QLineEdit[role="field"], QDateEdit[role="field"], QDoubleSpinBox[role="field"] {
+    background-color: {{ field }}; border: 1px solid {{ field_border }}; padding: 3px;
+}
+QLineEdit[role="field"][dimmed="true"] { border-color: {{ dim }}; color: {{ dim }}; }
+
+/* Square black-bordered inputs: item dialog, tax and remark */
+QLineEdit[role="cell"], QComboBox[role="cell"] { border: 1px solid {{ box_border }}; border-radius: 0px; padding: 2px; }
+QLineEdit[role="box"] { border: 1px solid {{ box_border }}; border-radius: 0px; padding: 4px 6px; }
+QComboBox[role="box"] { border: 1px solid {{ box_border }}; border-radius: 0px; padding: 2px; }
+QComboBox#orderStatus { border: 1px solid #777; border-radius: 3px; }
+
+/* Buttons */
+QPushButton[role="toolbar"], QToolButton[role="toolbar"] {
+    background-color: {{ button }}; color: {{ button_text }}; font-weight: bold; padding: 10px;
+}
+QToolButton[role="toolbar"] { padding: 0px; border: 1px solid #CCCCCC; }
+QToolButton[role="toolbar"]:hover { background-color: {{ button_hover }}; color: {{ button_hover_text }}; }
+QPushButton[role="slip"] { background-color: {{ slip_button }}; font-weight: bold; border: 1px solid {{ box_border }}; }
+QPushButton[role="slip"]:hover { background-color: {{ slip_button_hover }}; }
+QPushButton[role="plain"] { border: 1px solid {{ box_border }}; border-radius: 0px; padding: 5px; background-color: {{ plain_button }}; }
+QPushButton[role="plain"]:hover { background-color: {{ plain_button_hover }}; }
+QPushButton#barcodeSave { background-color: {{ slip_button }}; }
+QPushButton#barcodeSave[saved="true"] { background-color: {{ saved }}; }
+QPushButton#uploadTemplate { background-color: {{ accent }}; color: {{ accent_text }}; }
+QPushButton#addItem, QPushButton#addSizeRun { background-color: {{ add_button }}; min-width: 80px; min-height: 15px; }
+
+/* Panels */
+QFrame#productPanel { background-color: {{ panel }}; border: 1px solid {{ panel_border }}; }
+QGraphicsView#canvas { background-color: {{ canvas }}; border: 1px solid {{ canvas_border }}; }
+QGroupBox[role="options"] { border: 1px solid {{ group_border }}; border-radius: 4px; margin-top: 15px; padding-top: 20px; }
+QGroupBox#itemSelection { border-color: {{ grid }}; }
+QGroupBox[role="options"]::title {
+    subcontrol-origin: margin; subcontrol-position: top left; background-color: {{ group_title }};
+    padding: 0 5px; padding-bottom: 2px; margin-left: 5px; margin-top: -1px;
+}
+
+/* Item table and totals */
+QTableView#itemsTable, QTableView#sizeRunGrid { gridline-color: {{ grid }}; border: 0px solid black; }
+QTableView#itemsTable::item, QTableView#sizeRunGrid::item { border: 0.5px solid {{ grid }}; background-color: {{ field }}; }
+QTableView#itemsTable QHeaderView::section, QTableView#sizeRunGrid QHeaderView::section { border: 0.5px solid {{ box_border }}; padding: 3px; font-weight: normal; }
+QLabel#grandTotal { font-size: 20px; font-weight: bold; background-color: {{ label_box }}; }
+
+/* Labels */
+QLabel[role="heading"] { font-weight: bold; }
+QLabel[role="section"] { font-size: 16px; font-weight: bold; }
+QLabel[role="title"] { font-size: 14pt; font-weight: bold; }
+QLabel#remarkLabel {
+    font-size: 16px; font-weight: bold; border: 1px solid {{ box_border }};
+    padding: 2px 4px; border-radius: 4px; background-color: {{ label_box }};
+}
+""")
+
+_current = DEFAULT_THEME
+
+
+def current_theme():
+    return _current
+
+
+def color(name):
+    """A colour of the current theme, for things painted by hand (e.g. gallery tiles)."""
+    return QColor(THEMES[_current][name])
+
+
+def apply_theme(name=DEFAULT_THEME, app=None):
+    """Styles the whole application with theme `name`; can be called again at any time to switch."""
+    global _current
+    if name not in THEMES:
+        print(f"Warning: Unknown theme '{name}', using {DEFAULT_THEME}.")
+        name = DEFAULT_THEME
+    _current = name
+    (app or QApplication.instance()).setStyleSheet(STYLESHEET.render(THEMES[name]))
+
+
+def next_theme():
+    """Switches to the theme after the current one (wraps around); returns its name."""
+    names = list(THEMES)
+    apply_theme(names[(names.index(_current) + 1) % len(names)])
+    return _current
+
+
+def set_role(widget, role):
+    widget.setProperty("role", role)
+    return widget
+
+
+def set_state(widget, name, value):
+    """Changes a property the stylesheet selects on and restyles just that widget."""
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()